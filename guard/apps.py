@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class GuardConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'guard'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,82 @@
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, F, Q
+
+from .models import Education, Med
+from .serializers import MED_TYPE_LABELS, PROGRAM_LABELS
+from .tasks import increment_version, init_version
+
+# Границы периодов «истекает в течение N дней»; периоды не пересекаются: 0–30, 31–60, 61–90
+EXPIRING_PERIODS = (30, 60, 90)
+# Ключи кэша для версии данных сводки и самой сводки (на дату, чтобы она сменялась в полночь)
+DASHBOARD_VERSION_KEY = 'guard:dashboard:version'
+DASHBOARD_CACHE_KEY = 'guard:dashboard:compliance:{version}:{date}'
+
+
+def expiration_counts(today):
+    """
+    Возвращает агрегаты для .annotate(): общее количество записей и количество по срокам действия.
+
+    Каждый агрегат — COUNT с условием (FILTER или CASE, в зависимости от СУБД), поэтому все
+    группы считаются за один проход по таблице.
+    """
+    counts = {
+        'total': Count('id'),
+        'expired': Count('id', filter=Q(date_to__lt=today)),
+    }
+    start = today
+    for days in EXPIRING_PERIODS:
+        end = today + timedelta(days=days)
+        counts[f'expiring_{days}'] = Count('id', filter=Q(date_to__gte=start, date_to__lte=end))
+        start = end + timedelta(days=1)
+    counts['valid'] = Count('id', filter=Q(date_to__gte=start))
+    return counts
+
+
+def compute_compliance(today):
+    """
+    Считает сводку по срокам: медосмотры по типу, обучение по программе и подразделению.
+
+    На каждую модель выполняется один запрос с группировкой.
+    """
+    counts = expiration_counts(today)
+    meds = Med.objects.values('type').annotate(**counts).order_by('type')
+    educations = (
+        Education.objects.values('program', department=F('owner__department'))
+        .annotate(**counts).order_by('program', 'department')
+    )
+    return {
+        'date': today.isoformat(),
+        'periods': list(EXPIRING_PERIODS),
+        'med': [{**row, 'type_label': MED_TYPE_LABELS.get(row['type'], row['type'])} for row in meds],
+        'education': [
+            {**row, 'program_label': PROGRAM_LABELS.get(row['program'], row['program'])} for row in educations
+        ],
+    }
+
+
+def get_compliance_dashboard(today=None):
+    """
+    Возвращает сводку по срокам из кэша, при отсутствии — считает и сохраняет её.
+
+    Ключ кэша содержит версию данных, которая увеличивается при изменении медосмотров,
+    обучений и сотрудников, поэтому устаревшая сводка не отдаётся.
+    """
+    today = today or date.today()
+    version = cache.get(DASHBOARD_VERSION_KEY)
+    if version is None:
+        version = init_version(DASHBOARD_VERSION_KEY)
+    key = DASHBOARD_CACHE_KEY.format(version=version, date=today.isoformat())
+    dashboard = cache.get(key)
+    if dashboard is None:
+        dashboard = compute_compliance(today)
+        cache.set(key, dashboard, timeout=settings.DASHBOARD_CACHE_TIMEOUT)
+    return dashboard
+
+
+def invalidate_dashboard():
+    """Увеличивает версию данных сводки после фиксации текущей транзакции."""
+    transaction.on_commit(lambda: increment_version(DASHBOARD_VERSION_KEY))
@@ -0,0 +1,220 @@
+import io
+import multiprocessing
+import os
+import threading
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from itertools import repeat
+
+from django.conf import settings
+from docx import Document
+from docxcompose.composer import Composer
+from docxtpl import DocxTemplate
+from jinja2 import Environment
+
+# Кэш разобранных шаблонов DOCX текущего процесса: {путь: CachedTemplate}
+_templates = {}
+_templates_lock = threading.Lock()
+# Пул процессов для пакетного рендеринга, создаётся при первом использовании
+_render_pool = None
+_render_pool_lock = threading.Lock()
+# Количество документов, передаваемых процессу пула за один раз
+RENDER_CHUNK_SIZE = 8
+
+
+class CachingEnvironment(Environment):
+    """Окружение Jinja, которое компилирует каждый исходный текст шаблона один раз."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._compiled = {}
+
+    def from_string(self, source, globals=None, template_class=None):
+        if globals is not None or template_class is not None:
+            return super().from_string(source, globals, template_class)
+        template = self._compiled.get(source)
+        if template is None:
+            template = self._compiled[source] = super().from_string(source)
+        return template
+
+
+class CachedTemplate:
+    """
+    Шаблон DOCX, загруженный в память.
+
+    Хранит содержимое файла, результаты подготовки XML и скомпилированные шаблоны Jinja,
+    чтобы при каждом рендеринге не читать файл с диска и не разбирать разметку заново.
+    """
+
+    def __init__(self, path, mtime, data):
+        self.path = path
+        self.mtime = mtime
+        self.data = data
+        self.patched = {}
+        self.jinja_env = CachingEnvironment()
+
+    def render(self, context):
+        """Рендерит документ с контекстом context и возвращает BytesIO в начальной позиции."""
+        doc = _CachedDocxTemplate(self)
+        doc.render(context, self.jinja_env)
+        output = io.BytesIO()
+        doc.save(output)
+        output.seek(0)
+        return output
+
+
+class _CachedDocxTemplate(DocxTemplate):
+    """DocxTemplate, который берёт исходный файл и подготовленный XML из CachedTemplate."""
+
+    def __init__(self, cached):
+        super().__init__(io.BytesIO(cached.data))
+        self._cached = cached
+
+    def patch_xml(self, src_xml):
+        patched = self._cached.patched.get(src_xml)
+        if patched is None:
+            patched = self._cached.patched[src_xml] = super().patch_xml(src_xml)
+        return patched
+
+
+def get_template(path):
+    """
+    Возвращает шаблон DOCX из кэша процесса.
+
+    Шаблон перечитывается с диска, если время изменения файла отличается от закэшированного.
+    """
+    mtime = os.stat(path).st_mtime_ns
+    cached = _templates.get(path)
+    if cached is not None and cached.mtime == mtime:
+        return cached
+    with _templates_lock:
+        cached = _templates.get(path)
+        if cached is None or cached.mtime != mtime:
+            with open(path, 'rb') as f:
+                cached = _templates[path] = CachedTemplate(path, mtime, f.read())
+    return cached
+
+
+def render_docx(path, context):
+    """Рендерит шаблон DOCX по пути path в память и возвращает BytesIO."""
+    return get_template(path).render(context)
+
+
+def clear_template_cache():
+    """Очищает кэш шаблонов DOCX текущего процесса."""
+    with _templates_lock:
+        _templates.clear()
+
+
+def render_docx_bytes(path, context):
+    """Рендерит шаблон DOCX и возвращает содержимое документа в виде bytes."""
+    return render_docx(path, context).getvalue()
+
+
+def get_render_pool():
+    """
+    Возвращает общий пул процессов для рендеринга или None, если пул отключён.
+
+    Пул общий только в пределах процесса: каждый процесс веб-сервера и Celery создаёт
+    свой пул из DIRECTION_RENDER_WORKERS процессов при первом пакетном рендеринге.
+    """
+    global _render_pool
+    if settings.DIRECTION_RENDER_WORKERS < 1:
+        return None
+    with _render_pool_lock:
+        if _render_pool is None:
+            _render_pool = ProcessPoolExecutor(
+                max_workers=settings.DIRECTION_RENDER_WORKERS,
+                mp_context=multiprocessing.get_context('spawn'),
+            )
+        return _render_pool
+
+
+def _reset_render_pool():
+    global _render_pool
+    with _render_pool_lock:
+        if _render_pool is not None:
+            _render_pool.shutdown(wait=False, cancel_futures=True)
+            _render_pool = None
+
+
+def render_many(path, contexts, parallel=True):
+    """
+    Рендерит шаблон для каждого контекста и возвращает итератор bytes в том же порядке.
+
+    Документы рендерятся параллельно в пуле процессов DIRECTION_RENDER_WORKERS;
+    каждый процесс держит собственный кэш шаблонов. При parallel=False или отключённом
+    пуле рендеринг выполняется в текущем процессе.
+    """
+    pool = get_render_pool() if parallel else None
+    if pool is None:
+        return (render_docx_bytes(path, context) for context in contexts)
+    return _collect_results(pool.map(render_docx_bytes, repeat(path), contexts, chunksize=RENDER_CHUNK_SIZE))
+
+
+def _collect_results(results):
+    try:
+        yield from results
+    except BrokenProcessPool:
+        _reset_render_pool()
+        raise
+
+
+def merge_docx(documents):
+    """
+    Объединяет документы DOCX в один, начиная каждый следующий с новой страницы.
+
+    Документы сливаются попарно, а не по одному в конец общего документа: docxcompose
+    просматривает весь итоговый документ при каждом добавлении, и последовательное
+    слияние сотен направлений занимает квадратичное время.
+    """
+    documents = [Document(io.BytesIO(data)) for data in documents]
+    while len(documents) > 1:
+        merged = []
+        for i in range(0, len(documents) - 1, 2):
+            composer = Composer(documents[i])
+            composer.doc.add_page_break()
+            composer.append(documents[i + 1])
+            merged.append(composer.doc)
+        if len(documents) % 2:
+            merged.append(documents[-1])
+        documents = merged
+    output = io.BytesIO()
+    documents[0].save(output)
+    output.seek(0)
+    return output
+
+
+class ZipStreamBuffer:
+    """Буфер для zipfile, из которого записанные данные забираются по частям."""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def flush(self):
+        pass
+
+    def pop(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def stream_zip(named_documents):
+    """Генератор ZIP-архива из пар (имя файла, bytes), отдающий архив по мере готовности файлов."""
+    buffer = ZipStreamBuffer()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_STORED) as archive:
+        for filename, data in named_documents:
+            archive.writestr(filename, data)
+            yield buffer.pop()
+    yield buffer.pop()
@@ -1,33 +1,116 @@
-from django.core.mail import EmailMultiAlternatives
+import smtplib
+import time
+
+from django.core.mail import EmailMultiAlternatives, get_connection
 from django.template.loader import render_to_string
+from django.utils.html import escape
 from django.conf import settings
 
-def send_expiration_notification(to_email, user_name, med_messages=None, edu_messages=None):
+# Тема письма об истекающих сроках
+EXPIRATION_SUBJECT = "Уведомление об истечении сроков медосмотров и обучений"
+# Метка, вместо которой в общий текст письма подставляется имя получателя
+USER_NAME_PLACEHOLDER = '__GUARD_USER_NAME__'
+
+
+def build_expiration_digest(med_messages=None, edu_messages=None):
+    """
+    Рендерит общий текст и HTML письма об истекающих сроках один раз для всех получателей.
+
+    Вместо имени получателя в тексте стоит USER_NAME_PLACEHOLDER; письмо для конкретного
+    пользователя собирает build_expiration_message.
+    """
     login_url = f"{settings.SITE_URL.rstrip('/')}/login/"
     med_messages = med_messages or []
     edu_messages = edu_messages or []
     context = {
-        'user_name': user_name,
+        'user_name': USER_NAME_PLACEHOLDER,
         'med_messages': med_messages,
         'edu_messages': edu_messages,
         'login_url': login_url,
     }
     html_content = render_to_string('guard/notification_template.html', context)
     text_content = (
-        f"Уважаемый(ая) {user_name},\n\n"
+        f"Уважаемый(ая) {USER_NAME_PLACEHOLDER},\n\n"
         f"Напоминаем о следующих истекающих сроках:\n"
         f"Медосмотры:\n" + "\n".join([f"- {msg}" for msg in med_messages]) + "\n\n"
         f"Обучения:\n" + "\n".join([f"- {msg}" for msg in edu_messages]) + "\n\n"
         f"Пожалуйста, войдите по ссылке {login_url} для просмотра деталей.\n\n"
         f"С уважением,\nВаша система управления персоналом"
     )
-    subject = "Уведомление об истечении сроков медосмотров и обучений"
-    from_email = settings.DEFAULT_FROM_EMAIL
-    email = EmailMultiAlternatives(subject, text_content, from_email, [to_email])
+    return {'text': text_content, 'html': html_content}
+
+
+def build_expiration_message(digest, to_email, user_name, connection=None):
+    """Собирает письмо для одного получателя из общего текста build_expiration_digest."""
+    text_content = digest['text'].replace(USER_NAME_PLACEHOLDER, user_name)
+    html_content = digest['html'].replace(USER_NAME_PLACEHOLDER, escape(user_name))
+    email = EmailMultiAlternatives(
+        EXPIRATION_SUBJECT, text_content, settings.DEFAULT_FROM_EMAIL, [to_email], connection=connection
+    )
     email.attach_alternative(html_content, "text/html")
+    return email
+
+
+def is_transient_email_error(error):
+    """Проверяет, имеет ли смысл повторить отправку после ошибки error (сеть, коды SMTP 4xx)."""
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return bool(error.recipients) and all(400 <= code < 500 for code, _ in error.recipients.values())
+    if isinstance(error, smtplib.SMTPResponseException):
+        return 400 <= error.smtp_code < 500
+    if isinstance(error, smtplib.SMTPServerDisconnected):
+        return True
+    if isinstance(error, smtplib.SMTPException):
+        return False
+    return isinstance(error, OSError)
+
+
+def send_expiration_digest(recipients, med_messages=None, edu_messages=None, connection=None, rate_limit=0):
+    """
+    Рассылает письмо об истекающих сроках списку получателей [(email, имя), ...].
+
+    Текст письма рендерится один раз, все письма отправляются через одно SMTP-соединение,
+    не чаще rate_limit писем в секунду (0 — без ограничения).
+    Ошибка отправки одному получателю не прерывает рассылку: возвращается отчёт
+    {'sent': количество, 'failed': {email: текст ошибки}, 'transient': [email, ...]},
+    где transient — получатели с временными ошибками, которым отправку можно повторить.
+    """
+    digest = build_expiration_digest(med_messages, edu_messages)
+    connection = connection or get_connection()
+    interval = 1 / rate_limit if rate_limit else 0
+    next_send = time.monotonic()
+    report = {'sent': 0, 'failed': {}, 'transient': []}
+    with connection:
+        for to_email, user_name in recipients:
+            if interval:
+                delay = next_send - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                next_send = max(next_send, time.monotonic()) + interval
+            email = build_expiration_message(digest, to_email, user_name, connection=connection)
+            # send_messages по одному письму на открытом соединении: при отправке списком
+            # первая же ошибка прервала бы рассылку остальным получателям
+            try:
+                connection.send_messages([email])
+                report['sent'] += 1
+            except Exception as e:
+                report['failed'][to_email] = str(e)
+                if is_transient_email_error(e):
+                    report['transient'].append(to_email)
+                if isinstance(e, smtplib.SMTPServerDisconnected):
+                    # Сервер закрыл соединение: открываем новое для оставшихся получателей
+                    connection.close()
+                    try:
+                        connection.open()
+                    except Exception:
+                        pass
+    return report
+
+
+def send_expiration_notification(to_email, user_name, med_messages=None, edu_messages=None):
+    email = build_expiration_message(build_expiration_digest(med_messages, edu_messages), to_email, user_name)
     try:
         email.send(fail_silently=False)
         return True
     except Exception as e:
         print(f"Failed to send notification email: {e}")
-        return False
\ No newline at end of file
+        return False
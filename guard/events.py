@@ -0,0 +1,85 @@
+import asyncio
+import logging
+
+import redis
+import redis.asyncio as aioredis
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Максимальная задержка между попытками переподключения к Redis (в секундах)
+MAX_RECONNECT_DELAY = 30
+
+_publisher = None
+
+
+def publish_notification_change(version):
+    """Сообщает всем процессам ASGI, что набор уведомлений изменился."""
+    global _publisher
+    try:
+        if _publisher is None:
+            _publisher = redis.Redis.from_url(settings.NOTIFICATION_PUBSUB_URL)
+        _publisher.publish(settings.NOTIFICATION_PUBSUB_CHANNEL, version)
+    except redis.RedisError as e:
+        logger.warning(f"Notification change was not published: {str(e)}")
+
+
+class NotificationBroadcaster:
+    """
+    Раздаёт события об изменении уведомлений подключениям SSE текущего процесса.
+
+    На процесс открывается одна подписка Redis pub/sub, которая запускается вместе
+    с первым подключением и завершается, когда подключений не остаётся.
+    Каждое подключение получает очередь размером 1: события, пришедшие, пока
+    подключение занято, объединяются в одно.
+    """
+
+    def __init__(self):
+        self._queues = set()
+        self._task = None
+
+    def subscribe(self):
+        queue = asyncio.Queue(maxsize=1)
+        self._queues.add(queue)
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._task.get_loop() is not loop:
+            self._task = loop.create_task(self._listen())
+        return queue
+
+    def unsubscribe(self, queue):
+        self._queues.discard(queue)
+
+    def _notify_all(self):
+        for queue in self._queues:
+            try:
+                queue.put_nowait(None)
+            except asyncio.QueueFull:
+                pass
+
+    async def _listen(self):
+        delay = 1
+        reconnected = False
+        while self._queues:
+            client = aioredis.Redis.from_url(settings.NOTIFICATION_PUBSUB_URL)
+            try:
+                async with client.pubsub() as pubsub:
+                    await pubsub.subscribe(settings.NOTIFICATION_PUBSUB_CHANNEL)
+                    delay = 1
+                    # Пока подписки не было, события могли быть пропущены
+                    if reconnected:
+                        self._notify_all()
+                        reconnected = False
+                    while self._queues:
+                        message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1)
+                        if message is not None:
+                            self._notify_all()
+            except (redis.RedisError, OSError) as e:
+                logger.warning(f"Notification subscription lost, retrying in {delay} s: {str(e)}")
+                reconnected = True
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, MAX_RECONNECT_DELAY)
+            finally:
+                await client.aclose()
+
+
+broadcaster = NotificationBroadcaster()
@@ -0,0 +1,249 @@
+import csv
+import io
+import re
+import zipfile
+from datetime import date
+from xml.sax.saxutils import escape
+
+from .documents import ZipStreamBuffer
+from .serializers import EMPLOYEE_STATUS_LABELS, GENDER_LABELS, MED_TYPE_LABELS, PROGRAM_LABELS
+
+# Поддерживаемые форматы выгрузки
+EXPORT_FORMATS = ('csv', 'xlsx')
+# Количество строк, которое читается из курсора базы данных за один раз
+EXPORT_CHUNK_SIZE = 2000
+# Примерный размер части ответа, которую генератор отдаёт за раз (в символах)
+EXPORT_BUFFER_SIZE = 64 * 1024
+# Разделитель CSV: с ним файл сразу открывается по столбцам в Excel с русской локалью
+CSV_DELIMITER = ';'
+# MIME-типы выгрузки
+CSV_CONTENT_TYPE = 'text/csv; charset=utf-8'
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+# Столбцы выгрузки: (заголовок, поле .values_list()). Заголовки медосмотров и обучений
+# совпадают с заголовками, которые понимает импорт, поэтому выгрузку можно загрузить обратно
+EMPLOYEE_EXPORT_COLUMNS = (
+    ('ID', 'id'),
+    ('ФИО', 'FIO'),
+    ('Пол', 'gender'),
+    ('Дата рождения', 'birthday'),
+    ('Возраст', 'age'),
+    ('Должность', 'position'),
+    ('Подразделение', 'department'),
+    ('Номер ОМС', 'oms_number'),
+    ('Номер ДМС', 'dms_number'),
+    ('Статус', 'status'),
+    ('Обучается', 'is_edu'),
+)
+MED_EXPORT_COLUMNS = (
+    ('ID', 'id'),
+    ('ФИО', 'owner__FIO'),
+    ('Дата рождения', 'owner__birthday'),
+    ('Подразделение', 'owner__department'),
+    ('Тип осмотра', 'type'),
+    ('Дата осмотра', 'date_from'),
+    ('Дата окончания', 'date_to'),
+)
+EDUCATION_EXPORT_COLUMNS = (
+    ('ID', 'id'),
+    ('ФИО', 'owner__FIO'),
+    ('Дата рождения', 'owner__birthday'),
+    ('Подразделение', 'owner__department'),
+    ('Программа', 'program'),
+    ('Номер протокола', 'protocol_num'),
+    ('Номер удостоверения', 'udostoverenie_num'),
+    ('Часы', 'hours'),
+    ('Дата начала', 'date_from'),
+    ('Дата окончания', 'date_to'),
+)
+# Поля, коды которых в выгрузке заменяются названиями
+EXPORT_LABELS = {
+    'gender': GENDER_LABELS,
+    'status': EMPLOYEE_STATUS_LABELS,
+    'type': MED_TYPE_LABELS,
+    'program': PROGRAM_LABELS,
+}
+# Запись булевых значений в выгрузке
+BOOLEAN_LABELS = {True: 'Да', False: 'Нет'}
+
+# Символы, недопустимые в XML 1.0; удаляются из текстовых ячеек XLSX
+XML_ILLEGAL_CHARS = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+# Точка отсчёта дат Excel
+EXCEL_EPOCH = date(1899, 12, 30)
+# Стили ячеек XLSX (индексы в cellXfs файла styles.xml)
+XLSX_DATE_STYLE = 1
+XLSX_HEADER_STYLE = 2
+
+XLSX_MAIN_NS = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+XLSX_REL_NS = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+XLSX_PACKAGE_REL_NS = 'http://schemas.openxmlformats.org/package/2006/relationships'
+XML_DECLARATION = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+# Неизменяемые части книги XLSX с одним листом: путь в архиве → содержимое
+XLSX_STATIC_PARTS = {
+    '[Content_Types].xml': (
+        XML_DECLARATION
+        + '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '<Override PartName="/xl/styles.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+        '</Types>'
+    ),
+    '_rels/.rels': (
+        XML_DECLARATION
+        + f'<Relationships xmlns="{XLSX_PACKAGE_REL_NS}">'
+        f'<Relationship Id="rId1" Type="{XLSX_REL_NS}/officeDocument" Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    'xl/workbook.xml': (
+        XML_DECLARATION
+        + f'<workbook xmlns="{XLSX_MAIN_NS}" xmlns:r="{XLSX_REL_NS}">'
+        '<sheets><sheet name="Лист1" sheetId="1" r:id="rId1"/></sheets>'
+        '</workbook>'
+    ),
+    'xl/_rels/workbook.xml.rels': (
+        XML_DECLARATION
+        + f'<Relationships xmlns="{XLSX_PACKAGE_REL_NS}">'
+        f'<Relationship Id="rId1" Type="{XLSX_REL_NS}/worksheet" Target="worksheets/sheet1.xml"/>'
+        f'<Relationship Id="rId2" Type="{XLSX_REL_NS}/styles" Target="styles.xml"/>'
+        '</Relationships>'
+    ),
+    'xl/styles.xml': (
+        XML_DECLARATION
+        + f'<styleSheet xmlns="{XLSX_MAIN_NS}">'
+        '<fonts count="2"><font><sz val="11"/><name val="Calibri"/></font>'
+        '<font><b/><sz val="11"/><name val="Calibri"/></font></fonts>'
+        '<fills count="2"><fill><patternFill patternType="none"/></fill>'
+        '<fill><patternFill patternType="gray125"/></fill></fills>'
+        '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+        '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+        '<cellXfs count="3"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+        '<xf numFmtId="14" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+        '<xf numFmtId="0" fontId="1" fillId="0" borderId="0" xfId="0" applyFont="1"/></cellXfs>'
+        '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+        '</styleSheet>'
+    ),
+}
+# Начало и конец листа; первая строка (заголовок) закреплена
+XLSX_SHEET_START = (
+    XML_DECLARATION
+    + f'<worksheet xmlns="{XLSX_MAIN_NS}">'
+    '<sheetViews><sheetView workbookViewId="0">'
+    '<pane ySplit="1" topLeftCell="A2" activePane="bottomLeft" state="frozen"/>'
+    '</sheetView></sheetViews><sheetData>'
+)
+XLSX_SHEET_END = '</sheetData></worksheet>'
+
+
+def export_rows(queryset, columns):
+    """
+    Построчно читает записи для выгрузки через серверный курсор.
+
+    Строки запрашиваются через .values_list() частями по EXPORT_CHUNK_SIZE, поэтому в памяти
+    одновременно находится не больше одной части; коды choices заменяются названиями.
+    """
+    fields = [field for _, field in columns]
+    labels = [EXPORT_LABELS.get(field) for field in fields]
+    for values in queryset.values_list(*fields).iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        yield [
+            label.get(value, value) if label is not None else value
+            for label, value in zip(labels, values)
+        ]
+
+
+def format_number(value):
+    """Записывает число без дробной части, если она нулевая (16.0 → 16)."""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def csv_value(value):
+    """Приводит значение к строке для CSV; даты записываются как ГГГГ-ММ-ДД."""
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return BOOLEAN_LABELS[value]
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, (int, float)):
+        return format_number(value)
+    return value
+
+
+def stream_csv(header, rows):
+    """Генератор CSV-файла в UTF-8 с BOM, отдающий его частями примерно по EXPORT_BUFFER_SIZE."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, delimiter=CSV_DELIMITER)
+    buffer.write('\ufeff')
+    writer.writerow(header)
+    for row in rows:
+        writer.writerow([csv_value(value) for value in row])
+        if buffer.tell() >= EXPORT_BUFFER_SIZE:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode('utf-8')
+
+
+def xlsx_cell(value, style=None):
+    """Возвращает XML ячейки XLSX; строки записываются без общей таблицы строк (inlineStr)."""
+    style_attr = f' s="{style}"' if style else ''
+    if value is None or value == '':
+        return '<c/>'
+    if isinstance(value, bool):
+        value = BOOLEAN_LABELS[value]
+    elif isinstance(value, date):
+        return f'<c s="{XLSX_DATE_STYLE}"><v>{(value - EXCEL_EPOCH).days}</v></c>'
+    elif isinstance(value, (int, float)):
+        return f'<c{style_attr}><v>{format_number(value)}</v></c>'
+    text = escape(XML_ILLEGAL_CHARS.sub('', str(value)))
+    return f'<c t="inlineStr"{style_attr}><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def xlsx_row(number, values, style=None):
+    """Возвращает XML строки листа с номером number."""
+    return f'<row r="{number}">{"".join(xlsx_cell(value, style) for value in values)}</row>'
+
+
+def stream_xlsx(header, rows):
+    """
+    Генератор книги XLSX с одним листом, отдающий её частями по мере записи строк.
+
+    Лист записывается в ZIP-архив потоково, а сжатые данные сразу забираются из буфера,
+    поэтому расход памяти не зависит от количества строк.
+    """
+    buffer = ZipStreamBuffer()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for name, content in XLSX_STATIC_PARTS.items():
+            archive.writestr(name, content)
+        yield buffer.pop()
+
+        with archive.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True) as sheet:
+            parts = [XLSX_SHEET_START, xlsx_row(1, header, XLSX_HEADER_STYLE)]
+            size = 0
+            for number, row in enumerate(rows, start=2):
+                part = xlsx_row(number, row)
+                parts.append(part)
+                size += len(part)
+                if size >= EXPORT_BUFFER_SIZE:
+                    sheet.write(''.join(parts).encode('utf-8'))
+                    parts = []
+                    size = 0
+                    chunk = buffer.pop()
+                    if chunk:
+                        yield chunk
+            parts.append(XLSX_SHEET_END)
+            sheet.write(''.join(parts).encode('utf-8'))
+    yield buffer.pop()
+
+
+def stream_export(queryset, columns, export_format):
+    """Генератор файла выгрузки записей queryset в формате export_format (csv или xlsx)."""
+    header = [title for title, _ in columns]
+    rows = export_rows(queryset, columns)
+    return stream_csv(header, rows) if export_format == 'csv' else stream_xlsx(header, rows)
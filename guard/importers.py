@@ -0,0 +1,402 @@
+import codecs
+import csv
+import io
+import os
+import zipfile
+from datetime import date, datetime
+from functools import partial
+
+from django.db import transaction
+from django.forms import ValidationError
+from openpyxl import load_workbook
+from openpyxl.utils.exceptions import InvalidFileException
+
+from .dashboard import invalidate_dashboard
+from .models import Education, Employee, Med
+from .tasks import schedule_expiration_recompute
+from .validation import (
+    EDUCATION_REQUIRED_FIELDS, EMPLOYEE_REQUIRED_FIELDS, MED_REQUIRED_FIELDS,
+    clean_education_data, clean_employee_data, clean_med_data,
+)
+
+# Поддерживаемые форматы файлов импорта (по расширению)
+IMPORT_FORMATS = ('csv', 'xlsx')
+# Количество записей в одном запросе bulk_create
+IMPORT_BATCH_SIZE = 1000
+# Сколько ошибок по строкам включать в отчёт; остальные только подсчитываются
+IMPORT_MAX_ERRORS = 1000
+# Сколько строк включать в построчный отчёт импорта медосмотров и обучений
+IMPORT_MAX_REPORT_ROWS = 10000
+# Объём начала CSV-файла, по которому определяются кодировка и разделитель (в байтах)
+CSV_SAMPLE_SIZE = 64 * 1024
+
+# Столбцы файла импорта сотрудников: поле → допустимые заголовки (без учёта регистра)
+EMPLOYEE_COLUMNS = {
+    'FIO': ('fio', 'фио'),
+    'gender': ('gender', 'пол'),
+    'birthday': ('birthday', 'дата рождения'),
+    'position': ('position', 'должность'),
+    'status': ('status', 'статус'),
+    'is_edu': ('is_edu', 'обучается'),
+    'department': ('department', 'подразделение', 'отдел'),
+    'oms_number': ('oms_number', 'номер омс', 'омс'),
+    'dms_number': ('dms_number', 'номер дмс', 'дмс'),
+}
+# Столбцы, по которым запись медосмотра или обучения сопоставляется с сотрудником
+OWNER_COLUMNS = {
+    'FIO': ('fio', 'фио'),
+    'birthday': ('birthday', 'дата рождения'),
+}
+# Столбцы файла импорта медосмотров: поле → допустимые заголовки (без учёта регистра)
+MED_COLUMNS = {
+    **OWNER_COLUMNS,
+    'exam_type': ('exam_type', 'type', 'тип', 'тип осмотра'),
+    'exam_date': ('exam_date', 'date_from', 'дата осмотра'),
+    'expiry_date': ('expiry_date', 'date_to', 'дата окончания', 'действителен до'),
+}
+# Столбцы файла импорта записей об обучении
+EDUCATION_COLUMNS = {
+    **OWNER_COLUMNS,
+    'program': ('program', 'программа', 'программа обучения'),
+    'protocol_num': ('protocol_num', 'номер протокола', 'протокол'),
+    'udostoverenie_num': ('udostoverenie_num', 'номер удостоверения', 'удостоверение'),
+    'hours': ('hours', 'часы', 'количество часов'),
+    'date_from': ('date_from', 'дата начала'),
+    'date_to': ('date_to', 'дата окончания'),
+}
+# Названия типов осмотра и программ, которые принимаются вместо кодов:
+# поле → {название в нижнем регистре: код}
+LABEL_CODES = {
+    'exam_type': {label.lower(): code for code, label in Med.TYPE_CHOICHES},
+    'program': {label.lower(): code for code, label in Education.PROGRAM_CHOICES},
+}
+
+# Значения булевых столбцов
+TRUE_VALUES = {'1', 'true', 'yes', 'да', '+'}
+FALSE_VALUES = {'0', 'false', 'no', 'нет', '-'}
+
+
+def get_max_lengths(model):
+    """Возвращает ограничения длины строковых полей model: поле → (название, максимальная длина)."""
+    return {field.name: (field.verbose_name, field.max_length) for field in model._meta.fields if field.max_length}
+
+
+EMPLOYEE_MAX_LENGTHS = get_max_lengths(Employee)
+MED_MAX_LENGTHS = get_max_lengths(Med)
+EDUCATION_MAX_LENGTHS = get_max_lengths(Education)
+
+
+def get_import_format(filename):
+    """Определяет формат файла импорта по расширению имени filename."""
+    extension = os.path.splitext(filename or '')[1].lower().lstrip('.')
+    if extension not in IMPORT_FORMATS:
+        raise ValidationError(f"Формат файла должен быть одним из: {', '.join(IMPORT_FORMATS)}")
+    return extension
+
+
+def cell_to_str(value):
+    """Приводит значение ячейки к строке в том виде, в каком его ожидают правила проверки."""
+    if value is None:
+        return ''
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value).strip()
+
+
+def read_csv_rows(file):
+    """
+    Построчно читает CSV из бинарного файла и возвращает итератор списков строк.
+
+    Кодировка (UTF-8 или Windows-1251) и разделитель определяются по началу файла.
+    """
+    sample = file.read(CSV_SAMPLE_SIZE)
+    file.seek(0)
+    try:
+        # Неполный последний символ выборки не считается ошибкой
+        text = codecs.getincrementaldecoder('utf-8-sig')().decode(sample, final=False)
+        encoding = 'utf-8-sig'
+    except UnicodeDecodeError:
+        text = sample.decode('cp1251')
+        encoding = 'cp1251'
+    try:
+        dialect = csv.Sniffer().sniff(text.split('\n', 1)[0], delimiters=',;\t')
+    except csv.Error:
+        dialect = csv.excel
+
+    stream = io.TextIOWrapper(file, encoding=encoding, newline='')
+    try:
+        for values in csv.reader(stream, dialect):
+            yield [value.strip() for value in values]
+    except UnicodeDecodeError:
+        raise ValidationError('Не удалось определить кодировку файла')
+    finally:
+        # Файл закрывает тот, кто его открыл
+        if not file.closed:
+            stream.detach()
+
+
+def read_xlsx_rows(file):
+    """Построчно читает первый лист XLSX в режиме только для чтения и возвращает итератор списков строк."""
+    try:
+        workbook = load_workbook(file, read_only=True, data_only=True)
+    except (InvalidFileException, zipfile.BadZipFile, KeyError):
+        raise ValidationError('Файл не является книгой Excel (XLSX)')
+    try:
+        for values in workbook.active.iter_rows(values_only=True):
+            yield [cell_to_str(value) for value in values]
+    finally:
+        workbook.close()
+
+
+def read_rows(file, file_format):
+    """Возвращает итератор строк файла импорта в формате file_format."""
+    return read_csv_rows(file) if file_format == 'csv' else read_xlsx_rows(file)
+
+
+def map_columns(header, columns, required):
+    """
+    Сопоставляет заголовки файла с полями и возвращает {поле: номер столбца}.
+
+    Неизвестные столбцы пропускаются; если нет столбца для одного из полей required,
+    выбрасывается ValidationError.
+    """
+    aliases = {alias: field for field, names in columns.items() for alias in names}
+    mapping = {}
+    for index, title in enumerate(header):
+        field = aliases.get(str(title).strip().lower())
+        if field is not None and field not in mapping:
+            mapping[field] = index
+    missing = [field for field in required if field not in mapping]
+    if missing:
+        raise ValidationError(f"В файле нет обязательных столбцов: {', '.join(missing)}")
+    return mapping
+
+
+def row_to_data(values, mapping):
+    """Собирает из строки файла словарь {поле: значение} по сопоставлению столбцов mapping."""
+    return {field: values[index] if index < len(values) else '' for field, index in mapping.items()}
+
+
+def row_to_employee_data(values, mapping):
+    """Собирает из строки файла словарь в формате, который принимает clean_employee_data."""
+    data = row_to_data(values, mapping)
+    is_edu = data.get('is_edu')
+    if isinstance(is_edu, str):
+        if is_edu.lower() in TRUE_VALUES:
+            data['is_edu'] = True
+        elif is_edu.lower() in FALSE_VALUES:
+            data['is_edu'] = False
+    return data
+
+
+def check_max_lengths(data, max_lengths):
+    """
+    Проверяет длину строковых значений data по ограничениям полей модели.
+
+    Заменяет full_clean при импорте: остальные проверки полей уже выполнены правилами
+    clean_employee_data, а полная проверка модели заметно замедляет импорт больших файлов.
+    """
+    for field, (name, max_length) in max_lengths.items():
+        value = data.get(field)
+        if isinstance(value, str) and len(value) > max_length:
+            raise ValidationError(f'Поле «{name}» должно содержать не более {max_length} символов')
+
+
+def import_employees(rows, batch_size=IMPORT_BATCH_SIZE, dry_run=False):
+    """
+    Импортирует сотрудников из итератора строк rows, первая строка — заголовок.
+
+    Каждая строка проверяется по тем же правилам, что и при добавлении сотрудника через
+    форму; корректные строки сохраняются через bulk_create пачками по batch_size в одной
+    транзакции, ошибочные попадают в отчёт с номером строки файла. Строка, сотрудник из
+    которой (ФИО и дата рождения) уже есть в базе данных или выше в файле, считается
+    ошибочной. При dry_run строки только проверяются. Возвращает отчёт
+    {'total', 'created', 'failed', 'errors'}.
+    """
+    rows = iter(rows)
+    header = next(rows, None)
+    if header is None:
+        raise ValidationError('Файл пуст')
+    mapping = map_columns(header, EMPLOYEE_COLUMNS, EMPLOYEE_REQUIRED_FIELDS)
+
+    report = {'total': 0, 'created': 0, 'failed': 0, 'errors': []}
+    today = date.today()
+    seen = {}
+    batch = []
+    with transaction.atomic():
+        for line, values in enumerate(rows, start=2):
+            if not any(values):
+                continue
+            report['total'] += 1
+            try:
+                employee_data = clean_employee_data(row_to_employee_data(values, mapping), today)
+                check_max_lengths(employee_data, EMPLOYEE_MAX_LENGTHS)
+                key = (employee_data['FIO'], employee_data['birthday'])
+                if key in seen:
+                    raise ValidationError(f'Сотрудник уже указан в строке {seen[key]}')
+            except ValidationError as e:
+                add_error(report, line, '; '.join(e.messages))
+                continue
+            seen[key] = line
+            batch.append((line, Employee(**employee_data)))
+            if len(batch) >= batch_size:
+                report['created'] += save_batch(batch, report, dry_run)
+                batch = []
+        report['created'] += save_batch(batch, report, dry_run)
+    report['errors'].sort(key=lambda error: error['row'])
+    return report
+
+
+def add_error(report, line, description):
+    """Добавляет ошибку строки line в отчёт импорта сотрудников."""
+    report['failed'] += 1
+    if len(report['errors']) < IMPORT_MAX_ERRORS:
+        report['errors'].append({'row': line, 'description': description})
+
+
+def save_batch(batch, report, dry_run=False):
+    """
+    Сохраняет пачку сотрудников [(номер строки, Employee), ...] одним запросом.
+
+    Сотрудники, которые уже есть в базе данных, не сохраняются и попадают в отчёт как
+    ошибки. Возвращает количество сохранённых сотрудников.
+    """
+    existing = find_owners({(employee.FIO, employee.birthday) for _, employee in batch}) if batch else {}
+    employees = []
+    for line, employee in batch:
+        if (employee.FIO, employee.birthday) in existing:
+            add_error(report, line, 'Сотрудник с такими ФИО и датой рождения уже существует')
+        else:
+            employees.append(employee)
+    if employees and not dry_run:
+        Employee.objects.bulk_create(employees)
+    return len(employees)
+
+
+def parse_owner_key(data):
+    """
+    Возвращает ключ (ФИО, дата рождения), по которому строка сопоставляется с сотрудником.
+
+    Пробелы в ФИО нормализуются так же, как при сохранении сотрудника.
+    """
+    full_name = ' '.join(str(data['FIO']).split())
+    if not full_name:
+        raise ValidationError('ФИО должно быть непустой строкой')
+    try:
+        birthday = datetime.strptime(data['birthday'], '%Y-%m-%d').date()
+    except (ValueError, TypeError):
+        raise ValidationError('Дата рождения должна быть в формате YYYY-MM-DD')
+    return full_name, birthday
+
+
+def find_owners(keys):
+    """
+    Находит сотрудников для ключей (ФИО, дата рождения) одним запросом.
+
+    Возвращает {ключ: [ID сотрудника, ...]}; больше одного ID означает, что сотрудник
+    определяется неоднозначно.
+    """
+    owners = {}
+    names = {full_name for full_name, _ in keys}
+    for employee_id, full_name, birthday in Employee.objects.filter(FIO__in=names).values_list('id', 'FIO', 'birthday'):
+        key = (full_name, birthday)
+        if key in keys:
+            owners.setdefault(key, []).append(employee_id)
+    return owners
+
+
+def import_records(rows, model, columns, required, clean, max_lengths, batch_size=IMPORT_BATCH_SIZE, dry_run=False):
+    """
+    Импортирует записи model (Med или Education) из итератора строк rows, первая строка — заголовок.
+
+    Сотрудник определяется по ФИО и дате рождения, поля записи проверяются функцией clean —
+    по тем же правилам, что и при добавлении одной записи через форму; вместо кодов типа
+    осмотра и программы допускаются их названия. Корректные строки сохраняются через
+    bulk_create пачками по batch_size в одной транзакции; сигналы моделей при этом не
+    отправляются, поэтому после импорта один раз ставится в очередь пересчёт уведомлений
+    и сбрасывается сводка по срокам. Возвращает отчёт {'total', 'created', 'failed', 'rows'},
+    где rows — результат по каждой строке файла.
+    """
+    rows = iter(rows)
+    header = next(rows, None)
+    if header is None:
+        raise ValidationError('Файл пуст')
+    mapping = map_columns(header, columns, [*OWNER_COLUMNS, *required])
+
+    report = {'total': 0, 'created': 0, 'failed': 0, 'rows': []}
+    pending = []
+
+    def add_result(result):
+        if len(report['rows']) < IMPORT_MAX_REPORT_ROWS:
+            report['rows'].append(result)
+
+    def record_error(line, e):
+        report['failed'] += 1
+        add_result({'row': line, 'status': 'ERROR', 'description': '; '.join(e.messages)})
+
+    def flush():
+        owners = find_owners({key for _, key, _ in pending})
+        records = []
+        for line, key, record_data in pending:
+            owner_ids = owners.get(key, [])
+            if not owner_ids:
+                record_error(line, ValidationError('Сотрудник с такими ФИО и датой рождения не найден'))
+            elif len(owner_ids) > 1:
+                record_error(line, ValidationError('Найдено несколько сотрудников с такими ФИО и датой рождения'))
+            else:
+                records.append((line, model(owner_id=owner_ids[0], **record_data)))
+        if records and not dry_run:
+            model.objects.bulk_create([record for _, record in records])
+        for line, record in records:
+            add_result({'row': line, 'status': 'SUCCESS', 'employee_id': record.owner_id, 'id': record.pk})
+        report['created'] += len(records)
+        pending.clear()
+
+    with transaction.atomic():
+        for line, values in enumerate(rows, start=2):
+            if not any(values):
+                continue
+            report['total'] += 1
+            data = row_to_data(values, mapping)
+            for field, codes in LABEL_CODES.items():
+                if field in data:
+                    data[field] = codes.get(data[field].lower(), data[field])
+            try:
+                key = parse_owner_key(data)
+                record_data = clean(data)
+                check_max_lengths(record_data, max_lengths)
+            except ValidationError as e:
+                record_error(line, e)
+                continue
+            pending.append((line, key, record_data))
+            if len(pending) >= batch_size:
+                flush()
+        flush()
+        if report['created'] and not dry_run:
+            schedule_expiration_recompute()
+            invalidate_dashboard()
+
+    report['rows'].sort(key=lambda result: result['row'])
+    return report
+
+
+def import_meds(rows, batch_size=IMPORT_BATCH_SIZE, dry_run=False):
+    """Импортирует медосмотры из строк файла, см. import_records."""
+    return import_records(
+        rows, Med, MED_COLUMNS, MED_REQUIRED_FIELDS, partial(clean_med_data, today=date.today()),
+        MED_MAX_LENGTHS, batch_size=batch_size, dry_run=dry_run,
+    )
+
+
+def import_educations(rows, batch_size=IMPORT_BATCH_SIZE, dry_run=False):
+    """Импортирует записи об обучении из строк файла, см. import_records."""
+    return import_records(
+        rows, Education, EDUCATION_COLUMNS, EDUCATION_REQUIRED_FIELDS, clean_education_data,
+        EDUCATION_MAX_LENGTHS, batch_size=batch_size, dry_run=dry_run,
+    )
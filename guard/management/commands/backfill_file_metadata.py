@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand
+
+from guard.models import FileAttachment
+
+
+class Command(BaseCommand):
+    help = 'Заполняет размер, MIME-тип и SHA-256 для ранее загруженных файлов'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='Количество файлов в одной пачке')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        last_id = 0
+        updated = missing = 0
+
+        while True:
+            batch = list(
+                FileAttachment.objects
+                .filter(sha256='', id__gt=last_id)
+                .order_by('id')[:batch_size]
+            )
+            if not batch:
+                break
+            last_id = batch[-1].id
+
+            filled = []
+            for attachment in batch:
+                try:
+                    attachment.fill_file_metadata()
+                except (FileNotFoundError, ValueError):
+                    missing += 1
+                    self.stderr.write(f"Файл вложения {attachment.id} не найден: {attachment.file.name}")
+                    continue
+                filled.append(attachment)
+
+            FileAttachment.objects.bulk_update(filled, ['size', 'content_type', 'sha256'])
+            updated += len(filled)
+            self.stdout.write(f"Обработано вложений: {updated}, не найдено файлов: {missing}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Готово. Обновлено вложений: {updated}, не найдено файлов: {missing}"
+        ))
@@ -0,0 +1,116 @@
+import io
+import os
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+from docxtpl import DocxTemplate
+
+from guard.documents import clear_template_cache, merge_docx, render_docx, render_many, stream_zip
+from guard.views import MedicalDirectionView
+
+# Пример данных направления на периодический медосмотр
+REGULAR_DATA = {
+    'examinationType': 'periodic',
+    'FIO': 'Иванов Иван Иванович',
+    'birthDate': '1980-05-17',
+    'gender': 'M',
+    'position': 'Инженер',
+    'hasOMS': True,
+    'OMSNumber': '1234567890123456',
+    'directionNumber': '15',
+    'directionDate': '2024-03-01',
+    'medicalOrganization': 'Городская поликлиника',
+    'medicalAddress': 'г. Москва, ул. Ленина, д. 1',
+    'ogrnCode': '1234567890123',
+    'employerRepresentativeName': 'Петров Пётр Петрович',
+    'employerRepresentativePosition': 'Директор',
+    'hazardFactors': '4.2.5',
+}
+
+# Пример данных направления на психиатрическое освидетельствование
+PSYCHIATRIC_DATA = {
+    'examinationType': 'psychiatric',
+    'FIO': 'Сидорова Анна Сергеевна',
+    'birthDate': '1990-11-02',
+    'gender': 'F',
+    'positionPsych': 'Оператор',
+    'directionDatePsych': '2024-03-01',
+    'employerName': 'ООО «Пример»',
+    'okvedCode': '25.11',
+    'medicalOrgPsych': 'Психоневрологический диспансер',
+    'medicalAddressPsych': 'г. Москва, ул. Мира, д. 2',
+    'ogrnPsych': '1234567890123',
+    'activityTypes': 'Работа на высоте',
+    'directionIssueDate': '2024-03-01',
+}
+
+
+class Command(BaseCommand):
+    help = 'Замеряет скорость генерации направлений: с кэшем шаблонов и без него'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=200, help='Количество направлений каждого типа')
+        parser.add_argument('--batch', type=int, default=500,
+                            help='Размер пакета для замера пакетной генерации (0 — не замерять)')
+
+    def handle(self, *args, **options):
+        view = MedicalDirectionView()
+        for data in (REGULAR_DATA, PSYCHIATRIC_DATA):
+            path = os.path.join(view.TEMPLATES_DIR, view.get_template_name(data['examinationType']))
+            context = view.prepare_context(data)
+            self.stdout.write(f"Шаблон {os.path.basename(path)}:")
+            self.report('без кэша', options['count'], lambda: self.render_uncached(path, context))
+            clear_template_cache()
+            self.report('с кэшем', options['count'], lambda: render_docx(path, context))
+
+        if options['batch']:
+            self.report_batch(view, options['batch'])
+
+    @staticmethod
+    def render_uncached(path, context):
+        """Рендерит шаблон так же, как до появления кэша: разбор файла при каждом вызове."""
+        doc = DocxTemplate(path)
+        doc.render(context)
+        output = io.BytesIO()
+        doc.save(output)
+        return output
+
+    def report_batch(self, view, count):
+        """Замеряет пакетную генерацию направлений в текущем процессе и в пуле процессов."""
+        path = os.path.join(view.TEMPLATES_DIR, view.get_template_name(REGULAR_DATA['examinationType']))
+        contexts = [view.prepare_context(REGULAR_DATA)] * count
+        workers = settings.DIRECTION_RENDER_WORKERS
+        self.stdout.write(f"Пакет из {count} направлений (процессов в пуле: {workers}):")
+
+        with override_settings(DIRECTION_RENDER_WORKERS=0):
+            self.report_once('один процесс', count, lambda: list(render_many(path, contexts)))
+        if workers > 0:
+            # Запуск процессов пула не входит в замер
+            list(render_many(path, contexts[:workers]))
+            self.report_once('пул процессов', count, lambda: list(render_many(path, contexts)))
+            self.report_once('ZIP', count, lambda: b''.join(
+                stream_zip((f'{i}.docx', data) for i, data in enumerate(render_many(path, contexts)))
+            ))
+            self.report_once('один DOCX', count, lambda: merge_docx(render_many(path, contexts)))
+
+    def report_once(self, name, count, func):
+        """Выполняет func один раз и выводит количество направлений в секунду."""
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        self.stdout.write(f"  {name:<14} {count / elapsed:8.1f} направлений/с  всего {elapsed:7.2f} с")
+
+    def report(self, name, count, func):
+        """Выводит количество направлений в секунду и медиану времени одного рендеринга."""
+        timings = []
+        for _ in range(count):
+            start = time.perf_counter()
+            func()
+            timings.append((time.perf_counter() - start) * 1000)
+        self.stdout.write(
+            f"  {name:<10} {count / (sum(timings) / 1000):8.1f} направлений/с  "
+            f"медиана {statistics.median(timings):7.2f} мс"
+        )
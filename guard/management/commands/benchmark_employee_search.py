@@ -0,0 +1,94 @@
+import random
+import statistics
+import time
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from guard.models import Employee
+from guard.search import (
+    TRIGRAM_INDEX_NAME, ensure_trigram_index, search_employees, search_queryset, trigram_search_available,
+)
+
+SURNAMES = ['Иванов', 'Петров', 'Сидоров', 'Смирнов', 'Кузнецов', 'Попов', 'Васильев', 'Соколов',
+            'Михайлов', 'Новиков', 'Фёдоров', 'Морозов', 'Волков', 'Алексеев', 'Лебедев', 'Семёнов']
+NAMES = ['Иван', 'Пётр', 'Алексей', 'Сергей', 'Андрей', 'Дмитрий', 'Михаил', 'Николай', 'Олег', 'Юрий']
+PATRONYMICS = ['Иванович', 'Петрович', 'Сергеевич', 'Андреевич', 'Олегович', 'Николаевич', 'Юрьевич']
+QUERIES = ['Иванов', 'Петр Серг', 'Смирнв', 'Кузнецов Андрей', 'Волк Ол', 'Лебедев Юрий Олегович']
+
+
+class Command(BaseCommand):
+    help = 'Замеряет время поиска сотрудников на синтетических данных (изменения откатываются)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--employees', type=int, default=100000, help='Количество синтетических сотрудников')
+        parser.add_argument('--repeat', type=int, default=20, help='Количество повторов каждого запроса')
+        parser.add_argument('--explain', action='store_true', help='Вывести полный план запроса поиска')
+
+    def handle(self, *args, **options):
+        # Вне транзакции: при ошибке CREATE EXTENSION транзакция замера иначе была бы прервана
+        ensure_trigram_index(connection)
+        trigram = trigram_search_available(connection)
+        if not trigram:
+            self.stderr.write(
+                'pg_trgm недоступен: замеряется только поиск подстроки (icontains). '
+                'Для замера нечёткого поиска запустите команду на PostgreSQL с расширением pg_trgm.'
+            )
+        with transaction.atomic():
+            self.populate(options['employees'])
+            self.stdout.write(
+                f"Сотрудников: {Employee.objects.count()}, СУБД: {connection.vendor}, "
+                f"pg_trgm: {'да' if trigram else 'нет'}"
+            )
+            if trigram:
+                self.report_plan(QUERIES[0], options['explain'])
+            for query in QUERIES:
+                self.report('search_employees', query, options['repeat'],
+                            lambda: search_employees(query))
+                self.report('FIO__icontains', query, options['repeat'],
+                            lambda: list(Employee.objects.filter(FIO__icontains=query)))
+            transaction.set_rollback(True)
+
+    def populate(self, count):
+        """Создаёт count синтетических сотрудников пачками."""
+        rnd = random.Random(0)
+        batch = []
+        for i in range(count):
+            batch.append(Employee(
+                FIO=f'{rnd.choice(SURNAMES)} {rnd.choice(NAMES)} {rnd.choice(PATRONYMICS)}',
+                gender='M',
+                birthday=date(1960, 1, 1) + timedelta(days=rnd.randrange(15000)),
+                position='Инженер',
+                status='W',
+            ))
+            if len(batch) == 5000:
+                Employee.objects.bulk_create(batch)
+                batch = []
+        Employee.objects.bulk_create(batch)
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute(f'ANALYZE {connection.ops.quote_name(Employee._meta.db_table)}')
+
+    def report_plan(self, query, verbose):
+        """Выводит, использует ли план запроса поиска GIN-индекс по триграммам ФИО."""
+        plan = search_queryset(query)[:1].explain(analyze=True)
+        uses_index = TRIGRAM_INDEX_NAME in plan
+        self.stdout.write(f"GIN-индекс {TRIGRAM_INDEX_NAME}: {'используется' if uses_index else 'не используется'}")
+        if verbose or not uses_index:
+            self.stdout.write(plan)
+
+    def report(self, name, query, repeat, func):
+        """Выводит медиану и 95-й перцентиль времени выполнения func в миллисекундах."""
+        timings = []
+        found = 0
+        for _ in range(repeat):
+            start = time.perf_counter()
+            found = len(func())
+            timings.append((time.perf_counter() - start) * 1000)
+        timings.sort()
+        p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+        self.stdout.write(
+            f"{name:<18} {query!r:<26} найдено {found:>6}  "
+            f"медиана {statistics.median(timings):8.2f} мс  p95 {p95:8.2f} мс"
+        )
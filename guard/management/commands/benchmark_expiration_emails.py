@@ -0,0 +1,109 @@
+import socketserver
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+
+from guard.emails import send_expiration_digest, send_expiration_notification
+
+
+class SMTPStandInHandler(socketserver.StreamRequestHandler):
+    """Минимальный SMTP-сервер: принимает письма и ничего с ними не делает."""
+
+    def reply(self, line):
+        self.wfile.write(f'{line}\r\n'.encode('ascii'))
+
+    def handle(self):
+        server = self.server
+        with server.lock:
+            server.connections += 1
+        time.sleep(server.connect_delay)
+        self.reply('220 localhost SMTP stand-in')
+        for raw in self.rfile:
+            command = raw.decode('utf-8', 'replace').strip().upper()
+            if command.startswith('EHLO') or command.startswith('HELO'):
+                self.reply('250 localhost')
+            elif command.startswith('RCPT') and server.reject and any(r in command for r in server.reject):
+                self.reply('550 No such user')
+            elif command == 'DATA':
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+                for data_line in self.rfile:
+                    if data_line in (b'.\r\n', b'.\n'):
+                        break
+                with server.lock:
+                    server.messages += 1
+                self.reply('250 OK')
+            elif command == 'QUIT':
+                self.reply('221 Bye')
+                return
+            else:
+                self.reply('250 OK')
+
+
+class SMTPStandIn(socketserver.ThreadingTCPServer):
+    """Локальный SMTP-сервер для замеров; считает соединения и принятые письма."""
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, connect_delay=0, reject=()):
+        super().__init__(('127.0.0.1', 0), SMTPStandInHandler)
+        self.lock = threading.Lock()
+        self.connect_delay = connect_delay
+        self.reject = [address.upper() for address in reject]
+        self.reset()
+
+    def reset(self):
+        self.connections = 0
+        self.messages = 0
+
+
+class Command(BaseCommand):
+    help = 'Замеряет рассылку писем об истекающих сроках на локальном SMTP-сервере'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--recipients', type=int, default=200, help='Количество получателей')
+        parser.add_argument('--messages', type=int, default=50, help='Количество истекающих записей в письме')
+        parser.add_argument('--connect-delay', type=float, default=20,
+                            help='Задержка установки соединения в мс (имитация TLS и сети)')
+
+    def handle(self, *args, **options):
+        recipients = [(f'user{i}@example.com', f'Пользователь {i}') for i in range(options['recipients'])]
+        # Один адрес отклоняется сервером, чтобы проверить отчёт об ошибках
+        rejected = recipients[len(recipients) // 2][0]
+        med_messages = [f'Периодический медосмотр для Сотрудник {i} истекает 01.01.2030.'
+                        for i in range(options['messages'])]
+        edu_messages = [f'Обучение Электробезопасность для Сотрудник {i} истекает 01.01.2030.'
+                        for i in range(options['messages'])]
+
+        server = SMTPStandIn(connect_delay=options['connect_delay'] / 1000, reject=[rejected])
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            with override_settings(
+                EMAIL_BACKEND='django.core.mail.backends.smtp.EmailBackend',
+                EMAIL_HOST='127.0.0.1', EMAIL_PORT=server.server_address[1],
+                EMAIL_USE_TLS=False, EMAIL_USE_SSL=False,
+                EMAIL_HOST_USER='', EMAIL_HOST_PASSWORD='',
+                DEFAULT_FROM_EMAIL='guard@example.com',
+            ):
+                self.report(server, 'по письму', len(recipients), lambda: sum(
+                    not send_expiration_notification(email, name, med_messages, edu_messages)
+                    for email, name in recipients
+                ))
+                self.report(server, 'одним пакетом', len(recipients), lambda: len(
+                    send_expiration_digest(recipients, med_messages, edu_messages)['failed']
+                ))
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def report(self, server, name, count, func):
+        """Выполняет рассылку func и выводит скорость, число соединений и ошибок."""
+        server.reset()
+        start = time.perf_counter()
+        failed = func()
+        elapsed = time.perf_counter() - start
+        self.stdout.write(
+            f"{name:<14} {count / elapsed:8.1f} писем/с  всего {elapsed:6.2f} с  "
+            f"соединений {server.connections:>4}  принято {server.messages:>4}  ошибок {failed}"
+        )
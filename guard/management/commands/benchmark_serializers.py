@@ -0,0 +1,136 @@
+import json
+import random
+import time
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+
+from guard.models import Education, Employee, FileAttachment, Med
+from guard.serializers import (
+    EDUCATION_FIELDS, EMPLOYEE_FIELDS, MED_FIELDS, FastJsonResponse,
+    serialize_educations, serialize_employees, serialize_meds,
+)
+
+
+class Command(BaseCommand):
+    help = 'Замеряет скорость сериализации сотрудников, медосмотров и обучений (изменения откатываются)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--employees', type=int, default=2000, help='Количество синтетических сотрудников')
+        parser.add_argument('--repeat', type=int, default=5, help='Количество повторов каждого замера')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self.populate(options['employees'])
+            today = date.today()
+            cases = [
+                ('сотрудники', Employee.objects.count(),
+                 lambda: self.legacy_employees(),
+                 lambda: serialize_employees(Employee.objects.values(*EMPLOYEE_FIELDS), today)),
+                ('медосмотры', Med.objects.count(),
+                 lambda: self.legacy_meds(),
+                 lambda: serialize_meds(Med.objects.values(*MED_FIELDS))),
+                ('обучения', Education.objects.count(),
+                 lambda: self.legacy_educations(),
+                 lambda: serialize_educations(Education.objects.values(*EDUCATION_FIELDS))),
+            ]
+            for name, count, legacy, current in cases:
+                self.report(name, 'до', count, options['repeat'],
+                            lambda: json.dumps({'data': legacy()}, cls=DjangoJSONEncoder).encode('utf-8'))
+                self.report(name, 'после', count, options['repeat'],
+                            lambda: FastJsonResponse({'data': current()}).content)
+            transaction.set_rollback(True)
+
+    def populate(self, count):
+        """Создаёт count сотрудников с медосмотром, обучением и вложением к каждой записи."""
+        rnd = random.Random(0)
+        employees = Employee.objects.bulk_create([
+            Employee(
+                FIO=f'Сотрудник {i}', gender=rnd.choice('MF'),
+                birthday=date(1960, 1, 1) + timedelta(days=rnd.randrange(15000)),
+                position='Инженер', department='Отдел', status='W', is_edu=True,
+            ) for i in range(count)
+        ], batch_size=1000)
+        meds = Med.objects.bulk_create([
+            Med(owner=emp, type='periodic', date_from=date(2024, 1, 1), date_to=date(2025, 1, 1))
+            for emp in employees
+        ], batch_size=1000)
+        educations = Education.objects.bulk_create([
+            Education(owner=emp, program='first_aid', protocol_num='1', udostoverenie_num='2', hours=16,
+                      date_from=date(2024, 1, 1), date_to=date(2027, 1, 1))
+            for emp in employees
+        ], batch_size=1000)
+        FileAttachment.objects.bulk_create([
+            FileAttachment(file=f'attachments/2024/01/01/med_{med.id}.pdf', file_type='med', med=med, size=1024)
+            for med in meds
+        ] + [
+            FileAttachment(file=f'attachments/2024/01/01/edu_{edu.id}.pdf', file_type='education',
+                           education=edu, size=1024)
+            for edu in educations
+        ], batch_size=1000)
+
+    @staticmethod
+    def legacy_attachments(record):
+        """Прежняя сериализация вложений записи."""
+        return [{
+            'id': att.id,
+            'name': att.file.name.split('/')[-1] if att.file else '',
+            'url': att.file.url if att.file else '',
+            'size': att.get_file_size() if att.file else 0,
+            'uploaded_at': att.uploaded_at.strftime('%d.%m.%Y %H:%M') if att.uploaded_at else ''
+        } for att in record.attachments.all()]
+
+    @staticmethod
+    def legacy_employees():
+        """Сериализация сотрудников так, как она была устроена до общего модуля."""
+        return [{
+            'id': emp.id,
+            'FIO': emp.FIO,
+            'gender': emp.get_gender_display(),
+            'birthday': emp.birthday.strftime('%d.%m.%Y'),
+            'age': emp.get_age(),
+            'position': emp.position,
+            'department': emp.department,
+            'oms_number': emp.oms_number,
+            'dms_number': emp.dms_number,
+            'status': emp.get_status_display(),
+            'is_edu': emp.is_edu
+        } for emp in Employee.objects.all()]
+
+    def legacy_meds(self):
+        """Прежняя сериализация медосмотров."""
+        return [{
+            'id': med.id,
+            'owner': med.owner.FIO,
+            'type': med.get_type_display(),
+            'type_code': med.type,
+            'date_from': med.date_from.strftime('%d.%m.%Y'),
+            'date_to': med.date_to.strftime('%d.%m.%Y'),
+            'attachments': self.legacy_attachments(med)
+        } for med in Med.objects.select_related('owner').prefetch_related('attachments')]
+
+    def legacy_educations(self):
+        """Прежняя сериализация записей об обучении."""
+        return [{
+            'id': edu.id,
+            'owner': edu.owner.FIO,
+            'program': edu.get_program_display(),
+            'protocol_num': edu.protocol_num,
+            'udostoverenie_num': edu.udostoverenie_num,
+            'hours': edu.hours,
+            'date_from': edu.date_from.strftime('%d.%m.%Y'),
+            'date_to': edu.date_to.strftime('%d.%m.%Y'),
+            'attachments': self.legacy_attachments(edu)
+        } for edu in Education.objects.select_related('owner').prefetch_related('attachments')]
+
+    def report(self, name, variant, count, repeat, func):
+        """Выводит количество строк в секунду по лучшему из repeat запусков func."""
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        self.stdout.write(f"{name:<11} {variant:<6} {count / best:10.0f} строк/с  {best * 1000:8.1f} мс")
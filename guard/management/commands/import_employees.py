@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.forms import ValidationError
+
+from guard.importers import IMPORT_BATCH_SIZE, get_import_format, import_employees, read_rows
+
+
+class Command(BaseCommand):
+    help = 'Импортирует сотрудников из файла CSV или XLSX'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Путь к файлу CSV или XLSX')
+        parser.add_argument('--batch-size', type=int, default=IMPORT_BATCH_SIZE,
+                            help='Количество записей в одном запросе bulk_create')
+        parser.add_argument('--dry-run', action='store_true', help='Только проверить строки, ничего не сохраняя')
+
+    def handle(self, *args, **options):
+        try:
+            file_format = get_import_format(options['path'])
+            with open(options['path'], 'rb') as f:
+                report = import_employees(
+                    read_rows(f, file_format), batch_size=options['batch_size'], dry_run=options['dry_run']
+                )
+        except (ValidationError, OSError) as e:
+            raise CommandError(e.message if isinstance(e, ValidationError) else str(e))
+
+        for error in report['errors']:
+            self.stderr.write(f"Строка {error['row']}: {error['description']}")
+        action = 'проверено' if options['dry_run'] else 'импортировано'
+        self.stdout.write(self.style.SUCCESS(
+            f"Готово. Строк: {report['total']}, {action} сотрудников: {report['created']}, "
+            f"с ошибками: {report['failed']}"
+        ))
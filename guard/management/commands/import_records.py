@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.forms import ValidationError
+
+from guard.importers import IMPORT_BATCH_SIZE, get_import_format, import_educations, import_meds, read_rows
+
+# Виды импортируемых записей: вид → (функция импорта, название во множественном числе)
+RECORD_KINDS = {
+    'med': (import_meds, 'медосмотров'),
+    'education': (import_educations, 'записей об обучении'),
+}
+
+
+class Command(BaseCommand):
+    help = 'Импортирует медосмотры или записи об обучении из файла CSV или XLSX'
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=RECORD_KINDS, help='Вид записей: med или education')
+        parser.add_argument('path', help='Путь к файлу CSV или XLSX')
+        parser.add_argument('--batch-size', type=int, default=IMPORT_BATCH_SIZE,
+                            help='Количество записей в одном запросе bulk_create')
+        parser.add_argument('--dry-run', action='store_true', help='Только проверить строки, ничего не сохраняя')
+
+    def handle(self, *args, **options):
+        import_rows, name = RECORD_KINDS[options['kind']]
+        try:
+            file_format = get_import_format(options['path'])
+            with open(options['path'], 'rb') as f:
+                report = import_rows(
+                    read_rows(f, file_format), batch_size=options['batch_size'], dry_run=options['dry_run']
+                )
+        except (ValidationError, OSError) as e:
+            raise CommandError(e.message if isinstance(e, ValidationError) else str(e))
+
+        for result in report['rows']:
+            if result['status'] == 'ERROR':
+                self.stderr.write(f"Строка {result['row']}: {result['description']}")
+        action = 'проверено' if options['dry_run'] else 'импортировано'
+        self.stdout.write(self.style.SUCCESS(
+            f"Готово. Строк: {report['total']}, {action} {name}: {report['created']}, "
+            f"с ошибками: {report['failed']}"
+        ))
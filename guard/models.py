@@ -1,3 +1,6 @@
+import hashlib
+import mimetypes
+import uuid
 from datetime import date
 from django.db import models
 from django.contrib.auth.models import User
@@ -43,6 +46,12 @@ class Employee(models.Model):
     class Meta:
         verbose_name = 'Сотрудники'
         verbose_name_plural = 'Сотрудники'
+        indexes = [
+            models.Index(fields=['FIO', 'id']),
+            models.Index(fields=['birthday']),
+            models.Index(fields=['gender', 'is_edu', 'status', 'birthday']),
+            models.Index(fields=['is_edu', 'status', 'birthday']),
+        ]
     
     def get_age(self):
         today = date.today()
@@ -84,7 +93,7 @@ class Education(models.Model):
         verbose_name = 'Обучение'
         verbose_name_plural = 'Обучение'
         indexes = [
-            models.Index(fields=['date_to']),
+            models.Index(fields=['date_to', 'id']),
         ]
 
     def __str__(self):
@@ -107,7 +116,7 @@ class Med(models.Model):
         verbose_name = 'Медосмотры'
         verbose_name_plural = 'Медосмотры'
         indexes = [
-            models.Index(fields=['date_to']),
+            models.Index(fields=['date_to', 'id']),
         ]
 
     def __str__(self):
@@ -126,8 +135,79 @@ class Notification(models.Model):
         indexes = [
             models.Index(fields=['user', 'med', 'is_read']),
             models.Index(fields=['user', 'education', 'is_read']),
+            models.Index(fields=['user', 'is_read', 'id']),
+        ]
+
+class NotificationReadState(models.Model):
+    """
+    Курсор прочтения уведомлений пользователя.
+
+    Все уведомления с ID не больше last_read_id считаются прочитанными; уведомления,
+    прочитанные выше курсора по одному, хранятся в NotificationRead.
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='notification_read_state',
+                                verbose_name="Пользователь")
+    last_read_id = models.BigIntegerField(default=0, verbose_name="ID последнего прочитанного уведомления")
+
+    class Meta:
+        verbose_name = 'Курсор прочтения уведомлений'
+        verbose_name_plural = 'Курсоры прочтения уведомлений'
+
+    def __str__(self):
+        return f"{self.user} ({self.last_read_id})"
+
+class NotificationRead(models.Model):
+    """Уведомление, прочитанное пользователем выше его курсора NotificationReadState."""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='notification_reads',
+                             verbose_name="Пользователь")
+    notification = models.ForeignKey(Notification, on_delete=models.CASCADE, related_name='reads',
+                                     verbose_name="Уведомление")
+
+    class Meta:
+        verbose_name = 'Прочитанное уведомление'
+        verbose_name_plural = 'Прочитанные уведомления'
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'notification'], name='unique_notification_read'),
+        ]
+
+class ArchivedNotification(models.Model):
+    """Копия уведомления, удалённого из Notification по сроку хранения."""
+    notification_id = models.BigIntegerField(unique=True, verbose_name="ID уведомления")
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='archived_notifications',
+                             verbose_name="Пользователь")
+    message = models.TextField(verbose_name="Текст")
+    is_read = models.BooleanField(default=False, verbose_name="Прочитано")
+    created_at = models.DateTimeField(verbose_name="Дата создания")
+    med_id = models.BigIntegerField(null=True, blank=True, verbose_name="ID медосмотра")
+    education_id = models.BigIntegerField(null=True, blank=True, verbose_name="ID обучения")
+    archived_at = models.DateTimeField(auto_now_add=True, verbose_name="Дата архивации")
+
+    class Meta:
+        verbose_name = 'Архивное уведомление'
+        verbose_name_plural = 'Архивные уведомления'
+        indexes = [
+            models.Index(fields=['user', 'created_at']),
         ]
 
+    def __str__(self):
+        return f"{self.notification_id} ({self.user})"
+
+class NotificationStats(models.Model):
+    """Снимок размера таблиц уведомлений, сохраняемый после применения политики хранения."""
+    recorded_at = models.DateTimeField(auto_now_add=True, db_index=True, verbose_name="Дата снимка")
+    notifications = models.PositiveIntegerField(verbose_name="Уведомлений")
+    read_exceptions = models.PositiveIntegerField(verbose_name="Отметок о прочтении")
+    archived = models.PositiveIntegerField(verbose_name="Архивных уведомлений")
+    table_bytes = models.BigIntegerField(null=True, blank=True, verbose_name="Размер таблицы уведомлений (байт)")
+
+    class Meta:
+        verbose_name = 'Статистика уведомлений'
+        verbose_name_plural = 'Статистика уведомлений'
+        ordering = ['-recorded_at']
+
+    def __str__(self):
+        return f"{self.recorded_at:%d.%m.%Y %H:%M}: {self.notifications}"
+
 class FileAttachment(models.Model):
     FILE_TYPES = [
         ('med', 'Медосмотр'),
@@ -137,6 +217,9 @@ class FileAttachment(models.Model):
     file = models.FileField(upload_to='attachments/%Y/%m/%d/', verbose_name="Файл")
     file_type = models.CharField(max_length=10, choices=FILE_TYPES, verbose_name="Тип записи")
     uploaded_at = models.DateTimeField(auto_now_add=True, verbose_name="Дата загрузки")
+    size = models.BigIntegerField(null=True, blank=True, verbose_name="Размер файла (байт)")
+    content_type = models.CharField(max_length=255, blank=True, default='', verbose_name="MIME-тип")
+    sha256 = models.CharField(max_length=64, blank=True, default='', verbose_name="SHA-256")
     
     # Связи с моделями Med и Education (может быть только одна из них)
     med = models.ForeignKey(
@@ -159,6 +242,10 @@ class FileAttachment(models.Model):
     class Meta:
         verbose_name = 'Прикрепленный файл'
         verbose_name_plural = 'Прикрепленные файлы'
+        indexes = [
+            # Поиск других вложений с тем же файлом при удалении (общий скан группового протокола)
+            models.Index(fields=['file']),
+        ]
         constraints = [
             models.CheckConstraint(
                 check=models.Q(med__isnull=False) | models.Q(education__isnull=False),
@@ -170,9 +257,48 @@ class FileAttachment(models.Model):
             ),
         ]
 
+    def save(self, *args, **kwargs):
+        if self.file and not self.sha256:
+            self.fill_file_metadata()
+        super().save(*args, **kwargs)
+
+    def fill_file_metadata(self):
+        """
+        Fills size, content_type and sha256 from the file contents.
+
+        The file is read in chunks, so large files are not loaded into memory.
+        Raises FileNotFoundError if the stored file is missing.
+        """
+        hasher = hashlib.sha256()
+        self.file.open('rb')
+        try:
+            for chunk in self.file.chunks():
+                hasher.update(chunk)
+        finally:
+            if self.file._committed:
+                self.file.close()
+        self.size = self.file.size
+        self.sha256 = hasher.hexdigest()
+        uploaded_type = getattr(self.file.file, 'content_type', None) if not self.file._committed else None
+        self.content_type = (
+            mimetypes.guess_type(self.file.name)[0] or uploaded_type or 'application/octet-stream'
+        )
+
+    @staticmethod
+    def format_size(size_bytes):
+        """Converts a size in bytes to a human-readable string (e.g., '1.2 MB')."""
+        for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
+            if size_bytes < 1024:
+                return f"{size_bytes:.1f} {unit}"
+            size_bytes /= 1024
+        return f"{size_bytes:.1f} PB"  # In case of extremely large files
+
     def get_file_size(self, human_readable=True):
         """
         Returns the size of the file in bytes or in a human-readable format.
+
+        The size stored at upload time is used; the storage backend is only queried
+        for rows that have not been backfilled yet.
         
         Args:
             human_readable (bool): If True, returns size in a human-readable format (e.g., '1.2 MB').
@@ -183,19 +309,50 @@ class FileAttachment(models.Model):
             Returns None if the file does not exist.
         """
         try:
-            if self.file and hasattr(self.file, 'size'):
-                size_bytes = self.file.size
+            if self.size is not None or (self.file and hasattr(self.file, 'size')):
+                size_bytes = self.size if self.size is not None else self.file.size
                 if human_readable:
-                    # Convert to human-readable format
-                    for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
-                        if size_bytes < 1024:
-                            return f"{size_bytes:.1f} {unit}"
-                        size_bytes /= 1024
-                    return f"{size_bytes:.1f} PB"  # In case of extremely large files
+                    return self.format_size(size_bytes)
                 return size_bytes
             return None
         except FileNotFoundError:
             return None
 
     def __str__(self):
-        return f"{self.file.name} ({self.get_file_type_display()})"
\ No newline at end of file
+        return f"{self.file.name} ({self.get_file_type_display()})"
+
+class DocumentJob(models.Model):
+    """Фоновое задание на генерацию документов и его результат."""
+    STATUS_CHOICES = [
+        ('pending', 'В очереди'),
+        ('running', 'Выполняется'),
+        ('success', 'Готово'),
+        ('failure', 'Ошибка'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='document_jobs', verbose_name="Пользователь")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending', verbose_name="Статус")
+    payload = models.JSONField(verbose_name="Параметры задания")
+    total = models.PositiveIntegerField(default=0, verbose_name="Всего документов")
+    processed = models.PositiveIntegerField(default=0, verbose_name="Готово документов")
+    file = models.FileField(upload_to='jobs/%Y/%m/%d/', blank=True, verbose_name="Результат")
+    filename = models.CharField(max_length=255, blank=True, default='', verbose_name="Имя файла")
+    error = models.TextField(blank=True, default='', verbose_name="Ошибка")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Дата создания")
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name="Дата завершения")
+    expires_at = models.DateTimeField(verbose_name="Хранится до")
+
+    class Meta:
+        verbose_name = 'Задание на генерацию документов'
+        verbose_name_plural = 'Задания на генерацию документов'
+        indexes = [
+            models.Index(fields=['expires_at']),
+        ]
+
+    def get_progress(self):
+        """Возвращает долю готовых документов от 0 до 1."""
+        return self.processed / self.total if self.total else 0
+
+    def __str__(self):
+        return f"{self.id} ({self.get_status_display()})"
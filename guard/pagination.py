@@ -0,0 +1,99 @@
+import base64
+import binascii
+import json
+
+from django.db.models import Q
+from django.forms import ValidationError
+
+# Размер страницы по умолчанию и максимально допустимый
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+
+def encode_cursor(values):
+    """Кодирует значения ключа последней записи страницы в непрозрачный курсор."""
+    raw = json.dumps(values, default=str, ensure_ascii=False).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii')
+
+
+def decode_cursor(cursor, size):
+    """Декодирует курсор в список значений ключа длиной size."""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+    except (ValueError, UnicodeError, binascii.Error):
+        raise ValidationError('Неверный курсор')
+    if not isinstance(values, list) or len(values) != size:
+        raise ValidationError('Неверный курсор')
+    return values
+
+
+def get_page_size(value, default=DEFAULT_PAGE_SIZE, maximum=MAX_PAGE_SIZE):
+    """Проверяет параметр limit и возвращает размер страницы."""
+    if value in (None, ''):
+        return default
+    try:
+        limit = int(value)
+    except (ValueError, TypeError):
+        raise ValidationError('limit должен быть целым числом')
+    if limit < 1 or limit > maximum:
+        raise ValidationError(f'limit должен быть от 1 до {maximum}')
+    return limit
+
+
+def get_ordering(value, orderings, default):
+    """Возвращает поля ключа сортировки по её имени из словаря orderings."""
+    value = value or default
+    if value not in orderings:
+        raise ValidationError(f"Сортировка должна быть одной из: {', '.join(orderings)}")
+    return orderings[value]
+
+
+def keyset_filter(fields, values):
+    """
+    Строит условие «строго после (values)» для сортировки по fields.
+
+    Поле с префиксом «-» сортируется по убыванию.
+    """
+    condition = Q()
+    for i, field in enumerate(fields):
+        name = field.lstrip('-')
+        lookup = 'lt' if field.startswith('-') else 'gt'
+        step = Q(**{f'{name}__{lookup}': values[i]})
+        for prev_field, prev_value in zip(fields[:i], values[:i]):
+            step &= Q(**{prev_field.lstrip('-'): prev_value})
+        condition |= step
+    return condition
+
+
+def _resolve(obj, field):
+    # Строки .values() содержат значения связанных полей под ключами вида owner__FIO
+    if isinstance(obj, dict):
+        return obj[field.lstrip('-')]
+    for attr in field.lstrip('-').split('__'):
+        obj = getattr(obj, attr)
+    return obj
+
+
+def after_cursor(queryset, fields, cursor=None):
+    """Сортирует записи по fields и, если задан курсор, оставляет только записи после него."""
+    queryset = queryset.order_by(*fields)
+    if cursor:
+        queryset = queryset.filter(keyset_filter(fields, decode_cursor(cursor, len(fields))))
+    return queryset
+
+
+def paginate_keyset(queryset, fields, cursor=None, limit=DEFAULT_PAGE_SIZE):
+    """
+    Возвращает страницу записей и курсор следующей страницы.
+
+    Последнее поле в fields должно быть уникальным (обычно id), чтобы порядок был однозначным;
+    поле с префиксом «-» сортируется по убыванию.
+    Если следующей страницы нет, курсор равен None.
+    """
+    queryset = after_cursor(queryset, fields, cursor)
+    items = list(queryset[:limit + 1])
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        next_cursor = encode_cursor([_resolve(items[-1], field) for field in fields])
+    return items, next_cursor
@@ -0,0 +1,92 @@
+import logging
+import re
+
+from django.contrib.postgres.lookups import TrigramWordSimilar
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.db import DatabaseError, connections
+from django.db.models import Case, F, IntegerField, Q, Value, When
+
+from .models import Employee
+
+logger = logging.getLogger(__name__)
+
+# Максимальное количество сотрудников в результатах поиска по умолчанию
+SEARCH_LIMIT = 50
+# Имя GIN-индекса по триграммам ФИО
+TRIGRAM_INDEX_NAME = 'guard_employee_fio_trgm'
+
+# Кэш наличия расширения pg_trgm для каждого подключения
+_trigram_available = {}
+
+
+def ensure_trigram_index(connection):
+    """Создаёт расширение pg_trgm и GIN-индекс по ФИО сотрудников (только PostgreSQL)."""
+    if connection.vendor != 'postgresql':
+        return
+    table = connection.ops.quote_name(Employee._meta.db_table)
+    column = connection.ops.quote_name(Employee._meta.get_field('FIO').column)
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+            cursor.execute(
+                f'CREATE INDEX IF NOT EXISTS {TRIGRAM_INDEX_NAME} '
+                f'ON {table} USING gin ({column} gin_trgm_ops)'
+            )
+    except DatabaseError as e:
+        logger.warning(f"Trigram index was not created, falling back to icontains search: {str(e)}")
+    _trigram_available.pop(connection.alias, None)
+
+
+def trigram_search_available(connection):
+    """Проверяет, доступен ли нечёткий поиск по триграммам в базе данных."""
+    if connection.vendor != 'postgresql':
+        return False
+    if connection.alias not in _trigram_available:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+            _trigram_available[connection.alias] = cursor.fetchone() is not None
+    return _trigram_available[connection.alias]
+
+
+def search_queryset(query, using='default'):
+    """
+    Возвращает QuerySet поиска сотрудников по ФИО с ранжированием.
+
+    В PostgreSQL с pg_trgm находит сотрудников, у которых каждое слово запроса является
+    началом фамилии, имени или отчества, а также похожих по триграммам (с опечатками).
+    Совпадения по началу слов идут первыми, далее — по убыванию сходства.
+    В остальных базах данных выполняется поиск подстроки без учёта регистра.
+    """
+    query = ' '.join(query.split())
+    employees = Employee.objects.using(using)
+    if not query:
+        employees = employees.order_by('FIO', 'id')
+    elif not trigram_search_available(connections[using]):
+        employees = employees.filter(FIO__icontains=query).order_by('FIO', 'id')
+    else:
+        prefix_match = Q()
+        for token in query.split():
+            prefix_match &= Q(FIO__iregex=rf'(^|\s){re.escape(token)}')
+
+        employees = (
+            employees
+            .filter(prefix_match | Q(TrigramWordSimilar(F('FIO'), query)))
+            .annotate(
+                is_prefix=Case(When(prefix_match, then=Value(1)), default=Value(0), output_field=IntegerField()),
+                rank=TrigramWordSimilarity(query, 'FIO'),
+            )
+            .order_by('-is_prefix', '-rank', 'FIO', 'id')
+        )
+    return employees
+
+
+def search_employees(query, limit=SEARCH_LIMIT, using='default', fields=None):
+    """
+    Ищет сотрудников по ФИО (см. search_queryset) и возвращает не больше limit результатов.
+
+    Если переданы fields, возвращаются строки .values(*fields) вместо объектов.
+    """
+    employees = search_queryset(query, using)
+    if fields:
+        employees = employees.values(*fields)
+    return list(employees[:limit])
@@ -0,0 +1,177 @@
+import orjson
+from django.http import HttpResponse
+
+from .models import Education, Employee, FileAttachment, Med
+
+# Подписи значений choices: код → отображаемое название
+GENDER_LABELS = dict(Employee.GENDER_CHOICES)
+EMPLOYEE_STATUS_LABELS = dict(Employee.STATUS_CHOICES)
+MED_TYPE_LABELS = dict(Med.TYPE_CHOICHES)
+PROGRAM_LABELS = dict(Education.PROGRAM_CHOICES)
+
+# Поля, которые запрашиваются через .values() для сериализации записей
+EMPLOYEE_FIELDS = (
+    'id', 'FIO', 'gender', 'birthday', 'position', 'department',
+    'oms_number', 'dms_number', 'is_edu', 'status',
+)
+MED_FIELDS = ('id', 'owner__FIO', 'type', 'date_from', 'date_to')
+EDUCATION_FIELDS = (
+    'id', 'owner__FIO', 'program', 'protocol_num', 'udostoverenie_num', 'hours', 'date_from', 'date_to',
+)
+ATTACHMENT_FIELDS = ('id', 'file', 'size', 'uploaded_at')
+
+# MIME-тип NDJSON (один JSON-объект в строке)
+NDJSON_CONTENT_TYPE = 'application/x-ndjson'
+# Количество строк, которое читается из курсора и сериализуется за один раз в режиме NDJSON
+NDJSON_CHUNK_SIZE = 1000
+
+_storage = FileAttachment._meta.get_field('file').storage
+
+
+class FastJsonResponse(HttpResponse):
+    """Аналог JsonResponse, который кодирует данные через orjson."""
+
+    def __init__(self, data, **kwargs):
+        kwargs.setdefault('content_type', 'application/json')
+        super().__init__(content=orjson.dumps(data), **kwargs)
+
+
+def stream_ndjson(queryset, serialize, chunk_size=NDJSON_CHUNK_SIZE):
+    """
+    Генератор NDJSON: по одному JSON-объекту на строку.
+
+    Строки queryset (.values()) читаются через серверный курсор и сериализуются функцией
+    serialize частями по chunk_size, поэтому вложения запрашиваются одним запросом на часть,
+    а в памяти одновременно находится не больше одной части.
+    """
+    batch = []
+    for row in queryset.iterator(chunk_size=chunk_size):
+        batch.append(row)
+        if len(batch) >= chunk_size:
+            yield b''.join(orjson.dumps(item, option=orjson.OPT_APPEND_NEWLINE) for item in serialize(batch))
+            batch = []
+    if batch:
+        yield b''.join(orjson.dumps(item, option=orjson.OPT_APPEND_NEWLINE) for item in serialize(batch))
+
+
+def format_date(value):
+    """Форматирует дату как ДД.ММ.ГГГГ (None остаётся None)."""
+    if value is None:
+        return None
+    return f'{value.day:02d}.{value.month:02d}.{value.year:04d}'
+
+
+def format_iso_date(value):
+    """Форматирует дату как ГГГГ-ММ-ДД для полей ввода даты (None остаётся None)."""
+    return value.isoformat() if value is not None else None
+
+
+def format_datetime(value):
+    """Форматирует дату и время как ДД.ММ.ГГГГ ЧЧ:ММ (None остаётся None)."""
+    if value is None:
+        return None
+    return f'{value.day:02d}.{value.month:02d}.{value.year:04d} {value.hour:02d}:{value.minute:02d}'
+
+
+def calculate_age(birthday, today):
+    """Возвращает полный возраст на дату today."""
+    return today.year - birthday.year - ((today.month, today.day) < (birthday.month, birthday.day))
+
+
+def serialize_employees(rows, today):
+    """
+    Сериализует сотрудников из строк .values(*EMPLOYEE_FIELDS).
+
+    Если в строке есть аннотация age, возраст берётся из неё, иначе вычисляется на дату today.
+    """
+    return [{
+        'id': row['id'],
+        'FIO': row['FIO'],
+        'gender': GENDER_LABELS.get(row['gender'], row['gender']),
+        'birthday': format_date(row['birthday']),
+        'age': row['age'] if 'age' in row else calculate_age(row['birthday'], today),
+        'position': row['position'],
+        'department': row['department'],
+        'oms_number': row['oms_number'],
+        'dms_number': row['dms_number'],
+        'is_edu': row['is_edu'],
+        'status': EMPLOYEE_STATUS_LABELS.get(row['status'], row['status']),
+        'status_code': row['status'],
+    } for row in rows]
+
+
+def get_attachment_size(row):
+    """
+    Возвращает размер вложения в читаемом виде («1.2 KB»), как FileAttachment.get_file_size().
+
+    Размер берётся из базы данных или, если он не сохранён, из хранилища.
+    """
+    if not row['file']:
+        return 0
+    size = row['size']
+    if size is None:
+        try:
+            size = _storage.size(row['file'])
+        except FileNotFoundError:
+            return None
+    return FileAttachment.format_size(size)
+
+
+def serialize_attachments(rows):
+    """Сериализует вложения из строк .values(*ATTACHMENT_FIELDS)."""
+    return [{
+        'id': row['id'],
+        'name': row['file'].rsplit('/', 1)[-1] if row['file'] else f"file_{row['id']}",
+        'url': _storage.url(row['file']) if row['file'] else '',
+        'size': get_attachment_size(row),
+        'uploaded_at': format_datetime(row['uploaded_at']),
+    } for row in rows]
+
+
+def attachments_by_record(field, record_ids):
+    """
+    Возвращает вложения записей Med или Education одним запросом: {ID записи: [вложение, ...]}.
+
+    field — имя связи во FileAttachment ('med' или 'education').
+    """
+    key = f'{field}_id'
+    rows = list(
+        FileAttachment.objects.filter(**{f'{key}__in': record_ids}).order_by('id').values(key, *ATTACHMENT_FIELDS)
+    )
+    grouped = {}
+    for row, attachment in zip(rows, serialize_attachments(rows)):
+        grouped.setdefault(row[key], []).append(attachment)
+    return grouped
+
+
+def serialize_meds(rows, date_format=format_date):
+    """Сериализует медосмотры из строк .values(*MED_FIELDS) вместе с вложениями."""
+    rows = list(rows)
+    attachments = attachments_by_record('med', [row['id'] for row in rows]) if rows else {}
+    return [{
+        'id': row['id'],
+        'owner': row['owner__FIO'],
+        'type': MED_TYPE_LABELS.get(row['type'], row['type']),
+        'type_code': row['type'],
+        'date_from': date_format(row['date_from']),
+        'date_to': date_format(row['date_to']),
+        'attachments': attachments.get(row['id'], []),
+    } for row in rows]
+
+
+def serialize_educations(rows, date_format=format_date):
+    """Сериализует записи об обучении из строк .values(*EDUCATION_FIELDS) вместе с вложениями."""
+    rows = list(rows)
+    attachments = attachments_by_record('education', [row['id'] for row in rows]) if rows else {}
+    return [{
+        'id': row['id'],
+        'owner': row['owner__FIO'],
+        'program': PROGRAM_LABELS.get(row['program'], row['program']),
+        'program_type': row['program'],
+        'protocol_num': row['protocol_num'],
+        'udostoverenie_num': row['udostoverenie_num'],
+        'hours': row['hours'],
+        'date_from': date_format(row['date_from']),
+        'date_to': date_format(row['date_to']),
+        'attachments': attachments.get(row['id'], []),
+    } for row in rows]
@@ -0,0 +1,54 @@
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models.signals import post_delete, post_migrate, post_save
+from django.dispatch import receiver
+
+from .dashboard import invalidate_dashboard
+from .models import Education, Employee, Med, Notification
+from .search import ensure_trigram_index
+from .tasks import bump_notification_version, refresh_record_notification
+
+
+@receiver(post_save, sender=Med)
+@receiver(post_save, sender=Education)
+def refresh_notification_on_save(sender, instance, raw=False, **kwargs):
+    """Обновляет уведомление сохранённой записи без полного пересчёта."""
+    if raw:
+        return
+    refresh_record_notification(instance)
+
+
+# Уведомления могут быть уже удалены каскадно вместе с записью,
+# поэтому версия набора уведомлений увеличивается без проверки количества удалённых строк
+@receiver(post_delete, sender=Med)
+def delete_med_notifications(sender, instance, **kwargs):
+    """Удаляет уведомления удалённого медосмотра."""
+    Notification.objects.filter(med_id=instance.pk).delete()
+    bump_notification_version()
+
+
+@receiver(post_delete, sender=Education)
+def delete_education_notifications(sender, instance, **kwargs):
+    """Удаляет уведомления удалённого обучения."""
+    Notification.objects.filter(education_id=instance.pk).delete()
+    bump_notification_version()
+
+
+# Сводка группирует обучение по подразделению сотрудника, поэтому учитываются и изменения сотрудников
+@receiver(post_save, sender=Med)
+@receiver(post_save, sender=Education)
+@receiver(post_save, sender=Employee)
+@receiver(post_delete, sender=Med)
+@receiver(post_delete, sender=Education)
+def invalidate_dashboard_on_change(sender, raw=False, **kwargs):
+    """Сбрасывает сводку по срокам после изменения медосмотров, обучений и сотрудников."""
+    if raw:
+        return
+    invalidate_dashboard()
+
+
+@receiver(post_migrate)
+def create_trigram_index(sender, using=DEFAULT_DB_ALIAS, **kwargs):
+    """Создаёт индекс для нечёткого поиска сотрудников после применения миграций."""
+    if sender.name != 'guard':
+        return
+    ensure_trigram_index(connections[using])
@@ -22,6 +22,7 @@ const API_ENDPOINTS = {
   WORKER_SEARCH: `${SERVER}/worker/search/`,
   FIO: `${SERVER}/worker/personal/FIO/`,
   FILTER: `${SERVER}/worker/filter`,
+  WORKER_PAGE: `${SERVER}/worker/page/`,
 
   // Работа с медицинскими осмотрами
   MED_DATA: `${SERVER}/worker/med/`,
@@ -39,6 +40,11 @@ const API_ENDPOINTS = {
 
   // Генерация направления
   NAPRAV: `${SERVER}/generate-naprav/`,
+
+  // Уведомления
+  NOTIFICATIONS: `${SERVER}/notifications`,
+  NOTIFICATION_STREAM: `${SERVER}/notifications/stream`,
+  NOTIFICATIONS_READ: `${SERVER}/notifications/read`,
 };
 
 /**
@@ -72,43 +78,67 @@ function showNotification(message, type = 'error') {
 }
 
 /**
- * Загружает уведомления с сервера и обновляет меню уведомлений
+ * Состояние уведомлений, загруженных с сервера
+ * etag - ETag последнего ответа, lastId - ID самого нового уведомления
+ */
+const notificationsState = {
+  etag: null,
+  lastId: 0,
+  items: [],
+};
+
+/**
+ * Загружает уведомления с сервера и обновляет меню уведомлений.
+ * Повторные запросы передают If-None-Match и since, поэтому при отсутствии
+ * изменений сервер отвечает 304, а при изменениях присылает только новые уведомления.
+ * @param {boolean} [full=false] - Загрузить полный список, а не только новые уведомления
  * @returns {Promise<void>}
  */
-async function fetchNotifications() {
+async function fetchNotifications(full = false) {
   const $notificationMenu = $('#notificationMenu');
-  const $notificationCount = $('#notificationCount');
+  const isDelta = !full && notificationsState.etag !== null;
 
-  // Показываем индикатор загрузки
-  $notificationMenu.html(`
-    <li class="dropdown-item text-center">
-      <div class="d-flex justify-content-center align-items-center">
-        <div class="spinner-border spinner-border-sm text-primary me-2" role="status">
-          <span class="visually-hidden">Загрузка...</span>
+  // Индикатор загрузки показываем только при первой загрузке
+  if (notificationsState.etag === null) {
+    $notificationMenu.html(`
+      <li class="dropdown-item text-center">
+        <div class="d-flex justify-content-center align-items-center">
+          <div class="spinner-border spinner-border-sm text-primary me-2" role="status">
+            <span class="visually-hidden">Загрузка...</span>
+          </div>
+          <span>Загрузка уведомлений...</span>
         </div>
-        <span>Загрузка уведомлений...</span>
-      </div>
-    </li>
-  `);
+      </li>
+    `);
+  }
 
   try {
-    const { status, notifications, count } = await sendGetRequest('/notifications');
-    if (status === 'SUCCESS') {
-      $notificationMenu.empty();
-      if (count > 0) {
-        notifications.forEach((notification) => {
-          $notificationMenu.append(
-            `<a class="dropdown-item" href="#">${notification.message}</a>`
-          );
-        });
-        $notificationCount.text(count);
-      } else {
-        $notificationMenu.append(
-          '<div class="dropdown-item text-center">Нет новых уведомлений</div>'
-        );
-        $notificationCount.text('0');
-      }
+    const url = isDelta
+      ? `${API_ENDPOINTS.NOTIFICATIONS}?since=${notificationsState.lastId}`
+      : API_ENDPOINTS.NOTIFICATIONS;
+    const response = await fetch(url, {
+      method: 'GET',
+      cache: 'no-store',
+      headers: isDelta ? { 'If-None-Match': notificationsState.etag } : {},
+    });
+
+    if (response.status === 304) {
+      return;
+    }
+    if (!response.ok) {
+      throw new Error(`HTTP ошибка! Статус: ${response.status}`);
+    }
+
+    const data = await response.json();
+    if (data.status !== 'SUCCESS') {
+      return;
     }
+
+    if (!applyNotifications(data, isDelta)) {
+      await fetchNotifications(true);
+      return;
+    }
+    notificationsState.etag = response.headers.get('ETag');
   } catch (error) {
     console.error('Ошибка при загрузке уведомлений:', error);
     $notificationMenu.empty().append(
@@ -118,6 +148,99 @@ async function fetchNotifications() {
   }
 }
 
+/**
+ * Добавляет полученные уведомления к уже загруженным и перерисовывает меню
+ * @param {{notifications: Array<object>, count: number, last_id: number}} data - Ответ сервера
+ * @param {boolean} isDelta - Ответ содержит только новые уведомления
+ * @returns {boolean} false, если часть уведомлений удалена или заменена и нужен полный список
+ */
+function applyNotifications(data, isDelta) {
+  let items = data.notifications;
+  if (isDelta) {
+    const knownIds = new Set(notificationsState.items.map((notification) => notification.id));
+    items = items.filter((notification) => !knownIds.has(notification.id)).concat(notificationsState.items);
+    if (items.length !== data.count) {
+      return false;
+    }
+  }
+  notificationsState.items = items;
+  notificationsState.lastId = Math.max(notificationsState.lastId, data.last_id);
+  renderNotifications(items);
+  return true;
+}
+
+/**
+ * Подписывается на поток уведомлений (Server-Sent Events).
+ * Если сервер не поддерживает поток или соединение разорвано, уведомления
+ * продолжают загружаться периодическим опросом.
+ * @returns {EventSource|null} Подключение к потоку или null, если браузер не поддерживает SSE
+ */
+function subscribeNotifications() {
+  if (!window.EventSource) {
+    return null;
+  }
+  const source = new EventSource(`${API_ENDPOINTS.NOTIFICATION_STREAM}?since=${notificationsState.lastId}`);
+  source.addEventListener('notifications', (event) => {
+    if (!applyNotifications(JSON.parse(event.data), true)) {
+      fetchNotifications(true);
+    }
+  });
+  return source;
+}
+
+/**
+ * Отмечает уведомления прочитанными и убирает их из меню
+ * @param {Array<number>|null} ids - ID уведомлений или null, чтобы отметить все загруженные
+ * @returns {Promise<void>}
+ */
+async function markNotificationsRead(ids = null) {
+  const body = ids === null ? { up_to: notificationsState.lastId } : { ids };
+  try {
+    const data = await sendPostRequest(API_ENDPOINTS.NOTIFICATIONS_READ, body);
+    if (data.status !== 'SUCCESS') {
+      return;
+    }
+    const readIds = new Set(ids || notificationsState.items.map((notification) => notification.id));
+    notificationsState.items = notificationsState.items.filter((notification) => !readIds.has(notification.id));
+    if (notificationsState.items.length !== data.count) {
+      await fetchNotifications(true);
+      return;
+    }
+    renderNotifications(notificationsState.items);
+  } catch (error) {
+    console.error('Ошибка при отметке уведомлений:', error);
+    showNotification('Не удалось отметить уведомления прочитанными', 'error');
+  }
+}
+
+/**
+ * Отображает уведомления в меню и обновляет счётчик
+ * @param {Array<object>} notifications - Список уведомлений
+ */
+function renderNotifications(notifications) {
+  const $notificationMenu = $('#notificationMenu');
+  const $notificationCount = $('#notificationCount');
+
+  $notificationMenu.empty();
+  if (notifications.length > 0) {
+    notifications.forEach((notification) => {
+      $notificationMenu.append(
+        `<a class="dropdown-item notification-item" href="#" data-id="${notification.id}">${notification.message}</a>`
+      );
+    });
+    $notificationMenu.append(
+      '<li><hr class="dropdown-divider"></li>' +
+      '<a class="dropdown-item text-center text-primary" href="#" id="markAllNotificationsRead">Отметить все прочитанными</a>'
+    );
+    $notificationCount.text(notifications.length);
+  } else {
+    $notificationMenu.append(
+      '<div class="dropdown-item text-center">Нет новых уведомлений</div>'
+    );
+    $notificationCount.text('0');
+  }
+}
+
 /**
  * @section HTTP-запросы
  * Функции для отправки запросов к серверу
@@ -163,6 +286,32 @@ async function sendGetRequest(url) {
   }
 }
 
+/**
+ * Загружает все страницы постраничного списка, следуя по курсору next_cursor
+ * @param {string} endpoint - URL списка
+ * @param {object} [params={}] - Дополнительные параметры запроса
+ * @returns {Promise<object>} Объект со статусом и объединёнными данными всех страниц
+ */
+async function fetchAllPages(endpoint, params = {}) {
+  const items = [];
+  let cursor = null;
+
+  do {
+    const url = new URL(endpoint);
+    Object.entries(params).forEach(([key, value]) => url.searchParams.set(key, value));
+    if (cursor) url.searchParams.set('cursor', cursor);
+
+    const { status, data, next_cursor } = await sendGetRequest(url);
+    if (status !== 'SUCCESS') {
+      return { status, data: items };
+    }
+    items.push(...data);
+    cursor = next_cursor;
+  } while (cursor);
+
+  return { status: 'SUCCESS', data: items };
+}
+
 /**
  * Отправляет POST-запрос к серверу
  * @param {string} url - URL для запроса
@@ -17,17 +17,26 @@ let selectedMedID = null;
 let selectedEducationID = null;
 
 /** @type {string} Тип сортировки сотрудников (asc/desc) */
-let sort_type = 'desc';
+let sort_type = 'asc';
 
 /** @type {Object} Параметры фильтрации сотрудников */
 let filter_query = {};
 
+/** @type {string|null} Курсор следующей страницы списка сотрудников (null — список загружен полностью) */
+let workersNextCursor = null;
+
+/** @type {boolean} Признак загрузки очередной страницы сотрудников */
+let workersLoading = false;
+
 /** @type {Array<jQuery>} Исходные строки таблицы медосмотров */
 let originalMedRows = [];
 
 /** @type {Array<jQuery>} Исходные строки таблицы обучений */
 let originalEduRows = [];
 
+/** @type {EventSource|null} Подключение к потоку уведомлений */
+let notificationStream = null;
+
 // === Константы ===
 /** @type {number} Количество столбцов в таблице медосмотров */
 const MED_TABLE_COLUMNS = 6;
@@ -38,15 +47,25 @@ const EDU_TABLE_COLUMNS = 9;
 /** @type {number} Интервал обновления уведомлений (в миллисекундах) */
 const NOTIFICATION_INTERVAL = 600000;
 
+/** @type {number} Расстояние до конца списка сотрудников, при котором подгружается следующая страница (в пикселях) */
+const WORKERS_SCROLL_THRESHOLD = 200;
+
 // === Инициализация ===
 /**
  * Инициализирует приложение при загрузке документа
  */
 $(document).ready(async function () {
+    workersNextCursor = $('#worker-container').data('next-cursor') || null;
     initEventHandlers();
     setupTableSorting();
     await fetchNotifications();
-    setInterval(fetchNotifications, NOTIFICATION_INTERVAL);
+    notificationStream = subscribeNotifications();
+    // Опрос остаётся запасным вариантом, пока поток уведомлений не подключён
+    setInterval(() => {
+        if (!notificationStream || notificationStream.readyState !== EventSource.OPEN) {
+            fetchNotifications();
+        }
+    }, NOTIFICATION_INTERVAL);
 });
 
 // === Обработчики событий ===
@@ -83,8 +102,11 @@ function initEventHandlers() {
     $('#nav-education-tab').click(handleEducationTabClick);
 
     // Сортировка сотрудников
-    $('#asc-sort').click(() => sortWorkersByFIO('asc'));
-    $('#desc-sort').click(() => sortWorkersByFIO('desc'));
+    $('#asc-sort').click(() => handleSortClick('asc'));
+    $('#desc-sort').click(() => handleSortClick('desc'));
+
+    // Подгрузка сотрудников при прокрутке списка
+    $('#worker-container').on('scroll', handleWorkersScroll);
 
     // Фильтрация сотрудников
     $('#all').click(() => filterWorkers({ gender: '' }));
@@ -122,7 +144,15 @@ function initEventHandlers() {
     $('#eduDateFrom, #eduDateTo').on('change', filterEduTable);
 
     // Обновление уведомлений
-    $(document).on('updateNotify', fetchNotifications);
+    $(document).on('updateNotify', () => fetchNotifications());
+    $('#notificationMenu').on('click', '.notification-item', function (e) {
+        e.preventDefault();
+        markNotificationsRead([$(this).data('id')]);
+    });
+    $('#notificationMenu').on('click', '#markAllNotificationsRead', (e) => {
+        e.preventDefault();
+        markNotificationsRead();
+    });
 }
 
 /**
@@ -233,8 +263,7 @@ async function handleAllMedClick() {
     $('#allMedModal').modal('show');
 
     try {
-        const url = new URL(API_ENDPOINTS.MED);
-        const { data, status } = await sendGetRequest(url);
+        const { data, status } = await fetchAllPages(API_ENDPOINTS.MED);
 
         if (status === 'SUCCESS') {
             renderMedTable(data);
@@ -262,8 +291,7 @@ async function handleAllEduClick() {
     $('#allEduModal').modal('show');
 
     try {
-        const url = new URL(API_ENDPOINTS.EDU);
-        const { data, status } = await sendGetRequest(url);
+        const { data, status } = await fetchAllPages(API_ENDPOINTS.EDU);
 
         if (status === 'SUCCESS') {
             renderEduTable(data);
@@ -334,19 +362,50 @@ function handleEduRowClick(event) {
     $row.addClass('selected-row').siblings().removeClass('selected-row');
 }
 
+/**
+ * Обработчик выбора порядка сортировки сотрудников
+ * @param {string} order - Порядок сортировки (asc/desc)
+ */
+async function handleSortClick(order) {
+    if (workersNextCursor) {
+        // Список загружен не полностью — сортировка выполняется на сервере
+        sort_type = order;
+        await loadWorkersPage(true);
+    } else {
+        sortWorkersByFIO(order);
+    }
+}
+
+/**
+ * Обработчик прокрутки списка сотрудников
+ */
+async function handleWorkersScroll() {
+    const container = this;
+    if (container.scrollTop + container.clientHeight >= container.scrollHeight - WORKERS_SCROLL_THRESHOLD) {
+        await loadWorkersPage();
+    }
+}
+
 /**
  * Обработчик ввода в поле поиска сотрудников
  */
 async function handleSearchInput() {
-    const query = $(this).val();
+    const query = $(this).val().trim();
     const url = new URL(API_ENDPOINTS.WORKER_SEARCH);
     const $container = $('#worker-container');
 
+    if (!query) {
+        // Пустой запрос — возвращаемся к постраничному списку
+        await loadWorkersPage(true);
+        return;
+    }
+
     $container.html('<div class="text-muted text-center">Загрузка списка сотрудников...</div>');
 
     try {
         const { employees } = await sendPostRequest(url, { query });
-        renderWorkers(employees);
+        // Результаты уже упорядочены по релевантности
+        renderWorkers(employees, false);
     } catch (error) {
         console.error('Ошибка при поиске сотрудников:', error);
         $container.html('<div class="text-muted text-center">Ошибка загрузки сотрудников</div>');
@@ -412,38 +471,47 @@ function renderEduTable(data) {
 /**
  * Отрисовывает список сотрудников
  * @param {Array<Object>} employees - Данные сотрудников
+ * @param {boolean} [sortByFIO=true] - Отсортировать список по ФИО
  */
-function renderWorkers(employees) {
+function renderWorkers(employees, sortByFIO = true) {
     const $container = $('#worker-container');
     $container.empty();
+    workersNextCursor = null;
 
     if (!employees.length) {
         $container.append('<div class="text-muted text-center">Нет сотрудников</div>');
         return;
     }
 
-    employees.forEach(el => {
-        const $worker = $('<div>', {
-            class: 'worker',
-            'data-id': el.id,
-            text: getInitials(el.FIO)
-        });
+    employees.forEach(el => $container.append(createWorkerElement(el)));
 
-        $worker.on('click', () => {
-            getWorkerData(el.id);
-            clickOnWorker($worker);
-        });
+    if (sortByFIO && $container.html()) {
+        sortWorkersByFIO(sort_type);
+    }
+}
 
-        if (worker_id && worker_id === $worker.data('id')) {
-            clickOnWorker($worker);
-        }
+/**
+ * Создаёт элемент списка сотрудников
+ * @param {Object} el - Данные сотрудника
+ * @returns {jQuery} Элемент сотрудника
+ */
+function createWorkerElement(el) {
+    const $worker = $('<div>', {
+        class: 'worker',
+        'data-id': el.id,
+        text: getInitials(el.FIO)
+    });
 
-        $container.append($worker);
+    $worker.on('click', () => {
+        getWorkerData(el.id);
+        clickOnWorker($worker);
     });
 
-    if ($container.html()) {
-        sortWorkersByFIO(sort_type);
+    if (worker_id && worker_id === $worker.data('id')) {
+        clickOnWorker($worker);
     }
+
+    return $worker;
 }
 
 /**
@@ -916,6 +984,34 @@ async function getEducationData(id) {
     }
 }
 
+/**
+ * Загружает следующую страницу списка сотрудников и добавляет её в конец списка
+ * @param {boolean} [reset=false] - Загрузить список заново с первой страницы
+ */
+async function loadWorkersPage(reset = false) {
+    if (workersLoading || (!reset && !workersNextCursor)) return;
+
+    const url = new URL(API_ENDPOINTS.WORKER_PAGE);
+    url.searchParams.set('order', sort_type);
+    if (!reset) url.searchParams.set('cursor', workersNextCursor);
+    const $container = $('#worker-container');
+
+    workersLoading = true;
+    try {
+        const { status, employees, next_cursor } = await sendGetRequest(url);
+        if (status === 'SUCCESS') {
+            if (reset) $container.empty();
+            employees.forEach(el => $container.append(createWorkerElement(el)));
+            workersNextCursor = next_cursor;
+        }
+    } catch (error) {
+        console.error('Ошибка при загрузке списка сотрудников:', error);
+        showNotification('Ошибка загрузки сотрудников', 'error');
+    } finally {
+        workersLoading = false;
+    }
+}
+
 /**
  * Фильтрует сотрудников по заданным параметрам
  * @param {Object} params - Параметры фильтрации
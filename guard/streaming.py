@@ -0,0 +1,46 @@
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+
+
+async def iterate_async(iterator):
+    """
+    Отдаёт части синхронного итератора в асинхронном контексте по одной.
+
+    StreamingHttpResponse и FileResponse под ASGI собирают синхронный итератор в список
+    целиком до отправки первого байта; здесь каждая следующая часть запрашивается отдельно
+    в потоке для синхронного кода, где открыты файл или курсор базы данных.
+    """
+    iterator = iter(iterator)
+    next_part = sync_to_async(next)
+    done = object()
+    try:
+        while True:
+            part = await next_part(iterator, done)
+            if part is done:
+                break
+            yield part
+    finally:
+        # При обрыве соединения генератор (и курсор) закрывается в том же потоке, где был открыт
+        close = getattr(iterator, 'close', None)
+        if close is not None:
+            await sync_to_async(close)()
+
+
+def streaming_content(request, iterator):
+    """Возвращает содержимое для StreamingHttpResponse: асинхронное под ASGI, иначе как есть."""
+    if isinstance(request, ASGIRequest):
+        return iterate_async(iterator)
+    return iterator
+
+
+def stream_for(request, response):
+    """
+    Подготавливает потоковый ответ (StreamingHttpResponse или FileResponse) к отдаче под ASGI.
+
+    Синхронное содержимое заменяется асинхронным итератором, чтобы ответ отдавался частями,
+    а не собирался в памяти целиком; под WSGI ответ возвращается без изменений.
+    Файл FileResponse по-прежнему закрывается при закрытии ответа.
+    """
+    if isinstance(request, ASGIRequest) and not response.is_async:
+        response.streaming_content = iterate_async(response.streaming_content)
+    return response
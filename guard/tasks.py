@@ -1,14 +1,48 @@
-from celery import shared_task
+from celery import chord, shared_task
 from celery.utils.log import get_task_logger
+from contextlib import contextmanager
 from datetime import datetime, timedelta
-from django.db.models import Q
-from .models import Med, Education, Notification
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files import File
+from django.db import connection, transaction
+from django.db.models import Exists, Max, Min, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from .models import (
+    ArchivedNotification, DocumentJob, Education, Med, Notification, NotificationRead,
+    NotificationReadState, NotificationStats,
+)
 from django.contrib.auth.models import User
-from .emails import send_expiration_notification
+from .documents import merge_docx, render_many, stream_zip
+from .emails import is_transient_email_error, send_expiration_digest
+from .events import publish_notification_change
+import random
 import re
+import tempfile
+import time
 
 logger = get_task_logger(__name__)
 
+# Количество дней до истечения срока, за которое создаётся уведомление
+NOTIFICATION_DAYS = 30
+# Имя системного пользователя, которому принадлежат общие уведомления
+SYSTEM_USERNAME = 'system_notification'
+# Размер пачки для массовых операций с уведомлениями
+NOTIFICATION_BATCH_SIZE = 1000
+# Ключи кэша для блокировки пересчёта и отложенного запуска
+RECOMPUTE_LOCK_KEY = 'guard:notifications:lock'
+RECOMPUTE_PENDING_KEY = 'guard:notifications:pending'
+# Ключи кэша для версии набора уведомлений и ID системного пользователя
+NOTIFICATION_VERSION_KEY = 'guard:notifications:version'
+SYSTEM_USER_ID_KEY = 'guard:notifications:system_user_id'
+# Ключ кэша для версии состояния прочтения уведомлений пользователя
+NOTIFICATION_READ_VERSION_KEY = 'guard:notifications:read:{user_id}'
+# Допустимые режимы политики хранения прочитанных уведомлений
+NOTIFICATION_RETENTION_MODES = ('archive', 'delete')
+# Через сколько готовых документов обновлять прогресс задания
+DOCUMENT_JOB_PROGRESS_STEP = 10
+
 def is_valid_email(email):
     """Проверяет, является ли email-адрес валидным."""
     if not email or not isinstance(email, str):
@@ -16,101 +50,632 @@ def is_valid_email(email):
     email_regex = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
     return re.match(email_regex, email) is not None
 
-@shared_task
-def check_expirations():
-    logger.info("Starting check_expirations task")
-    
-    notification_days = 30
-    current_date = datetime.now().date()
-    threshold_date = current_date + timedelta(days=notification_days)
-
-    # Получить актуальные записи Med и Education
-    upcoming_meds = Med.objects.filter(date_to__gte=current_date, date_to__lte=threshold_date)
-    upcoming_educations = Education.objects.filter(date_to__gte=current_date, date_to__lte=threshold_date)
-    # Получить всех не-администраторов
-    non_admin_users = User.objects.filter(is_staff=False).exclude(username='system_notification')
+def get_expiration_window(current_date=None):
+    """Возвращает границы периода, в котором срок считается истекающим."""
+    current_date = current_date or datetime.now().date()
+    return current_date, current_date + timedelta(days=NOTIFICATION_DAYS)
 
-    if not non_admin_users.exists():
-        logger.warning("No non-admin users found in the system (excluding system_notification)")
+def build_med_message(med):
+    """Формирует текст уведомления об истечении медосмотра."""
+    return f"{med.get_type_display()} медосмотр для {med.owner.FIO} истекает {med.date_to.strftime('%d.%m.%Y')}."
+
+def build_edu_message(education):
+    """Формирует текст уведомления об истечении обучения."""
+    return f"Обучение {education.get_program_display()} для {education.owner.FIO} истекает {education.date_to.strftime('%d.%m.%Y')}."
+
+def collect_expiring(current_date, threshold_date):
+    """
+    Собирает желаемый набор уведомлений одним запросом на каждую модель.
+
+    Возвращает два словаря {id записи: текст уведомления} — для медосмотров и обучений.
+    """
+    upcoming_meds = (
+        Med.objects
+        .filter(date_to__gte=current_date, date_to__lte=threshold_date)
+        .select_related('owner')
+        .only('id', 'type', 'date_to', 'owner__FIO')
+        .order_by('date_to', 'id')
+    )
+    upcoming_educations = (
+        Education.objects
+        .filter(date_to__gte=current_date, date_to__lte=threshold_date)
+        .select_related('owner')
+        .only('id', 'program', 'date_to', 'owner__FIO')
+        .order_by('date_to', 'id')
+    )
+    med_desired = {med.id: build_med_message(med) for med in upcoming_meds}
+    edu_desired = {edu.id: build_edu_message(edu) for edu in upcoming_educations}
+    return med_desired, edu_desired
+
+def sync_notifications(system_user, med_desired, edu_desired):
+    """
+    Приводит непрочитанные уведомления системного пользователя к желаемому набору.
+
+    Сравнивает существующие строки с желаемыми и применяет только разницу:
+    создаёт недостающие, заменяет уведомления с изменившимся текстом новыми строками
+    (чтобы клиенты получили их в режиме since=<id>) и удаляет лишние.
+    Возвращает отчёт с количеством изменённых строк.
+    """
+    existing = Notification.objects.filter(
+        user=system_user, is_read=False
+    ).values_list('id', 'med_id', 'education_id', 'message')
+
+    seen_med, seen_edu = {}, {}
+    stale_med, stale_edu = set(), set()
+    to_delete = []
+    for notification_id, med_id, education_id, message in existing:
+        if med_id is not None:
+            seen, stale, desired, key = seen_med, stale_med, med_desired, med_id
+        elif education_id is not None:
+            seen, stale, desired, key = seen_edu, stale_edu, edu_desired, education_id
+        else:
+            to_delete.append(notification_id)
+            continue
+
+        # Запись больше не истекает либо уже есть уведомление-дубликат
+        if key not in desired or key in seen:
+            to_delete.append(notification_id)
+            continue
+        if message != desired[key]:
+            to_delete.append(notification_id)
+            stale.add(key)
+            continue
+        seen[key] = notification_id
+
+    to_create = [
+        Notification(user=system_user, message=message, med_id=med_id)
+        for med_id, message in med_desired.items() if med_id not in seen_med
+    ] + [
+        Notification(user=system_user, message=message, education_id=education_id)
+        for education_id, message in edu_desired.items() if education_id not in seen_edu
+    ]
+
+    with transaction.atomic():
+        for start in range(0, len(to_delete), NOTIFICATION_BATCH_SIZE):
+            Notification.objects.filter(id__in=to_delete[start:start + NOTIFICATION_BATCH_SIZE]).delete()
+        if to_create:
+            Notification.objects.bulk_create(to_create, batch_size=NOTIFICATION_BATCH_SIZE)
+    if to_delete or to_create:
+        bump_notification_version()
+
+    updated = len(stale_med - seen_med.keys()) + len(stale_edu - seen_edu.keys())
+    return {
+        'created': len(to_create) - updated,
+        'updated': updated,
+        'deleted': len(to_delete) - updated,
+        'unchanged': len(seen_med) + len(seen_edu),
+    }
+
+def find_system_user_id():
+    """Возвращает ID системного пользователя из базы данных (без кэша) или None, если он не создан."""
+    return User.objects.filter(username=SYSTEM_USERNAME).values_list('id', flat=True).first()
+
+def get_system_user_id():
+    """Возвращает ID системного пользователя (из кэша) или None, если он не создан."""
+    system_user_id = cache.get(SYSTEM_USER_ID_KEY)
+    if system_user_id is None:
+        system_user_id = find_system_user_id()
+        if system_user_id is not None:
+            cache.set(SYSTEM_USER_ID_KEY, system_user_id, timeout=None)
+    return system_user_id
+
+def get_notification_state(user_id=None):
+    """
+    Возвращает пару (версия набора уведомлений, ID системного пользователя) одним запросом к кэшу.
+
+    Если передан user_id, в версию входит и версия состояния прочтения этого пользователя.
+    Если версия вытеснена из кэша, создаётся новая, чтобы клиенты один раз перезапросили данные.
+    """
+    keys = [NOTIFICATION_VERSION_KEY, SYSTEM_USER_ID_KEY]
+    read_key = NOTIFICATION_READ_VERSION_KEY.format(user_id=user_id) if user_id is not None else None
+    if read_key is not None:
+        keys.append(read_key)
+    state = cache.get_many(keys)
+    version = state.get(NOTIFICATION_VERSION_KEY)
+    if version is None:
+        version = init_version(NOTIFICATION_VERSION_KEY)
+    if read_key is not None:
+        read_version = state.get(read_key)
+        if read_version is None:
+            read_version = init_version(read_key)
+        version = f'{version}.{read_version}'
+    system_user_id = state.get(SYSTEM_USER_ID_KEY)
+    if system_user_id is None:
+        system_user_id = get_system_user_id()
+    return version, system_user_id
+
+def init_version(key):
+    """Создаёт в кэше начальную версию по ключу key (если её ещё нет) и возвращает текущую."""
+    cache.add(key, time.time_ns() // 1000, timeout=None)
+    return cache.get(key)
+
+def increment_version(key):
+    """Увеличивает версию в кэше по ключу key и возвращает новое значение."""
+    try:
+        return cache.incr(key)
+    except ValueError:
+        return init_version(key)
+
+def bump_notification_version():
+    """
+    Увеличивает версию набора уведомлений после фиксации текущей транзакции
+    и оповещает подключения SSE об изменении.
+    """
+    def bump():
+        publish_notification_change(increment_version(NOTIFICATION_VERSION_KEY))
+
+    transaction.on_commit(bump)
+
+def bump_read_version(user_id):
+    """
+    Увеличивает версию состояния прочтения пользователя после фиксации транзакции.
+
+    Подключения SSE оповещаются так же, как при изменении уведомлений, чтобы
+    счётчик обновился и в других вкладках пользователя.
+    """
+    def bump():
+        increment_version(NOTIFICATION_READ_VERSION_KEY.format(user_id=user_id))
+        publish_notification_change(cache.get(NOTIFICATION_VERSION_KEY))
+
+    transaction.on_commit(bump)
+
+def unread_notifications(user_id, system_user_id):
+    """
+    Возвращает QuerySet непрочитанных уведомлений пользователя (личных и общих).
+
+    Уведомление непрочитано, если его ID больше курсора пользователя и оно не отмечено
+    прочитанным по отдельности. Курсор и исключения проверяются подзапросами, поэтому
+    список и количество получаются одним запросом по индексу (user, is_read, id).
+    """
+    cursor = NotificationReadState.objects.filter(user_id=user_id).values('last_read_id')[:1]
+    read = NotificationRead.objects.filter(user_id=user_id, notification_id=OuterRef('pk'))
+    return Notification.objects.filter(
+        ~Exists(read),
+        user_id__in=[user_id, system_user_id],
+        is_read=False,
+        id__gt=Coalesce(Subquery(cursor), Value(0)),
+    )
+
+def mark_notifications_read(user_id, system_user_id, ids=None, up_to=None):
+    """
+    Отмечает уведомления прочитанными для одного пользователя и возвращает число непрочитанных.
+
+    С up_to курсор пользователя сдвигается до этого ID (но не дальше последнего
+    уведомления), без ids и up_to — до последнего уведомления. Уведомления из ids выше курсора сохраняются как исключения; затем курсор
+    сдвигается до первого непрочитанного уведомления, а исключения ниже курсора удаляются,
+    так что их остаётся немного.
+    """
+    visible = Notification.objects.filter(user_id__in=[user_id, system_user_id])
+    with transaction.atomic():
+        state, _ = NotificationReadState.objects.get_or_create(user_id=user_id)
+        # Курсор не может уйти дальше последнего существующего уведомления, иначе
+        # уведомления, созданные позже, сразу считались бы прочитанными
+        last = visible.aggregate(last=Max('id'))['last'] or 0
+        if state.last_read_id > last:
+            NotificationReadState.objects.filter(pk=state.pk).update(last_read_id=last)
+            state.last_read_id = last
+        if ids is None:
+            cursor = min(up_to, last) if up_to is not None else last
+        else:
+            read_ids = visible.filter(id__in=ids, id__gt=state.last_read_id).values_list('id', flat=True)
+            NotificationRead.objects.bulk_create(
+                [NotificationRead(user_id=user_id, notification_id=notification_id) for notification_id in read_ids],
+                ignore_conflicts=True
+            )
+            first_unread = unread_notifications(user_id, system_user_id).aggregate(first=Min('id'))['first']
+            cursor = first_unread - 1 if first_unread is not None else last
+
+        if cursor > state.last_read_id:
+            NotificationReadState.objects.filter(pk=state.pk, last_read_id__lt=cursor).update(last_read_id=cursor)
+            NotificationRead.objects.filter(user_id=user_id, notification_id__lte=cursor).delete()
+        bump_read_version(user_id)
+    return unread_notifications(user_id, system_user_id).count()
+
+def refresh_record_notification(instance):
+    """
+    Пересчитывает уведомление для одной записи Med или Education.
+
+    Создаёт или обновляет уведомление, если срок записи попадает в период
+    оповещения, и удаляет её уведомления в противном случае.
+    """
+    if isinstance(instance, Med):
+        field, build_message = 'med', build_med_message
+    else:
+        field, build_message = 'education', build_edu_message
+
+    current_date, threshold_date = get_expiration_window()
+    if not (current_date <= instance.date_to <= threshold_date):
+        deleted, _ = Notification.objects.filter(**{field: instance}).delete()
+        if deleted:
+            bump_notification_version()
+        return
+
+    system_user_id = get_system_user_id()
+    if system_user_id is None:
+        logger.error("System user 'system_notification' not found. Notification not refreshed.")
         return
 
-    logger.info(f"Found {non_admin_users.count()} non-admin users")
+    # Изменившийся текст сохраняется новой строкой, чтобы клиенты получили её
+    # в режиме since=<id> как новое уведомление
+    message = build_message(instance)
+    existing = Notification.objects.filter(user_id=system_user_id, is_read=False, **{field: instance})
+    existing_messages = list(existing.values_list('message', flat=True)[:2])
+    if existing_messages == [message]:
+        return
+    with transaction.atomic():
+        existing.delete()
+        Notification.objects.create(user_id=system_user_id, message=message, **{field: instance})
+    bump_notification_version()
+
+@contextmanager
+def recompute_lock():
+    """Не даёт двум пересчётам уведомлений выполняться одновременно."""
+    acquired = cache.add(RECOMPUTE_LOCK_KEY, 1, timeout=settings.NOTIFICATION_LOCK_TIMEOUT)
+    try:
+        yield acquired
+    finally:
+        if acquired:
+            cache.delete(RECOMPUTE_LOCK_KEY)
+
+def schedule_expiration_recompute():
+    """
+    Ставит в очередь отложенный пересчёт уведомлений после фиксации транзакции.
+
+    Нужен для массовых изменений, при которых сигналы моделей не отправляются.
+    Все изменения в пределах окна NOTIFICATION_RECOMPUTE_DELAY объединяются в один запуск.
+    """
+    def enqueue():
+        delay = settings.NOTIFICATION_RECOMPUTE_DELAY
+        if not cache.add(RECOMPUTE_PENDING_KEY, 1, timeout=delay + settings.NOTIFICATION_LOCK_TIMEOUT):
+            return
+        try:
+            recompute_notifications.apply_async(countdown=delay)
+        except Exception as e:
+            cache.delete(RECOMPUTE_PENDING_KEY)
+            logger.error(f"Failed to enqueue notification recompute: {str(e)}")
+
+    transaction.on_commit(enqueue)
+
+@shared_task(bind=True, max_retries=None)
+def recompute_notifications(self):
+    """Пересчитывает уведомления после изменения данных, без рассылки email."""
+    cache.delete(RECOMPUTE_PENDING_KEY)
+    with recompute_lock() as acquired:
+        if not acquired:
+            raise self.retry(countdown=settings.NOTIFICATION_RECOMPUTE_DELAY)
+        return run_expiration_check(send_emails=False)
+
+@shared_task(bind=True, max_retries=None)
+def check_expirations(self):
+    """Плановая сверка уведомлений со всеми записями и рассылка email."""
+    with recompute_lock() as acquired:
+        if not acquired:
+            raise self.retry(countdown=settings.NOTIFICATION_RECOMPUTE_DELAY)
+        return run_expiration_check(send_emails=True)
+
+def run_expiration_check(send_emails=True):
+    """Пересчитывает уведомления об истекающих сроках и при необходимости рассылает email."""
+    logger.info("Starting check_expirations task")
+
+    current_date, threshold_date = get_expiration_window()
 
     # Получить системного пользователя
     try:
-        system_user = User.objects.get(username='system_notification')
+        system_user = User.objects.get(username=SYSTEM_USERNAME)
     except User.DoesNotExist:
         logger.error("System user 'system_notification' not found. Aborting task.")
         return
 
-    # Собираем сообщения для email
-    med_messages = [
-        f"{med.get_type_display()} медосмотр для {med.owner.FIO} истекает {med.date_to.strftime('%d.%m.%Y')}."
-        for med in upcoming_meds
-    ]
-    edu_messages = [
-        f"Обучение {education.get_program_display()} для {education.owner.FIO} истекает {education.date_to.strftime('%d.%m.%Y')}."
-        for education in upcoming_educations
-    ]
+    # Шаг 1: Получить актуальные записи Med и Education
+    med_desired, edu_desired = collect_expiring(current_date, threshold_date)
+
+    # Шаг 2: Синхронизация уведомлений системного пользователя
+    report = sync_notifications(system_user, med_desired, edu_desired)
+    logger.info(
+        f"Notifications synced: {report['created']} created, {report['updated']} updated, "
+        f"{report['deleted']} deleted, {report['unchanged']} unchanged"
+    )
+
+    # Шаг 3: Очистка уведомлений для удалённых записей и записей вне периода оповещения
+    deleted = delete_in_batches(stale_notifications(current_date, threshold_date))
+    if deleted:
+        bump_notification_version()
+
+    if not send_emails:
+        logger.info("Finished check_expirations task (emails skipped)")
+        return report
 
+    med_messages = list(med_desired.values())
+    edu_messages = list(edu_desired.values())
     if not (med_messages or edu_messages):
         logger.info("No upcoming expirations found")
-        return
+        return report
 
-    # Шаг 1: Удаление старых уведомлений для system_notification
-    Notification.objects.filter(user=system_user, is_read=False).delete()
-    logger.debug("Deleted old general notifications for system_notification")
-
-    # Шаг 2: Создание отдельных уведомлений
-    for med in upcoming_meds:
-        message = f"{med.get_type_display()} медосмотр для {med.owner.FIO} истекает {med.date_to.strftime('%d.%m.%Y')}."
-        Notification.objects.create(
-            user=system_user,
-            message=message,
-            med=med,
-            created_at=datetime.now()
-        )
-        logger.debug(f"Created notification for med ID {med.id}")
-
-    for education in upcoming_educations:
-        message = f"Обучение {education.get_program_display()} для {education.owner.FIO} истекает {education.date_to.strftime('%d.%m.%Y')}."
-        Notification.objects.create(
-            user=system_user,
-            message=message,
-            education=education,
-            created_at=datetime.now()
-        )
-        logger.debug(f"Created notification for education ID {education.id}")
-
-    # Шаг 3: Очистка неактуальных уведомлений
-    Notification.objects.filter(
-        Q(med__isnull=False) & ~Q(med__in=Med.objects.all())
-    ).delete()
-    Notification.objects.filter(
-        Q(education__isnull=False) & ~Q(education__in=Education.objects.all())
-    ).delete()
-    Notification.objects.filter(
-        Q(med__date_to__lt=current_date) | Q(med__date_to__gt=threshold_date)
-    ).delete()
-    Notification.objects.filter(
-        Q(education__date_to__lt=current_date) | Q(education__date_to__gt=threshold_date)
-    ).delete()
-
-    # Шаг 4: Отправка персонализированных email
+    # Получить всех не-администраторов
+    non_admin_users = list(
+        User.objects.filter(is_staff=False).exclude(username=SYSTEM_USERNAME)
+        .only('id', 'username', 'email', 'first_name')
+    )
+    if not non_admin_users:
+        logger.warning("No non-admin users found in the system (excluding system_notification)")
+        return report
+
+    logger.info(f"Found {len(non_admin_users)} non-admin users")
+
+    # Шаг 4: Рассылка email пачками параллельно на воркерах Celery
+    recipients = {}
+    skipped = 0
     for user in non_admin_users:
         if not is_valid_email(user.email):
             logger.warning(f"Skipping email for user {user.username} (ID: {user.id}): invalid or missing email")
+            skipped += 1
             continue
-        try:
-            send_expiration_notification(
-                to_email=user.email,
-                user_name=user.first_name or user.username,
-                med_messages=med_messages,
-                edu_messages=edu_messages
+        if user.email in recipients:
+            logger.warning(f"Skipping email for user {user.username} (ID: {user.id}): duplicate address {user.email}")
+            skipped += 1
+            continue
+        recipients[user.email] = user.first_name or user.username
+
+    report['emails'] = dispatch_expiration_emails(list(recipients.items()), med_messages, edu_messages, skipped)
+
+    logger.info(f"Processed {len(med_messages)} meds, {len(edu_messages)} educations")
+    logger.info("Finished check_expirations task")
+    return report
+
+def stale_notifications(current_date, threshold_date):
+    """
+    Возвращает QuerySet уведомлений, чьи записи Med или Education удалены или вышли
+    из периода оповещения.
+
+    Все условия проверяются одним запросом с LEFT JOIN по первичным ключам записей
+    вместо отдельных подзапросов по всей таблице для каждого случая.
+    """
+    med_stale = Q(med__date_to__isnull=True) | Q(med__date_to__lt=current_date) | Q(med__date_to__gt=threshold_date)
+    edu_stale = (
+        Q(education__date_to__isnull=True) | Q(education__date_to__lt=current_date)
+        | Q(education__date_to__gt=threshold_date)
+    )
+    return Notification.objects.filter(
+        (Q(med__isnull=False) & med_stale) | (Q(education__isnull=False) & edu_stale)
+    )
+
+def read_notifications():
+    """
+    Возвращает QuerySet уведомлений, прочитанных своим владельцем: с флагом is_read,
+    не выше курсора владельца или отмеченных им по отдельности.
+
+    Общие уведомления системного пользователя сюда не попадают: их никто не читает
+    от имени владельца, и они удаляются вместе с выходом записи из периода оповещения.
+    """
+    cursor = NotificationReadState.objects.filter(user_id=OuterRef('user_id')).values('last_read_id')[:1]
+    read = NotificationRead.objects.filter(user_id=OuterRef('user_id'), notification_id=OuterRef('pk'))
+    return Notification.objects.filter(
+        Q(is_read=True) | Q(id__lte=Coalesce(Subquery(cursor), Value(0))) | Exists(read)
+    )
+
+def delete_in_batches(queryset, batch_size=NOTIFICATION_BATCH_SIZE):
+    """
+    Удаляет записи queryset пачками по batch_size и возвращает их количество.
+
+    Каждая пачка удаляется в отдельной транзакции, чтобы блокировки держались недолго.
+    """
+    model = queryset.model
+    deleted = 0
+    while True:
+        ids = list(queryset.order_by().values_list('id', flat=True)[:batch_size])
+        if not ids:
+            return deleted
+        with transaction.atomic():
+            _, per_model = model.objects.filter(id__in=ids).delete()
+        deleted += per_model.get(model._meta.label, 0)
+        if len(ids) < batch_size:
+            return deleted
+
+def archive_in_batches(queryset, batch_size=NOTIFICATION_BATCH_SIZE):
+    """
+    Переносит уведомления queryset в ArchivedNotification пачками по batch_size
+    и возвращает их количество. Копирование и удаление пачки выполняются в одной транзакции.
+    """
+    archived = 0
+    while True:
+        ids = list(queryset.order_by().values_list('id', flat=True)[:batch_size])
+        if not ids:
+            return archived
+        with transaction.atomic():
+            rows = Notification.objects.filter(id__in=ids).values(
+                'id', 'user_id', 'message', 'is_read', 'created_at', 'med_id', 'education_id'
             )
-            logger.info(f"Sent personalized email to {user.email}")
-        except Exception as e:
-            logger.error(f"Failed to send email to {user.email}: {str(e)}")
+            ArchivedNotification.objects.bulk_create(
+                [ArchivedNotification(notification_id=row.pop('id'), **row) for row in rows],
+                ignore_conflicts=True
+            )
+            _, per_model = Notification.objects.filter(id__in=ids).delete()
+        archived += per_model.get(Notification._meta.label, 0)
+        if len(ids) < batch_size:
+            return archived
+
+def get_table_size(table):
+    """Возвращает размер таблицы table вместе с индексами в байтах или None, если СУБД не поддерживается."""
+    if connection.vendor != 'postgresql':
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_total_relation_size(%s)", [table])
+        return cursor.fetchone()[0]
 
-    logger.info(f"Processed {upcoming_meds.count()} meds, {upcoming_educations.count()} educations")
-    logger.info("Finished check_expirations task")
\ No newline at end of file
+def record_notification_stats():
+    """Сохраняет снимок размера таблиц уведомлений и возвращает его."""
+    return NotificationStats.objects.create(
+        notifications=Notification.objects.count(),
+        read_exceptions=NotificationRead.objects.count(),
+        archived=ArchivedNotification.objects.count(),
+        table_bytes=get_table_size(Notification._meta.db_table),
+    )
+
+@shared_task
+def apply_notification_retention():
+    """
+    Архивирует или удаляет прочитанные уведомления старше NOTIFICATION_RETENTION_DAYS дней
+    и сохраняет снимок размера таблиц уведомлений.
+    """
+    mode = settings.NOTIFICATION_RETENTION_MODE
+    if mode not in NOTIFICATION_RETENTION_MODES:
+        logger.error(f"Unknown notification retention mode '{mode}'. Retention skipped.")
+        return
+
+    removed = 0
+    if settings.NOTIFICATION_RETENTION_DAYS > 0:
+        cutoff = timezone.now() - timedelta(days=settings.NOTIFICATION_RETENTION_DAYS)
+        expired = read_notifications().filter(created_at__lt=cutoff)
+        removed = archive_in_batches(expired) if mode == 'archive' else delete_in_batches(expired)
+
+    stats = record_notification_stats()
+    logger.info(
+        f"Notification retention ({mode}): {removed} removed, {stats.notifications} left, "
+        f"{stats.read_exceptions} read marks, {stats.archived} archived, table size {stats.table_bytes} bytes"
+    )
+    return {
+        'mode': mode,
+        'removed': removed,
+        'notifications': stats.notifications,
+        'read_exceptions': stats.read_exceptions,
+        'archived': stats.archived,
+        'table_bytes': stats.table_bytes,
+    }
+
+def dispatch_expiration_emails(recipients, med_messages, edu_messages, skipped=0):
+    """
+    Разбивает получателей на пачки по EMAIL_CHUNK_SIZE и рассылает их параллельно.
+
+    Пачки отправляются группой задач send_expiration_emails_chunk, итоговый отчёт
+    собирает summarize_expiration_emails после завершения всех пачек.
+    """
+    chunk_size = settings.EMAIL_CHUNK_SIZE
+    chunks = [recipients[start:start + chunk_size] for start in range(0, len(recipients), chunk_size)]
+    if not chunks:
+        logger.info(f"No email recipients, {skipped} skipped")
+        return {'recipients': 0, 'chunks': 0, 'skipped': skipped}
+
+    chord(
+        send_expiration_emails_chunk.s(recipients=chunk, med_messages=med_messages, edu_messages=edu_messages)
+        for chunk in chunks
+    )(summarize_expiration_emails.s(skipped=skipped))
+    logger.info(f"Dispatched {len(recipients)} emails in {len(chunks)} chunks, {skipped} skipped")
+    return {'recipients': len(recipients), 'chunks': len(chunks), 'skipped': skipped}
+
+@shared_task(bind=True, max_retries=settings.EMAIL_MAX_RETRIES)
+def send_expiration_emails_chunk(self, recipients, med_messages, edu_messages, sent=0, failed=None):
+    """
+    Отправляет письмо об истекающих сроках одной пачке получателей.
+
+    Получателям с временными ошибками (сеть, коды SMTP 4xx) отправка повторяется
+    с экспоненциальной задержкой; уже доставленные письма повторно не отправляются.
+    Возвращает {'sent': количество, 'failed': {email: текст ошибки}}.
+    """
+    failed = dict(failed or {})
+    try:
+        chunk_report = send_expiration_digest(
+            recipients, med_messages, edu_messages, rate_limit=settings.EMAIL_RATE_LIMIT
+        )
+    except Exception as e:
+        # Не удалось открыть соединение: вся пачка не отправлена
+        chunk_report = {
+            'sent': 0,
+            'failed': {email: str(e) for email, _ in recipients},
+            'transient': [email for email, _ in recipients] if is_transient_email_error(e) else [],
+        }
+
+    sent += chunk_report['sent']
+    transient = set(chunk_report['transient'])
+    failed.update({email: error for email, error in chunk_report['failed'].items() if email not in transient})
+
+    if transient and self.request.retries < self.max_retries:
+        countdown = settings.EMAIL_RETRY_BACKOFF * 2 ** self.request.retries
+        logger.warning(f"Retrying {len(transient)} emails in {countdown} s after transient errors")
+        raise self.retry(
+            args=(),
+            kwargs={
+                'recipients': [(email, name) for email, name in recipients if email in transient],
+                'med_messages': med_messages,
+                'edu_messages': edu_messages,
+                'sent': sent,
+                'failed': failed,
+            },
+            countdown=countdown + random.uniform(0, countdown / 2),
+        )
+
+    failed.update({email: chunk_report['failed'][email] for email in transient})
+    return {'sent': sent, 'failed': failed}
+
+@shared_task
+def summarize_expiration_emails(results, skipped=0):
+    """Собирает итоговый отчёт рассылки по результатам всех пачек."""
+    summary = {'sent': 0, 'skipped': skipped, 'failed': 0}
+    for result in results:
+        summary['sent'] += result['sent']
+        summary['failed'] += len(result['failed'])
+        for email, error in result['failed'].items():
+            logger.error(f"Failed to send email to {email}: {error}")
+    logger.info(
+        f"Expiration emails: {summary['sent']} sent, {summary['skipped']} skipped, {summary['failed']} failed"
+    )
+    return summary
+
+@shared_task
+def generate_documents(job_id):
+    """
+    Генерирует документы фонового задания DocumentJob и сохраняет результат в хранилище.
+
+    Документы рендерятся в процессе воркера: параллельность обеспечивают сами воркеры Celery.
+    Прогресс записывается в задание каждые DOCUMENT_JOB_PROGRESS_STEP документов.
+    """
+    if not DocumentJob.objects.filter(id=job_id, status='pending').update(status='running'):
+        logger.warning(f"Document job {job_id} not found or already started")
+        return
+    job = DocumentJob.objects.get(id=job_id)
+    payload = job.payload
+
+    def track_progress(documents):
+        for processed, data in enumerate(documents, 1):
+            yield data
+            if processed % DOCUMENT_JOB_PROGRESS_STEP == 0:
+                DocumentJob.objects.filter(id=job_id).update(processed=processed)
+
+    try:
+        rendered = track_progress(render_many(
+            payload['template_path'], [item['context'] for item in payload['documents']], parallel=False
+        ))
+        if payload['format'] == 'docx':
+            job.file.save(job.filename, File(merge_docx(rendered)), save=False)
+        else:
+            filenames = [item['filename'] for item in payload['documents']]
+            with tempfile.TemporaryFile() as archive:
+                for chunk in stream_zip(zip(filenames, rendered)):
+                    archive.write(chunk)
+                archive.seek(0)
+                job.file.save(job.filename, File(archive), save=False)
+    except Exception as e:
+        logger.error(f"Document job {job_id} failed: {str(e)}")
+        DocumentJob.objects.filter(id=job_id).update(
+            status='failure', error=str(e), finished_at=timezone.now()
+        )
+        return
+
+    now = timezone.now()
+    job.status = 'success'
+    job.processed = job.total
+    job.finished_at = now
+    job.expires_at = now + timedelta(seconds=settings.DOCUMENT_JOB_TTL)
+    job.save(update_fields=['status', 'processed', 'file', 'finished_at', 'expires_at'])
+    logger.info(f"Document job {job_id} finished: {job.total} documents")
+
+@shared_task
+def cleanup_document_jobs():
+    """Удаляет задания на генерацию документов с истёкшим сроком хранения вместе с файлами."""
+    expired_ids = []
+    for job in DocumentJob.objects.filter(expires_at__lt=timezone.now()).only('id', 'file').iterator():
+        if job.file:
+            job.file.delete(save=False)
+        expired_ids.append(job.id)
+    deleted, _ = DocumentJob.objects.filter(id__in=expired_ids).delete()
+    logger.info(f"Removed {deleted} expired document jobs")
+    return deleted
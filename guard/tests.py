@@ -1,3 +1,36 @@
+from django.contrib.auth.models import User
 from django.test import TestCase
 
-# Create your tests here.
+from .models import Notification, NotificationReadState
+from .tasks import SYSTEM_USERNAME, mark_notifications_read, unread_notifications
+
+
+class MarkNotificationsReadTests(TestCase):
+    """Проверки курсора прочтения уведомлений."""
+
+    def setUp(self):
+        self.user = User.objects.create_user('user', 'user@example.com', 'password')
+        self.system_user, _ = User.objects.get_or_create(username=SYSTEM_USERNAME)
+        self.notification = Notification.objects.create(user=self.system_user, message='Первое')
+
+    def test_up_to_is_capped_by_last_notification(self):
+        """Курсор с up_to больше последнего ID не делает прочитанными уведомления, созданные позже."""
+        count = mark_notifications_read(self.user.id, self.system_user.id, up_to=10**9)
+        self.assertEqual(count, 0)
+        self.assertEqual(NotificationReadState.objects.get(user=self.user).last_read_id, self.notification.id)
+
+        later = Notification.objects.create(user=self.system_user, message='Второе')
+        unread = unread_notifications(self.user.id, self.system_user.id)
+        self.assertEqual(list(unread.values_list('id', flat=True)), [later.id])
+
+    def test_stored_cursor_past_last_notification_is_reset(self):
+        """Сохранённый курсор дальше последнего уведомления возвращается к нему при отметке."""
+        NotificationReadState.objects.create(user=self.user, last_read_id=10**9)
+
+        count = mark_notifications_read(self.user.id, self.system_user.id, ids=[self.notification.id])
+        self.assertEqual(count, 0)
+        self.assertEqual(NotificationReadState.objects.get(user=self.user).last_read_id, self.notification.id)
+
+        later = Notification.objects.create(user=self.system_user, message='Второе')
+        unread = unread_notifications(self.user.id, self.system_user.id)
+        self.assertEqual(list(unread.values_list('id', flat=True)), [later.id])
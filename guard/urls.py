@@ -1,13 +1,13 @@
 from django.urls import path
 from .views import (
-    AllEducationsView, AllMedicalExamView, CustomLoginView, CustomLogoutView, 
-    CustomPasswordChangeView, EduAddView, EduDeleteView, EduUpdateView, 
-    EmployeeAddView, EmployeeDeleteView, EmployeeFilterView, EmployeeSearch, 
+    AllEducationsView, AllMedicalExamView, ComplianceDashboardView, CustomLoginView, CustomLogoutView, 
+    CustomPasswordChangeView, DocumentJobFileView, DocumentJobStatusView, EduAddView, EduDeleteView, EduExportView, EduGroupAddView, EduImportView, EduUpdateView, 
+    EmployeeAddView, EmployeeDeleteView, EmployeeExportView, EmployeeFilterView, EmployeeImportView, EmployeePageView, EmployeeSearch, 
     EmployeeUpdateView, FileDeleteView, FileListView, FilePreviewView, 
     FileUploadView, ForbiddenView, GetCurentUserDetails, GetEducationView, 
-    GetMedicalExamView, IndexView, MedDeleteView, MedicalDirectionView, 
-    MedicalExamAddView, MedicalExamUpdateView, NotificationListView, 
-    logout_confirmation_view, get_worker_FIO, get_worker_med, get_worker_education
+    GetMedicalExamView, IndexView, MedDeleteView, MedicalDirectionBatchView, MedicalDirectionJobView, MedicalDirectionView, 
+    MedicalExamAddView, MedicalExamExportView, MedicalExamImportView, MedicalExamUpdateView, NotificationListView, NotificationMarkReadView, 
+    logout_confirmation_view, get_worker_FIO, get_worker_med, get_worker_education, notification_stream
 )
 
 # Устанавливаем пространство имён приложения для уникальной идентификации маршрутов
@@ -25,14 +25,18 @@ urlpatterns = [
 
     # Главная страница
     path('', IndexView.as_view(), name='index'),
+    path('dashboard/compliance', ComplianceDashboardView.as_view(), name='compliance-dashboard'),
 
     # Сотрудники
     path('worker/personal/FIO/<int:worker_id>', get_worker_FIO, name='FIO'),
     path('worker/personal/update/<int:worker_id>', EmployeeUpdateView.as_view(), name='personal-update'),
     path('worker/add/', EmployeeAddView.as_view(), name='employee-add'),
+    path('worker/import/', EmployeeImportView.as_view(), name='employee-import'),
     path('worker/delete/', EmployeeDeleteView.as_view(), name='employee-del'),
     path('worker/search/', EmployeeSearch.as_view(), name='employee-search'),
     path('worker/filter/', EmployeeFilterView.as_view(), name='employee-filter'),
+    path('worker/export/', EmployeeExportView.as_view(), name='employee-export'),
+    path('worker/page/', EmployeePageView.as_view(), name='employee-page'),
 
     # Медицинские осмотры
     path('med/', AllMedicalExamView.as_view(), name='all-med'),
@@ -41,7 +45,13 @@ urlpatterns = [
     path('med/update/<int:med_id>', MedicalExamUpdateView.as_view(), name='med-update'),
     path('med/delete/', MedDeleteView.as_view(), name='med-delete'),
     path('worker/med/add/', MedicalExamAddView.as_view(), name='med-add'),
+    path('med/import/', MedicalExamImportView.as_view(), name='med-import'),
+    path('med/export/', MedicalExamExportView.as_view(), name='med-export'),
     path('generate-naprav/', MedicalDirectionView.as_view(), name='naprav'),
+    path('generate-naprav/batch/', MedicalDirectionBatchView.as_view(), name='naprav-batch'),
+    path('generate-naprav/jobs/', MedicalDirectionJobView.as_view(), name='naprav-job'),
+    path('document-jobs/<uuid:job_id>/', DocumentJobStatusView.as_view(), name='document-job'),
+    path('document-jobs/<uuid:job_id>/file/', DocumentJobFileView.as_view(), name='document-job-file'),
 
     # Обучение
     path('education/', AllEducationsView.as_view(), name='all-edu'),
@@ -50,6 +60,9 @@ urlpatterns = [
     path('education/delete/', EduDeleteView.as_view(), name='edu-delete'),
     path('worker/education/<int:worker_id>', get_worker_education, name='worker-educations'),
     path('worker/education/add', EduAddView.as_view(), name='education-add'),
+    path('education/import/', EduImportView.as_view(), name='education-import'),
+    path('education/export/', EduExportView.as_view(), name='education-export'),
+    path('worker/education/group-add', EduGroupAddView.as_view(), name='education-group-add'),
 
     # Файлы
     path('files/upload/', FileUploadView.as_view(), name='file-upload'),
@@ -59,5 +72,7 @@ urlpatterns = [
 
     # Уведомления и контроль доступа
     path('notifications', NotificationListView.as_view(), name='notifications'),
+    path('notifications/stream', notification_stream, name='notification-stream'),
+    path('notifications/read', NotificationMarkReadView.as_view(), name='notifications-read'),
     path('forbidden', ForbiddenView.as_view(), name='forbidden'),
 ]
\ No newline at end of file
@@ -0,0 +1,195 @@
+import re
+from datetime import date, datetime
+
+from django.forms import ValidationError
+
+from .models import Education, Med
+
+# Обязательные поля сотрудника
+EMPLOYEE_REQUIRED_FIELDS = ['FIO', 'gender', 'birthday', 'position', 'status', 'is_edu']
+# ФИО: 2-3 слова на кириллице, каждое с заглавной буквы
+FIO_PATTERN = re.compile(r'^[А-ЯЁ][а-яё]+(?:\s[А-ЯЁ][а-яё]+){1,2}$')
+# Обязательные поля медосмотра, общего протокола обучения и записи об обучении (без сотрудника)
+MED_REQUIRED_FIELDS = ['exam_type', 'exam_date', 'expiry_date']
+EDUCATION_PROTOCOL_FIELDS = ['program', 'protocol_num', 'hours', 'date_from', 'date_to']
+EDUCATION_REQUIRED_FIELDS = ['program', 'protocol_num', 'udostoverenie_num', 'hours', 'date_from', 'date_to']
+# Допустимые коды типов медосмотра и программ обучения
+MED_TYPES = [code for code, _ in Med.TYPE_CHOICHES]
+EDUCATION_PROGRAMS = [code for code, _ in Education.PROGRAM_CHOICES]
+
+
+def clean_employee_data(data, today=None):
+    """
+    Проверяет данные нового сотрудника и возвращает аргументы для создания Employee.
+
+    Правила общие для добавления сотрудника через форму и для массового импорта.
+    При первой найденной ошибке выбрасывает ValidationError.
+    """
+    for field in EMPLOYEE_REQUIRED_FIELDS:
+        if field not in data:
+            raise ValidationError(f'Отсутствует обязательное поле: {field}')
+
+    if not isinstance(data['FIO'], str) or len(data['FIO'].strip()) == 0:
+        raise ValidationError('ФИО должно быть непустой строкой')
+
+    full_name = data['FIO'].strip()
+    if not FIO_PATTERN.fullmatch(full_name):
+        raise ValidationError('ФИО должно содержать 2-3 слова на кириллице, каждое начинается с заглавной буквы')
+
+    if data['gender'] not in ['M', 'F']:
+        raise ValidationError("Пол должен быть одним из: 'M', 'F'")
+
+    try:
+        birthday = datetime.strptime(data['birthday'], '%Y-%m-%d').date()
+        today = today or date.today()
+        min_age_date = date(today.year - 100, today.month, today.day)
+        max_age_date = date(today.year - 14, today.month, today.day)
+
+        if birthday > today:
+            raise ValidationError('Дата рождения не может быть в будущем')
+        if birthday < min_age_date:
+            raise ValidationError('Возраст не может быть больше 100 лет')
+        if birthday > max_age_date:
+            raise ValidationError('Возраст должен быть не менее 14 лет')
+    except (ValueError, TypeError):
+        raise ValidationError('Дата рождения должна быть в формате YYYY-MM-DD')
+
+    if not isinstance(data['position'], str) or len(data['position'].strip()) < 3:
+        raise ValidationError('Должность должна быть строкой длиной не менее 3 символов')
+
+    if data['status'] not in ['W', 'V', 'BT', 'S']:
+        raise ValidationError("Статус должен быть одним из: 'W', 'V', 'BT', 'S'")
+
+    if not isinstance(data['is_edu'], bool):
+        raise ValidationError('is_edu должно быть булевым значением')
+
+    department = data.get('department')
+    if department and not isinstance(department, str):
+        raise ValidationError('Отдел должен быть строкой, если указан')
+
+    oms_number = data.get('oms_number')
+    if oms_number:
+        if not isinstance(oms_number, str):
+            raise ValidationError('Номер ОМС должен быть строкой, если указан')
+        if len(oms_number) != 16 or not oms_number.isdigit():
+            raise ValidationError('Номер ОМС должен содержать ровно 16 цифр')
+
+    dms_number = data.get('dms_number')
+    if dms_number:
+        if not isinstance(dms_number, str):
+            raise ValidationError('Номер ДМС должен быть строкой, если указан')
+        if len(dms_number) < 10:
+            raise ValidationError('Номер ДМС должен содержать не менее 10 символов')
+
+    return {
+        'FIO': full_name,
+        'gender': data['gender'],
+        'birthday': birthday,
+        'position': data['position'].strip(),
+        'department': (department or '').strip(),
+        'oms_number': (oms_number or '').strip(),
+        'dms_number': (dms_number or '').strip(),
+        'status': data['status'],
+        'is_edu': data['is_edu'],
+    }
+
+
+def clean_med_data(data, today=None):
+    """
+    Проверяет данные нового медосмотра и возвращает аргументы для создания Med (без owner).
+
+    Правила общие для добавления медосмотра через форму и для массового импорта.
+    При первой найденной ошибке выбрасывает ValidationError.
+    """
+    for field in MED_REQUIRED_FIELDS:
+        if field not in data:
+            raise ValidationError(f'Отсутствует обязательное поле: {field}')
+
+    if data['exam_type'] not in MED_TYPES:
+        raise ValidationError(f"Тип осмотра должен быть одним из: {', '.join(MED_TYPES)}")
+
+    try:
+        exam_date = datetime.strptime(data['exam_date'], '%Y-%m-%d').date()
+        if exam_date > (today or date.today()):
+            raise ValidationError('Дата осмотра не может быть в будущем')
+    except (ValueError, TypeError):
+        raise ValidationError('Дата осмотра должна быть в формате YYYY-MM-DD')
+
+    try:
+        expiry_date = datetime.strptime(data['expiry_date'], '%Y-%m-%d').date()
+    except (ValueError, TypeError):
+        raise ValidationError('Дата окончания должна быть в формате YYYY-MM-DD')
+
+    if expiry_date < exam_date:
+        raise ValidationError('Дата окончания не может быть раньше даты осмотра')
+
+    return {
+        'type': data['exam_type'],
+        'date_from': exam_date,
+        'date_to': expiry_date,
+    }
+
+
+def clean_education_protocol(data):
+    """
+    Проверяет общие данные протокола обучения: программу, номер протокола, часы и даты.
+
+    Возвращает аргументы для создания Education без owner и номера удостоверения.
+    """
+    if data['program'] not in EDUCATION_PROGRAMS:
+        raise ValidationError(f"Программа должна быть одной из: {', '.join(EDUCATION_PROGRAMS)}")
+
+    if not isinstance(data['protocol_num'], str) or not data['protocol_num'].strip():
+        raise ValidationError('Номер протокола не может быть пустым')
+
+    try:
+        hours = float(data['hours'])
+        if hours <= 0 or hours > 1000:
+            raise ValidationError('Часы должны быть от 1 до 1000')
+    except (ValueError, TypeError):
+        raise ValidationError('Часы должны быть положительным числом')
+
+    try:
+        date_from = datetime.strptime(data['date_from'], '%Y-%m-%d').date()
+    except (ValueError, TypeError):
+        raise ValidationError('Дата начала должна быть в формате YYYY-MM-DD')
+
+    try:
+        date_to = datetime.strptime(data['date_to'], '%Y-%m-%d').date()
+    except (ValueError, TypeError):
+        raise ValidationError('Дата окончания должна быть в формате YYYY-MM-DD')
+
+    if date_to < date_from:
+        raise ValidationError('Дата окончания не может быть раньше даты начала')
+
+    return {
+        'program': data['program'],
+        'protocol_num': data['protocol_num'],
+        'hours': hours,
+        'date_from': date_from,
+        'date_to': date_to,
+    }
+
+
+def clean_udostoverenie_num(value):
+    """Проверяет номер удостоверения об обучении и возвращает его."""
+    if not isinstance(value, str) or not value.strip():
+        raise ValidationError('Номер удостоверения не может быть пустым')
+    return value
+
+
+def clean_education_data(data):
+    """
+    Проверяет данные новой записи об обучении и возвращает аргументы для создания Education (без owner).
+
+    Правила общие для добавления обучения через форму, группового добавления и массового импорта.
+    При первой найденной ошибке выбрасывает ValidationError.
+    """
+    for field in EDUCATION_REQUIRED_FIELDS:
+        if field not in data:
+            raise ValidationError(f'Отсутствует обязательное поле: {field}')
+
+    return {
+        **clean_education_protocol(data),
+        'udostoverenie_num': clean_udostoverenie_num(data['udostoverenie_num']),
+    }
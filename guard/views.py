@@ -1,29 +1,62 @@
+import asyncio
+import logging
 import os
 import json
 import re
-import tempfile
 from datetime import date, datetime, timedelta
+from functools import partial
 from urllib.parse import quote
+import redis
+from asgiref.sync import sync_to_async
 from django.conf import settings
 from django.contrib.auth import update_session_auth_hash
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.auth.models import User
 from django.contrib.auth.views import LoginView, LogoutView, PasswordChangeView
+from django.core.handlers.asgi import ASGIRequest
 from django.db import transaction
-from django.db.models import Q
+from django.db.models import Case, ExpressionWrapper, IntegerField, Q, Value, When
+from django.db.models.functions import ExtractYear
 from django.forms import ValidationError
-from django.http.response import HttpResponse, JsonResponse
+from django.http.response import FileResponse, HttpResponse, JsonResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
-from django.urls import reverse_lazy
+from django.urls import reverse, reverse_lazy
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
 from django.views import View
 from django.views.generic import TemplateView
 from django.views.generic.list import ListView
-from docxtpl import DocxTemplate
 
+from .dashboard import get_compliance_dashboard, invalidate_dashboard
+from .documents import merge_docx, render_docx, render_many, stream_zip
+from .events import broadcaster
+from .exports import (
+    CSV_CONTENT_TYPE, EDUCATION_EXPORT_COLUMNS, EMPLOYEE_EXPORT_COLUMNS, EXPORT_FORMATS, MED_EXPORT_COLUMNS,
+    XLSX_CONTENT_TYPE, stream_export,
+)
 from .forms import ChangePasswordForm, LoginForm
-from .models import Employee, Education, FileAttachment, Med, Notification
-from .tasks import check_expirations
+from .importers import get_import_format, import_educations, import_employees, import_meds, read_rows
+from .models import DocumentJob, Employee, Education, FileAttachment, Med, Notification
+from .pagination import after_cursor, get_ordering, get_page_size, paginate_keyset
+from .search import SEARCH_LIMIT, search_employees
+from .serializers import (
+    ATTACHMENT_FIELDS, EDUCATION_FIELDS, EMPLOYEE_FIELDS, MED_FIELDS, NDJSON_CONTENT_TYPE, FastJsonResponse,
+    format_datetime, format_iso_date, serialize_attachments, serialize_educations,
+    serialize_employees, serialize_meds, stream_ndjson,
+)
+from .streaming import stream_for, streaming_content
+from .tasks import (
+    find_system_user_id, generate_documents, get_notification_state, mark_notifications_read, schedule_expiration_recompute,
+    unread_notifications,
+)
+from .validation import (
+    EDUCATION_PROTOCOL_FIELDS, EDUCATION_REQUIRED_FIELDS, MED_REQUIRED_FIELDS, clean_education_data,
+    clean_education_protocol, clean_employee_data, clean_med_data, clean_udostoverenie_num,
+)
+
+logger = logging.getLogger(__name__)
 
 
 # === Вспомогательные классы ===
@@ -35,6 +68,182 @@ class UsersOnlyMixin:
         return super().dispatch(request, *args, **kwargs)
 
 
+# Допустимые сортировки и размер страницы для списка сотрудников на главной странице
+EMPLOYEE_ORDERINGS = {
+    'asc': ('FIO', 'id'),
+    'desc': ('-FIO', '-id'),
+}
+EMPLOYEE_PAGE_SIZE = 50
+
+# Допустимые сортировки списка сотрудников в фильтре; возраст сортируется по дате рождения
+EMPLOYEE_FILTER_ORDERINGS = {
+    'asc': ('FIO', 'id'),
+    'desc': ('-FIO', '-id'),
+    'age_asc': ('-birthday', 'id'),
+    'age_desc': ('birthday', 'id'),
+}
+
+# Допустимые сортировки для постраничных списков медосмотров и обучений
+RECORD_ORDERINGS = {
+    'date_to': ('date_to', 'id'),
+    'owner': ('owner__FIO', 'id'),
+}
+
+# Форматы ответа списков: json — страница целиком, ndjson — потоково все записи, по одной в строке
+LIST_FORMATS = ('json', 'ndjson')
+
+# MIME-тип документов Word (.docx)
+DOCX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+
+# Наибольшее количество уведомлений, отмечаемых прочитанными одним запросом
+NOTIFICATION_MARK_READ_MAX_IDS = 1000
+
+
+def years_ago(today, years):
+    """Возвращает дату, отстоящую от today на years лет назад (29 февраля → 28 февраля)."""
+    try:
+        return today.replace(year=today.year - years)
+    except ValueError:
+        return today.replace(year=today.year - years, day=28)
+
+
+def parse_age(value):
+    """Проверяет параметр возраста и возвращает его как целое число."""
+    try:
+        age = int(value)
+    except (ValueError, TypeError):
+        raise ValidationError('Возраст должен быть целым числом')
+    if age < 0 or age > 150:
+        raise ValidationError('Возраст должен быть от 0 до 150')
+    return age
+
+
+def employee_age_expression(today):
+    """SQL-выражение полного возраста сотрудника на дату today."""
+    birthday_not_reached = (
+        Q(birthday__month__gt=today.month) |
+        Q(birthday__month=today.month, birthday__day__gt=today.day)
+    )
+    return ExpressionWrapper(
+        Value(today.year) - ExtractYear('birthday') -
+        Case(When(birthday_not_reached, then=Value(1)), default=Value(0)),
+        output_field=IntegerField()
+    )
+
+
+def parse_query_date(value, field_name):
+    """Разбирает дату из параметра запроса в формате YYYY-MM-DD."""
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except (ValueError, TypeError):
+        raise ValidationError(f'{field_name} должен быть в формате YYYY-MM-DD')
+
+
+def filter_by_period(queryset, params):
+    """Оставляет записи, начавшиеся не раньше date_from и истекающие не позже date_to."""
+    if params.get('date_from'):
+        queryset = queryset.filter(date_from__gte=parse_query_date(params['date_from'], 'date_from'))
+    if params.get('date_to'):
+        queryset = queryset.filter(date_to__lte=parse_query_date(params['date_to'], 'date_to'))
+    return queryset
+
+
+def get_list_format(params):
+    """Проверяет параметр format списка и возвращает формат ответа."""
+    list_format = params.get('format') or 'json'
+    if list_format not in LIST_FORMATS:
+        raise ValidationError(f"Формат должен быть одним из: {', '.join(LIST_FORMATS)}")
+    return list_format
+
+
+def ndjson_response(request, queryset, serialize):
+    """Потоковый ответ NDJSON со строками queryset, прочитанными через серверный курсор."""
+    return StreamingHttpResponse(
+        streaming_content(request, stream_ndjson(queryset, serialize)),
+        content_type=NDJSON_CONTENT_TYPE
+    )
+
+
+def filter_employees(params, today):
+    """
+    Применяет к сотрудникам фильтры и сортировку из параметров запроса params.
+
+    Общие для списка сотрудников в фильтре и для выгрузки; к каждому сотруднику
+    добавляется возраст age на дату today.
+    """
+    employees = Employee.objects.annotate(age=employee_age_expression(today))
+
+    if params.get('order'):
+        employees = employees.order_by(*EMPLOYEE_FILTER_ORDERINGS.get(params['order'], ('FIO', 'id')))
+
+    is_edu = params.get('is_edu')
+    if is_edu:
+        if is_edu == 'a':
+            pass
+        elif is_edu == 'e':
+            employees = employees.filter(is_edu=True)
+        else:
+            employees = employees.filter(is_edu=False)
+
+    gender = params.get('gender')
+    if gender:
+        employees = employees.filter(gender=gender)
+
+    status = params.get('status')
+    if status:
+        if status not in dict(Employee.STATUS_CHOICES):
+            raise ValidationError(f"Статус должен быть одним из: {', '.join(dict(Employee.STATUS_CHOICES))}")
+        employees = employees.filter(status=status)
+
+    min_age = params.get('min_age')
+    max_age = params.get('max_age')
+    if min_age:
+        employees = employees.filter(birthday__lte=years_ago(today, parse_age(min_age)))
+    if max_age:
+        employees = employees.filter(birthday__gt=years_ago(today, parse_age(max_age) + 1))
+    return employees
+
+
+def filter_meds(params):
+    """Применяет к медосмотрам фильтры по типу и периоду из параметров запроса params."""
+    meds = Med.objects.all()
+    exam_type = params.get('type')
+    if exam_type:
+        if exam_type not in dict(Med.TYPE_CHOICHES):
+            raise ValidationError(f"Тип осмотра должен быть одним из: {', '.join(dict(Med.TYPE_CHOICHES))}")
+        meds = meds.filter(type=exam_type)
+    return filter_by_period(meds, params)
+
+
+def filter_educations(params):
+    """Применяет к записям об обучении фильтры по программе и периоду из параметров запроса params."""
+    educations = Education.objects.all()
+    program = params.get('program')
+    if program:
+        if program not in dict(Education.PROGRAM_CHOICES):
+            raise ValidationError(f"Программа должна быть одной из: {', '.join(dict(Education.PROGRAM_CHOICES))}")
+        educations = educations.filter(program=program)
+    return filter_by_period(educations, params)
+
+
+def employee_export_queryset(params):
+    """Сотрудники для выгрузки с фильтрами и сортировкой EmployeeFilterView."""
+    employees = filter_employees(params, date.today())
+    return employees if employees.ordered else employees.order_by('FIO', 'id')
+
+
+def med_export_queryset(params):
+    """Медосмотры для выгрузки с фильтрами и сортировкой AllMedicalExamView."""
+    ordering = get_ordering(params.get('order'), RECORD_ORDERINGS, 'date_to')
+    return filter_meds(params).order_by(*ordering)
+
+
+def education_export_queryset(params):
+    """Записи об обучении для выгрузки с фильтрами и сортировкой AllEducationsView."""
+    ordering = get_ordering(params.get('order'), RECORD_ORDERINGS, 'date_to')
+    return filter_educations(params).order_by(*ordering)
+
+
 # === Представления для аутентификации ===
 class CustomLoginView(LoginView):
     """Кастомное представление для входа в систему."""
@@ -84,7 +293,14 @@ class ForbiddenView(LoginRequiredMixin, TemplateView):
 
 
 class NotificationListView(LoginRequiredMixin, View):
-    """Представление для получения списка уведомлений."""
+    """
+    Представление для получения списка уведомлений.
+
+    Ответ помечается ETag по версии набора уведомлений и состояния прочтения пользователя:
+    пока они не менялись, на запрос с If-None-Match возвращается 304 без обращения к базе данных.
+    С параметром since=<id> возвращаются только уведомления с ID больше указанного,
+    а count по-прежнему содержит общее количество непрочитанных.
+    """
     def get(self, request):
         if request.user.is_staff:
             return JsonResponse({
@@ -92,37 +308,228 @@ class NotificationListView(LoginRequiredMixin, View):
                 'notifications': [],
                 'count': 0
             })
+
+        try:
+            since = parse_since(request.GET.get('since'))
+        except ValidationError as e:
+            return JsonResponse({
+                'status': 'ERROR',
+                'description': e.message
+            }, status=400)
+
         try:
-            system_user = User.objects.get(username='system_notification')
-        except User.DoesNotExist:
+            version, system_user_id = get_notification_state(request.user.id)
+        except redis.RedisError as e:
+            # Без кэша версия неизвестна: отдаём уведомления из базы данных без ETag
+            logger.warning(f"Notification state is unavailable, serving without ETag: {str(e)}")
+            version, system_user_id = None, find_system_user_id()
+        if system_user_id is None:
             return JsonResponse({
                 'status': 'ERROR',
                 'description': 'Системный пользователь не найден',
                 'notifications': [],
                 'count': 0
             })
-        unread_notifications = Notification.objects.filter(
-            Q(user=request.user) | Q(user=system_user),
-            is_read=False
-        ).order_by('-created_at')
-        notifications_data = [{
-            'message': notification.message,
-            'created_at': notification.created_at.strftime('%d.%m.%Y %H:%M')
-        } for notification in unread_notifications]
+
+        etag = f'"notifications-{version}-{request.user.id}"' if version is not None else None
+        response = get_conditional_response(request, etag=etag) if etag is not None else None
+        if response is None:
+            response = JsonResponse({
+                'status': 'SUCCESS',
+                **collect_notifications(request.user.id, system_user_id, since)
+            })
+        if etag is not None:
+            response['ETag'] = etag
+        response['Cache-Control'] = 'private, no-cache'
+        return response
+
+
+def collect_notifications(user_id, system_user_id, since=None):
+    """
+    Возвращает непрочитанные уведомления пользователя: все или только с ID больше since.
+
+    count всегда содержит общее количество непрочитанных, last_id — наибольший ID из переданных.
+    """
+    unread = unread_notifications(user_id, system_user_id)
+    count = unread.count() if since is not None else None
+    if since is not None:
+        unread = unread.filter(id__gt=since)
+    notifications_data = [{
+        'id': notification['id'],
+        'message': notification['message'],
+        'created_at': format_datetime(notification['created_at'])
+    } for notification in unread.order_by('-created_at', '-id').values('id', 'message', 'created_at')]
+    return {
+        'notifications': notifications_data,
+        'count': len(notifications_data) if count is None else count,
+        'last_id': max((n['id'] for n in notifications_data), default=since or 0)
+    }
+
+
+class NotificationMarkReadView(LoginRequiredMixin, View):
+    """
+    Представление для отметки уведомлений прочитанными текущим пользователем.
+
+    Принимает {"ids": [id, ...]} для отдельных уведомлений, {"up_to": id} для всех
+    уведомлений до указанного ID включительно или {"all": true} для всех уведомлений.
+    Отметка не влияет на других пользователей; в ответе — число оставшихся непрочитанных.
+    """
+    def post(self, request):
+        try:
+            data = json.loads(request.body)
+        except json.JSONDecodeError:
+            return JsonResponse({
+                'status': 'ERROR',
+                'description': 'Неверный формат JSON'
+            }, status=400)
+
+        try:
+            ids, up_to = parse_mark_read(data)
+        except ValidationError as e:
+            return JsonResponse({
+                'status': 'ERROR',
+                'description': e.message
+            }, status=400)
+
+        _, system_user_id = get_notification_state()
+        if system_user_id is None:
+            return JsonResponse({
+                'status': 'ERROR',
+                'description': 'Системный пользователь не найден'
+            })
+
+        count = mark_notifications_read(request.user.id, system_user_id, ids=ids, up_to=up_to)
         return JsonResponse({
             'status': 'SUCCESS',
-            'notifications': notifications_data,
-            'count': len(notifications_data)
+            'count': count
         })
 
 
+def parse_mark_read(data):
+    """
+    Проверяет тело запроса NotificationMarkReadView и возвращает пару (ids, up_to).
+
+    Для {"all": true} возвращается (None, None).
+    """
+    if not isinstance(data, dict):
+        raise ValidationError('Ожидается объект JSON')
+    if 'ids' in data:
+        ids = data['ids']
+        if not isinstance(ids, list) or not all(isinstance(i, int) and not isinstance(i, bool) for i in ids):
+            raise ValidationError('ids должен быть списком целых чисел')
+        if len(ids) > NOTIFICATION_MARK_READ_MAX_IDS:
+            raise ValidationError(f'Можно отметить не более {NOTIFICATION_MARK_READ_MAX_IDS} уведомлений за раз')
+        return ids, None
+    if 'up_to' in data:
+        up_to = data['up_to']
+        if not isinstance(up_to, int) or isinstance(up_to, bool) or up_to < 0:
+            raise ValidationError('up_to должен быть неотрицательным целым числом')
+        return None, up_to
+    if data.get('all') is True:
+        return None, None
+    raise ValidationError('Укажите ids, up_to или all')
+
+
+def parse_since(value):
+    """Проверяет параметр since и возвращает его как целое число или None."""
+    if value in (None, ''):
+        return None
+    try:
+        return int(value)
+    except (ValueError, TypeError):
+        raise ValidationError('since должен быть целым числом')
+
+
+async def notification_stream(request):
+    """
+    Поток уведомлений в формате Server-Sent Events.
+
+    Работает только под ASGI: при каждом изменении набора уведомлений (событие Redis pub/sub)
+    отправляет подключению новые уведомления и общее количество непрочитанных в том же
+    формате, что и NotificationListView с параметром since. Под WSGI, а также для
+    администраторов отвечает 204, и клиент остаётся на периодическом опросе.
+    """
+    user = await request.auser()
+    if not user.is_authenticated:
+        return JsonResponse({
+            'status': 'ERROR',
+            'description': 'Требуется авторизация'
+        }, status=401)
+    if user.is_staff or not isinstance(request, ASGIRequest):
+        return HttpResponse(status=204)
+
+    try:
+        since = parse_since(request.headers.get('Last-Event-ID') or request.GET.get('since'))
+    except ValidationError as e:
+        return JsonResponse({
+            'status': 'ERROR',
+            'description': e.message
+        }, status=400)
+
+    async def events():
+        queue = broadcaster.subscribe()
+        last_id, count = since or 0, None
+        try:
+            yield 'retry: 10000\n\n'
+            while True:
+                _, system_user_id = await sync_to_async(get_notification_state)()
+                if system_user_id is not None:
+                    data = await sync_to_async(collect_notifications)(user.id, system_user_id, last_id)
+                    if data['notifications'] or data['count'] != count:
+                        last_id, count = data['last_id'], data['count']
+                        payload = json.dumps(data, ensure_ascii=False)
+                        yield f'id: {last_id}\nevent: notifications\ndata: {payload}\n\n'
+                while True:
+                    try:
+                        await asyncio.wait_for(queue.get(), timeout=settings.NOTIFICATION_STREAM_HEARTBEAT)
+                        break
+                    except asyncio.TimeoutError:
+                        yield ': ping\n\n'
+        finally:
+            broadcaster.unsubscribe(queue)
+
+    response = StreamingHttpResponse(events(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
 # === Представления для главной страницы ===
 class IndexView(LoginRequiredMixin, UsersOnlyMixin, ListView):
-    """Представление главной страницы со списком сотрудников."""
+    """Представление главной страницы с первой страницей списка сотрудников."""
     model = Employee
     template_name = 'guard/main_page.html'
     context_object_name = 'employees'
 
+    def get_queryset(self):
+        return Employee.objects.only('id', 'FIO')
+
+    def get_context_data(self, **kwargs):
+        employees, next_cursor = paginate_keyset(
+            self.object_list, EMPLOYEE_ORDERINGS['asc'], limit=EMPLOYEE_PAGE_SIZE
+        )
+        context = super().get_context_data(object_list=employees, **kwargs)
+        context['next_cursor'] = next_cursor
+        return context
+
+
+class ComplianceDashboardView(LoginRequiredMixin, UsersOnlyMixin, View):
+    """
+    Сводка по срокам действия: количество просроченных, истекающих в течение 30/60/90 дней
+    и действующих медосмотров по типу и записей об обучении по программе и подразделению.
+    """
+    def get(self, request):
+        try:
+            return FastJsonResponse({
+                'status': 'SUCCESS',
+                **get_compliance_dashboard()
+            })
+        except Exception as e:
+            return JsonResponse({
+                'status': 'ERROR',
+                'description': str(e)
+            }, status=500)
+
 
 # === Представления для работы с сотрудниками ===
 class GetCurentUserDetails(LoginRequiredMixin, UsersOnlyMixin, View):
@@ -140,8 +547,30 @@ def get_worker_FIO(request, worker_id):
     return JsonResponse({'FIO': emp.FIO})
 
 
+class EmployeePageView(LoginRequiredMixin, UsersOnlyMixin, View):
+    """Представление для подгрузки следующей страницы списка сотрудников."""
+    def get(self, request):
+        try:
+            ordering = get_ordering(request.GET.get('order'), EMPLOYEE_ORDERINGS, 'asc')
+            limit = get_page_size(request.GET.get('limit'), default=EMPLOYEE_PAGE_SIZE)
+            employees, next_cursor = paginate_keyset(
+                Employee.objects.values('id', 'FIO'), ordering, request.GET.get('cursor'), limit
+            )
+        except ValidationError as e:
+            return JsonResponse({
+                'status': 'ERROR',
+                'description': e.message
+            }, status=400)
+
+        return FastJsonResponse({
+            'status': 'SUCCESS',
+            'employees': employees,
+            'next_cursor': next_cursor
+        })
+
+
 class EmployeeSearch(LoginRequiredMixin, UsersOnlyMixin, View):
-    """Представление для поиска сотрудников по ФИО."""
+    """Представление для нечёткого поиска сотрудников по ФИО с ранжированием."""
     def post(self, request):
         try:
             data = json.loads(request.body)
@@ -157,101 +586,112 @@ class EmployeeSearch(LoginRequiredMixin, UsersOnlyMixin, View):
                 'description': 'Отсутствует обязательное поле: query'
             }, status=400)
 
-        results = Employee.objects.filter(Q(FIO__icontains=data["query"]))
-        employees_data = [{
-            'id': emp.id,
-            'FIO': f"{emp.FIO}",
-            'gender': emp.get_gender_display(),
-            'birthday': emp.birthday.strftime('%d.%m.%Y'),
-            'age': emp.get_age(),
-            'position': emp.position
-        } for emp in results]
+        if not isinstance(data['query'], str):
+            return JsonResponse({
+                'status': 'ERROR',
+                'description': 'Поле query должно быть строкой'
+            }, status=400)
 
-        return JsonResponse({
+        try:
+            limit = get_page_size(data.get('limit'), default=SEARCH_LIMIT)
+        except ValidationError as e:
+            return JsonResponse({
+                'status': 'ERROR',
+                'description': e.message
+            }, status=400)
+
+        results = search_employees(data['query'], limit=limit, fields=EMPLOYEE_FIELDS)
+        return FastJsonResponse({
             "status": "SUCCESS",
-            "employees": employees_data
+            "employees": serialize_employees(results, date.today())
         }, status=200)
 
 
 class EmployeeFilterView(LoginRequiredMixin, UsersOnlyMixin, View):
-    """Представление для фильтрации сотрудников."""
+    """
+    Представление для фильтрации сотрудников.
+
+    Границы возраста переводятся в точный диапазон дат рождения, а сортировка по возрасту —
+    в сортировку по дате рождения, поэтому фильтрация и сортировка используют индексы.
+    С format=ndjson сотрудники отдаются потоково, по одному JSON-объекту в строке.
+    """
     def get(self, request):
         id = request.GET.get('id')
-        gender = request.GET.get('gender')
-        min_age = request.GET.get('min_age')
-        max_age = request.GET.get('max_age')
-        is_edu = request.GET.get('is_edu')
-        order = request.GET.get('order')
         today = date.today()
 
         if id:
-            employee = get_object_or_404(Employee, pk=id)
-            employee_data = {
-                'id': employee.id,
-                'FIO': employee.FIO,
-                'gender': employee.get_gender_display(),
-                'birthday': employee.birthday.strftime('%d.%m.%Y'),
-                'age': employee.get_age(),
-                'position': employee.position,
-                'department': employee.department,
-                'oms_number': employee.oms_number,
-                'dms_number': employee.dms_number,
-                'is_edu': employee.is_edu,
-                'status': employee.get_status_display(),
-                'status_code': employee.status
-            }
-            return JsonResponse({
+            employee = get_object_or_404(Employee.objects.values(*EMPLOYEE_FIELDS), pk=id)
+            return FastJsonResponse({
                 "status": "SUCCESS",
-                "employees": employee_data
+                "employees": serialize_employees([employee], today)[0]
             }, status=200)
 
-        employees = Employee.objects.all()
-
-        if order:
-            if order == 'desc':
-                employees = employees.order_by('-FIO')
-            else:
-                employees = employees.order_by('FIO')
+        try:
+            list_format = get_list_format(request.GET)
+            employees = filter_employees(request.GET, today)
+        except ValidationError as e:
+            return JsonResponse({
+                'status': 'ERROR',
+                'description': e.message
+            }, status=400)
 
-        if is_edu:
-            if is_edu == 'a':
-                pass
-            elif is_edu == 'e':
-                employees = employees.filter(is_edu=True)
-            else:
-                employees = employees.filter(is_edu=False)
-
-        if gender:
-            employees = employees.filter(gender=gender)
-
-        if min_age or max_age:
-            if min_age:
-                max_birth_year = today.year - int(min_age)
-                employees = employees.filter(birthday__year__lte=max_birth_year)
-            if max_age:
-                min_birth_year = today.year - int(max_age)
-                employees = employees.filter(birthday__year__gte=min_birth_year)
-
-        employees_data = [{
-            'id': emp.id,
-            'FIO': emp.FIO,
-            'gender': emp.get_gender_display(),
-            'birthday': emp.birthday.strftime('%d.%m.%Y'),
-            'age': emp.get_age(),
-            'position': emp.position,
-            'department': emp.department,
-            'oms_number': emp.oms_number,
-            'dms_number': emp.dms_number,
-            'status': emp.get_status_display(),
-            'is_edu': emp.is_edu
-        } for emp in employees]
+        if list_format == 'ndjson':
+            return ndjson_response(
+                request, employees.values(*EMPLOYEE_FIELDS, 'age'), partial(serialize_employees, today=today)
+            )
 
-        return JsonResponse({
+        return FastJsonResponse({
             "status": "SUCCESS",
-            "employees": employees_data
+            "employees": serialize_employees(employees.values(*EMPLOYEE_FIELDS, 'age'), today)
         }, status=200)
 
 
+class ExportView(LoginRequiredMixin, UsersOnlyMixin, View):
+    """
+    Базовое представление потоковой выгрузки в CSV или XLSX.
+
+    Формат задаётся параметром format (по умолчанию csv), остальные параметры — те же фильтры,
+    что и у соответствующего списка. Записи читаются из базы данных частями, а файл отдаётся
+    по мере формирования, поэтому расход памяти не зависит от объёма выгрузки. Подклассы
+    задают столбцы columns, имя файла filename и функцию export_queryset, которая строит
+    QuerySet выгрузки по параметрам запроса.
+    """
+    export_queryset = None
+    columns = ()
+    filename = 'export'
+
+    def get(self, request):
+        export_format = request.GET.get('format', 'csv')
+        if export_format not in EXPORT_FORMATS:
+            return JsonResponse({
+                'status': 'ERROR',
+                'description': f"Формат должен быть одним из: {', '.join(EXPORT_FORMATS)}"
+            }, status=400)
+
+        try:
+            queryset = self.export_queryset(request.GET)
+        except ValidationError as e:
+            return JsonResponse({
+                'status': 'ERROR',
+                'description': e.message
+            }, status=400)
+
+        response = StreamingHttpResponse(
+            streaming_content(request, stream_export(queryset, self.columns, export_format)),
+            content_type=CSV_CONTENT_TYPE if export_format == 'csv' else XLSX_CONTENT_TYPE
+        )
+        filename = f'{self.filename}_{date.today().isoformat()}.{export_format}'
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+
+class EmployeeExportView(ExportView):
+    """Потоковая выгрузка сотрудников с фильтрами и сортировкой EmployeeFilterView."""
+    export_queryset = staticmethod(employee_export_queryset)
+    columns = EMPLOYEE_EXPORT_COLUMNS
+    filename = 'employees'
+
+
 class EmployeeAddView(LoginRequiredMixin, UsersOnlyMixin, View):
     """Представление для добавления нового сотрудника."""
     def post(self, request):
@@ -264,67 +704,8 @@ class EmployeeAddView(LoginRequiredMixin, UsersOnlyMixin, View):
                     'description': 'Неверный формат JSON'
                 }, status=400)
 
-            required_fields = ['FIO', 'gender', 'birthday', 'position', 'status', 'is_edu']
-            for field in required_fields:
-                if field not in data:
-                    return JsonResponse({
-                        'status': 'ERROR',
-                        'description': f'Отсутствует обязательное поле: {field}'
-                    }, status=400)
-
             try:
-                if not isinstance(data['FIO'], str) or len(data['FIO'].strip()) == 0:
-                    raise ValidationError('ФИО должно быть непустой строкой')
-
-                full_name = data['FIO'].strip()
-                if not re.fullmatch(r'^[А-ЯЁ][а-яё]+(?:\s[А-ЯЁ][а-яё]+){1,2}$', full_name):
-                    raise ValidationError('ФИО должно содержать 2-3 слова на кириллице, каждое начинается с заглавной буквы')
-
-                if data['gender'] not in ['M', 'F']:
-                    raise ValidationError("Пол должен быть одним из: 'M', 'F'")
-
-                try:
-                    birthday = datetime.strptime(data['birthday'], '%Y-%m-%d').date()
-                    today = date.today()
-                    min_age_date = date(today.year - 100, today.month, today.day)
-                    max_age_date = date(today.year - 14, today.month, today.day)
-
-                    if birthday > today:
-                        raise ValidationError('Дата рождения не может быть в будущем')
-                    if birthday < min_age_date:
-                        raise ValidationError('Возраст не может быть больше 100 лет')
-                    if birthday > max_age_date:
-                        raise ValidationError('Возраст должен быть не менее 14 лет')
-                except (ValueError, TypeError):
-                    raise ValidationError('Дата рождения должна быть в формате YYYY-MM-DD')
-
-                if not isinstance(data['position'], str) or len(data['position'].strip()) < 3:
-                    raise ValidationError('Должность должна быть строкой длиной не менее 3 символов')
-
-                if data['status'] not in ['W', 'V', 'BT', 'S']:
-                    raise ValidationError("Статус должен быть одним из: 'W', 'V', 'BT', 'S'")
-
-                if not isinstance(data['is_edu'], bool):
-                    raise ValidationError('is_edu должно быть булевым значением')
-
-                department = data.get('department')
-                if department and not isinstance(department, str):
-                    raise ValidationError('Отдел должен быть строкой, если указан')
-
-                oms_number = data.get('oms_number')
-                if oms_number:
-                    if not isinstance(oms_number, str):
-                        raise ValidationError('Номер ОМС должен быть строкой, если указан')
-                    if len(oms_number) != 16 or not oms_number.isdigit():
-                        raise ValidationError('Номер ОМС должен содержать ровно 16 цифр')
-
-                dms_number = data.get('dms_number')
-                if dms_number:
-                    if not isinstance(dms_number, str):
-                        raise ValidationError('Номер ДМС должен быть строкой, если указан')
-                    if len(dms_number) < 10:
-                        raise ValidationError('Номер ДМС должен содержать не менее 10 символов')
-
+                employee_data = clean_employee_data(data)
             except ValidationError as e:
                 return JsonResponse({
                     'status': 'ERROR',
@@ -333,17 +714,7 @@ class EmployeeAddView(LoginRequiredMixin, UsersOnlyMixin, View):
 
             try:
                 with transaction.atomic():
-                    employee = Employee(
-                        FIO=data['FIO'].strip(),
-                        gender=data['gender'],
-                        birthday=birthday,
-                        position=data['position'].strip(),
-                        department=data.get('department', '').strip(),
-                        oms_number=data.get('oms_number', '').strip(),
-                        dms_number=data.get('dms_number', '').strip(),
-                        status=data['status'],
-                        is_edu=data['is_edu']
-                    )
+                    employee = Employee(**employee_data)
                     employee.full_clean()
                     employee.save()
 
@@ -365,6 +736,56 @@ class EmployeeAddView(LoginRequiredMixin, UsersOnlyMixin, View):
             }, status=500)
 
 
+class ImportView(LoginRequiredMixin, UsersOnlyMixin, View):
+    """
+    Базовое представление массового импорта из CSV или XLSX.
+
+    Принимает файл в поле file (multipart/form-data); с dry_run=true строки только
+    проверяются. Подклассы задают функцию импорта import_rows и текст ошибки сохранения.
+    """
+    import_rows = None
+    error_description = 'Ошибка импорта'
+
+    def post(self, request):
+        uploaded_file = request.FILES.get('file')
+        if uploaded_file is None:
+            return JsonResponse({
+                'status': 'ERROR',
+                'description': 'Отсутствует файл'
+            }, status=400)
+
+        dry_run = request.POST.get('dry_run', '').lower() in ('1', 'true')
+        try:
+            file_format = get_import_format(uploaded_file.name)
+            report = self.import_rows(read_rows(uploaded_file.file, file_format), dry_run=dry_run)
+        except ValidationError as e:
+            return JsonResponse({
+                'status': 'ERROR',
+                'description': e.message
+            }, status=400)
+        except Exception as e:
+            return JsonResponse({
+                'status': 'ERROR',
+                'description': f'{self.error_description}: {str(e)}'
+            }, status=500)
+
+        return FastJsonResponse({
+            'status': 'SUCCESS',
+            'dry_run': dry_run,
+            **report
+        })
+
+
+class EmployeeImportView(ImportView):
+    """
+    Представление для массового импорта сотрудников из CSV или XLSX.
+
+    В ответе — количество строк, созданных записей и ошибки по строкам.
+    """
+    import_rows = staticmethod(import_employees)
+    error_description = 'Ошибка импорта сотрудников'
+
+
 class EmployeeUpdateView(LoginRequiredMixin, UsersOnlyMixin, View):
     """Представление для обновления данных сотрудника."""
     def patch(self, request, worker_id):
@@ -503,7 +924,6 @@ class EmployeeDeleteView(LoginRequiredMixin, UsersOnlyMixin, View):
             try:
                 employee = get_object_or_404(Employee, pk=employee_id)
                 employee.delete()
-                check_expirations()
                 return JsonResponse({
                     'status': 'SUCCESS',
                     'description': f'Сотрудник с ID {employee_id} удален'
@@ -523,29 +943,36 @@ class EmployeeDeleteView(LoginRequiredMixin, UsersOnlyMixin, View):
 
 # === Представления для медицинских осмотров ===
 class AllMedicalExamView(LoginRequiredMixin, UsersOnlyMixin, View):
-    """Представление для получения всех медицинских осмотров."""
+    """
+    Представление для постраничного получения медицинских осмотров.
+
+    С format=ndjson вместо страницы потоково отдаются все подходящие записи после курсора
+    (limit не учитывается), по одному JSON-объекту в строке.
+    """
     def get(self, request):
         try:
-            med_data = Med.objects.all().select_related('owner').prefetch_related('attachments')
-            data = [{
-                'id': med.id,
-                'owner': med.owner.FIO,
-                'type': med.get_type_display(),
-                'type_code': med.type,
-                'date_from': med.date_from.strftime('%d.%m.%Y'),
-                'date_to': med.date_to.strftime('%d.%m.%Y'),
-                'attachments': [{
-                    'id': att.id,
-                    'name': att.file.name.split('/')[-1] if att.file else '',
-                    'url': att.file.url if att.file else '',
-                    'size': att.get_file_size() if att.file else 0,
-                    'uploaded_at': att.uploaded_at.strftime('%d.%m.%Y %H:%M') if att.uploaded_at else ''
-                } for att in med.attachments.all()]
-            } for med in med_data]
-            return JsonResponse({
+            try:
+                list_format = get_list_format(request.GET)
+                ordering = get_ordering(request.GET.get('order'), RECORD_ORDERINGS, 'date_to')
+                med_data = filter_meds(request.GET).values(*MED_FIELDS)
+                if list_format == 'ndjson':
+                    return ndjson_response(
+                        request, after_cursor(med_data, ordering, request.GET.get('cursor')), serialize_meds
+                    )
+
+                limit = get_page_size(request.GET.get('limit'))
+                meds, next_cursor = paginate_keyset(med_data, ordering, request.GET.get('cursor'), limit)
+            except ValidationError as e:
+                return JsonResponse({
+                    'status': 'ERROR',
+                    'description': e.message
+                }, status=400)
+
+            return FastJsonResponse({
                 'status': 'SUCCESS',
-                'data': data
-            }, safe=False)
+                'data': serialize_meds(meds),
+                'next_cursor': next_cursor
+            })
         except Exception as e:
             return JsonResponse({
                 'status': 'ERROR',
@@ -553,32 +980,22 @@ class AllMedicalExamView(LoginRequiredMixin, UsersOnlyMixin, View):
             }, status=500)
 
 
+class MedicalExamExportView(ExportView):
+    """Потоковая выгрузка медосмотров с фильтрами и сортировкой AllMedicalExamView."""
+    export_queryset = staticmethod(med_export_queryset)
+    columns = MED_EXPORT_COLUMNS
+    filename = 'medical_exams'
+
+
 class GetMedicalExamView(LoginRequiredMixin, UsersOnlyMixin, View):
     """Представление для получения данных конкретного медосмотра."""
     def get(self, request, med_id):
         try:
-            med_data = get_object_or_404(Med, pk=med_id)
-            attachments = FileAttachment.objects.filter(med=med_data)
-            files_data = [{
-                'id': att.id,
-                'name': att.file.name.split('/')[-1],
-                'url': att.file.url,
-                'uploaded_at': att.uploaded_at.strftime('%d.%m.%Y %H:%M'),
-                'size': att.get_file_size()
-            } for att in attachments]
-            data = [{
-                'id': med_data.id,
-                'owner': med_data.owner.FIO,
-                'type': med_data.get_type_display(),
-                'type_code': med_data.type,
-                'date_from': med_data.date_from.strftime('%Y-%m-%d'),
-                'date_to': med_data.date_to.strftime('%Y-%m-%d'),
-                'attachments': files_data
-            }]
-            return JsonResponse({
+            med_data = get_object_or_404(Med.objects.values(*MED_FIELDS), pk=med_id)
+            return FastJsonResponse({
                 'status': 'SUCCESS',
-                'data': data
-            }, safe=False)
+                'data': serialize_meds([med_data], date_format=format_iso_date)
+            })
         except Exception as e:
             return JsonResponse({
                 'status': 'ERROR',
@@ -589,32 +1006,8 @@ class GetMedicalExamView(LoginRequiredMixin, UsersOnlyMixin, View):
 @login_required
 def get_worker_med(request, worker_id):
     """Получение медицинских осмотров сотрудника по ID."""
-    data = []
-    emp = get_object_or_404(Employee, pk=worker_id)
-    med_queryset = Med.objects.filter(owner=emp).prefetch_related('attachments')
-    med_list = list(med_queryset)
-    attachments = FileAttachment.objects.filter(med__in=med_list)
-    attachments_dict = {}
-    for att in attachments:
-        if att.med_id not in attachments_dict:
-            attachments_dict[att.med_id] = []
-        attachments_dict[att.med_id].append({
-            'id': att.id,
-            'name': att.file.name.split('/')[-1],
-            'uploaded_at': att.uploaded_at.strftime('%d.%m.%Y %H:%M')
-        })
-
-    for data_med in med_list:
-        files_data = attachments_dict.get(data_med.id, [])
-        data.append({
-            'id': data_med.id,
-            'type': data_med.get_type_display(),
-            'date_from': data_med.date_from.strftime("%d.%m.%Y") if data_med.date_from else None,
-            'date_to': data_med.date_to.strftime("%d.%m.%Y") if data_med.date_to else None,
-            'attachments': files_data
-        })
-
-    return JsonResponse({'data': data})
+    emp = get_object_or_404(Employee.objects.only('id'), pk=worker_id)
+    return FastJsonResponse({'data': serialize_meds(Med.objects.filter(owner=emp).values(*MED_FIELDS))})
 
 
 class MedicalExamAddView(LoginRequiredMixin, UsersOnlyMixin, View):
@@ -629,7 +1022,7 @@ class MedicalExamAddView(LoginRequiredMixin, UsersOnlyMixin, View):
                     'description': 'Неверный формат JSON'
                 }, status=400)
 
-            required_fields = ['employee_id', 'exam_type', 'exam_date', 'expiry_date']
+            required_fields = ['employee_id', *MED_REQUIRED_FIELDS]
             for field in required_fields:
                 if field not in data:
                     return JsonResponse({
@@ -646,24 +1039,7 @@ class MedicalExamAddView(LoginRequiredMixin, UsersOnlyMixin, View):
                 if not Employee.objects.filter(id=employee_id).exists():
                     raise ValidationError('Сотрудник с таким ID не существует')
 
-                valid_exam_types = ['periodic', 'preliminary', 'fluorography', 'psych_examination']
-                if data['exam_type'] not in valid_exam_types:
-                    raise ValidationError(f"Тип осмотра должен быть одним из: {', '.join(valid_exam_types)}")
-
-                try:
-                    exam_date = datetime.strptime(data['exam_date'], '%Y-%m-%d').date()
-                    if exam_date > date.today():
-                        raise ValidationError('Дата осмотра не может быть в будущем')
-                except (ValueError, TypeError):
-                    raise ValidationError('Дата осмотра должна быть в формате YYYY-MM-DD')
-
-                try:
-                    expiry_date = datetime.strptime(data['expiry_date'], '%Y-%m-%d').date()
-                except (ValueError, TypeError):
-                    raise ValidationError('Дата окончания должна быть в формате YYYY-MM-DD')
-
-                if expiry_date < exam_date:
-                    raise ValidationError('Дата окончания не может быть раньше даты осмотра')
+                med_data = clean_med_data(data)
 
             except ValidationError as e:
                 return JsonResponse({
@@ -673,15 +1049,9 @@ class MedicalExamAddView(LoginRequiredMixin, UsersOnlyMixin, View):
 
             try:
                 with transaction.atomic():
-                    medical_exam = Med(
-                        owner=Employee.objects.get(pk=employee_id),
-                        type=data['exam_type'],
-                        date_from=exam_date,
-                        date_to=expiry_date
-                    )
+                    medical_exam = Med(owner=Employee.objects.get(pk=employee_id), **med_data)
                     medical_exam.full_clean()
                     medical_exam.save()
-                    check_expirations()
                 return JsonResponse({
                     'status': 'SUCCESS',
                     'id': medical_exam.id
@@ -699,6 +1069,16 @@ class MedicalExamAddView(LoginRequiredMixin, UsersOnlyMixin, View):
             }, status=500)
 
 
+class MedicalExamImportView(ImportView):
+    """
+    Представление для массового импорта медосмотров из CSV или XLSX.
+
+    Сотрудник определяется по ФИО и дате рождения; в ответе — результат по каждой строке.
+    """
+    import_rows = staticmethod(import_meds)
+    error_description = 'Ошибка импорта медицинских осмотров'
+
+
 class MedicalExamUpdateView(LoginRequiredMixin, UsersOnlyMixin, View):
     """Представление для обновления данных медосмотра."""
     def patch(self, request, med_id):
@@ -712,8 +1092,6 @@ class MedicalExamUpdateView(LoginRequiredMixin, UsersOnlyMixin, View):
                 }, status=400)
 
             medical_exam = get_object_or_404(Med, id=med_id)
-            old_date_from = medical_exam.date_from
-            old_date_to = medical_exam.date_to
 
             required_fields = ['exam_type', 'exam_date', 'expiry_date']
             for field in required_fields:
@@ -756,9 +1134,6 @@ class MedicalExamUpdateView(LoginRequiredMixin, UsersOnlyMixin, View):
                     medical_exam.date_to = expiry_date
                     medical_exam.full_clean()
                     medical_exam.save()
-                    dates_changed = (old_date_from != exam_date) or (old_date_to != expiry_date)
-                    if dates_changed:
-                        check_expirations()
                 return JsonResponse({
                     'status': 'SUCCESS',
                     'id': medical_exam.id
@@ -802,7 +1177,6 @@ class MedDeleteView(LoginRequiredMixin, UsersOnlyMixin, View):
             try:
                 med = get_object_or_404(Med, pk=med_id)
                 med.delete()
-                check_expirations()
                 return JsonResponse({
                     'status': 'SUCCESS',
                     'description': f'Медосмотр с ID {med_id} удален'
@@ -1302,9 +1676,16 @@ class MedicalDirectionView(LoginRequiredMixin, UsersOnlyMixin, View):
         }
 
     def generate_document(self, template_path, context, data):
-        """Генерирует документ направления."""
-        doc = DocxTemplate(template_path)
-        doc.render(context)
+        """Генерирует документ направления в памяти и отдаёт его потоком."""
+        return stream_for(self.request, FileResponse(
+            render_docx(template_path, context),
+            as_attachment=True,
+            filename=self.get_filename(data),
+            content_type=DOCX_CONTENT_TYPE
+        ))
+
+    def get_filename(self, data):
+        """Возвращает имя файла направления: транслитерированное ФИО и тип осмотра."""
         full_name = data.get('FIO', '')
         exam_type = data.get('examinationType')
         translit_name = self.transliterate_name(full_name)
@@ -1314,20 +1695,7 @@ class MedicalDirectionView(LoginRequiredMixin, UsersOnlyMixin, View):
             'psychiatric': 'psych'
         }
         exam_suffix = exam_type_mapping.get(exam_type, '')
-        filename = f"{translit_name}_{exam_suffix}.docx"
-        temp_dir = tempfile.gettempdir()
-        temp_path = os.path.join(temp_dir, filename)
-        doc.save(temp_path)
-
-        with open(temp_path, 'rb') as f:
-            response = HttpResponse(
-                f.read(),
-                content_type='application/vnd.openxmlformats-officedocument.wordprocessingml.document'
-            )
-            response['Content-Disposition'] = f'attachment; filename={filename}'
-
-        os.unlink(temp_path)
-        return response
+        return f"{translit_name}_{exam_suffix}.docx"
 
     @staticmethod
     def transliterate_name(name):
@@ -1373,33 +1741,278 @@ class MedicalDirectionView(LoginRequiredMixin, UsersOnlyMixin, View):
             return date_str
 
 
+class MedicalDirectionBatchView(MedicalDirectionView):
+    """
+    Пакетная генерация направлений для списка сотрудников.
+
+    Принимает employeeIds, тип осмотра и общие данные медицинской организации и представителя
+    работодателя; данные сотрудника берутся из карточки. Документы рендерятся параллельно
+    в пуле процессов и отдаются ZIP-архивом (format=zip) или одним документом (format=docx).
+    """
+    FORMATS = ('zip', 'docx')
+
+    def post(self, request, *args, **kwargs):
+        try:
+            try:
+                data = json.loads(request.body)
+            except json.JSONDecodeError:
+                return JsonResponse({
+                    'status': 'ERROR',
+                    'message': 'Неверный формат JSON'
+                }, status=400)
+
+            batch, error_response = self.prepare_batch(data)
+            if error_response:
+                return error_response
+
+            template_path = os.path.join(self.TEMPLATES_DIR, batch['template_name'])
+            directions = batch['directions']
+            documents = render_many(template_path, [self.prepare_context(d) for d in directions])
+            if batch['format'] == 'docx':
+                return stream_for(request, FileResponse(
+                    merge_docx(documents),
+                    as_attachment=True,
+                    filename=self.get_batch_filename('docx'),
+                    content_type=DOCX_CONTENT_TYPE
+                ))
+
+            filenames = [self.get_batch_item_filename(d) for d in directions]
+            response = StreamingHttpResponse(stream_zip(zip(filenames, documents)), content_type='application/zip')
+            response['Content-Disposition'] = f'attachment; filename="{self.get_batch_filename("zip")}"'
+            return stream_for(request, response)
+
+        except Exception as e:
+            return JsonResponse({
+                'status': 'ERROR',
+                'message': str(e)
+            }, status=500)
+
+    def prepare_batch(self, data):
+        """
+        Проверяет пакетный запрос и собирает данные направлений для каждого сотрудника.
+
+        Возвращает пару (пакет, None) или (None, JsonResponse с ошибкой).
+        """
+        output_format = data.get('format', 'zip')
+        if output_format not in self.FORMATS:
+            return None, JsonResponse({
+                'status': 'ERROR',
+                'message': f"Формат должен быть одним из: {', '.join(self.FORMATS)}"
+            }, status=400)
+
+        employee_ids = data.get('employeeIds')
+        if (not isinstance(employee_ids, list) or not employee_ids
+                or not all(isinstance(i, int) and not isinstance(i, bool) for i in employee_ids)):
+            return None, JsonResponse({
+                'status': 'ERROR',
+                'message': 'employeeIds должен быть непустым списком ID сотрудников'
+            }, status=400)
+        if len(employee_ids) > settings.DIRECTION_BATCH_MAX_SIZE:
+            return None, JsonResponse({
+                'status': 'ERROR',
+                'message': f'Не более {settings.DIRECTION_BATCH_MAX_SIZE} сотрудников за один запрос'
+            }, status=400)
+
+        employees = Employee.objects.in_bulk(employee_ids)
+        missing = [employee_id for employee_id in employee_ids if employee_id not in employees]
+        if missing:
+            return None, JsonResponse({
+                'status': 'ERROR',
+                'message': f"Сотрудники не найдены: {', '.join(map(str, missing))}"
+            }, status=404)
+
+        directions = []
+        errors = {}
+        for employee_id in dict.fromkeys(employee_ids):
+            employee_data = self.get_employee_data(data, employees[employee_id])
+            validation_result = self.validate_data(employee_data)
+            if not validation_result['is_valid']:
+                errors[employee_id] = f"{employees[employee_id].FIO}: {validation_result['message']}"
+                continue
+            directions.append(employee_data)
+        if errors:
+            return None, JsonResponse({
+                'status': 'ERROR',
+                'message': 'Ошибка валидации',
+                'errors': errors
+            }, status=400)
+
+        template_name = self.get_template_name(data['examinationType'])
+        if not os.path.exists(os.path.join(self.TEMPLATES_DIR, template_name)):
+            return None, JsonResponse({
+                'status': 'ERROR',
+                'message': 'Шаблон не найден'
+            }, status=500)
+
+        return {'format': output_format, 'template_name': template_name, 'directions': directions}, None
+
+    def get_batch_item_filename(self, data):
+        """Возвращает имя файла направления внутри архива: ID сотрудника и имя файла направления."""
+        return f"{data['employeeId']}_{self.get_filename(data)}"
+
+    @staticmethod
+    def get_batch_filename(extension):
+        """Возвращает имя файла пакета направлений."""
+        return f"napravleniya_{date.today().strftime('%Y%m%d')}.{extension}"
+
+    def get_employee_data(self, data, employee):
+        """Дополняет общие данные направления сведениями из карточки сотрудника."""
+        employee_data = dict(data)
+        employee_data.update({
+            'employeeId': employee.id,
+            'FIO': employee.FIO,
+            'birthDate': employee.birthday.strftime('%Y-%m-%d'),
+            'gender': employee.gender,
+            'position': employee.position,
+            'positionPsych': employee.position,
+            'departmentName': employee.department or '',
+            'hasOMS': bool(employee.oms_number),
+            'OMSNumber': employee.oms_number or '',
+            'hasDMS': bool(employee.dms_number),
+            'DMSNumber': employee.dms_number or '',
+        })
+        return employee_data
+
+
+class MedicalDirectionJobView(MedicalDirectionBatchView):
+    """
+    Запуск пакетной генерации направлений в фоновом задании Celery.
+
+    Принимает те же данные, что и пакетная генерация, и сразу возвращает ID задания;
+    готовый файл хранится DOCUMENT_JOB_TTL секунд.
+    """
+
+    def post(self, request, *args, **kwargs):
+        try:
+            try:
+                data = json.loads(request.body)
+            except json.JSONDecodeError:
+                return JsonResponse({
+                    'status': 'ERROR',
+                    'message': 'Неверный формат JSON'
+                }, status=400)
+
+            batch, error_response = self.prepare_batch(data)
+            if error_response:
+                return error_response
+
+            directions = batch['directions']
+            job = DocumentJob.objects.create(
+                user=request.user,
+                payload={
+                    'format': batch['format'],
+                    'template_path': os.path.join(self.TEMPLATES_DIR, batch['template_name']),
+                    'documents': [
+                        {'filename': self.get_batch_item_filename(d), 'context': self.prepare_context(d)}
+                        for d in directions
+                    ],
+                },
+                total=len(directions),
+                filename=self.get_batch_filename(batch['format']),
+                expires_at=timezone.now() + timedelta(seconds=settings.DOCUMENT_JOB_TTL),
+            )
+            transaction.on_commit(lambda: generate_documents.delay(str(job.id)))
+            return JsonResponse({
+                'status': 'SUCCESS',
+                'job': serialize_document_job(job)
+            }, status=202)
+
+        except Exception as e:
+            return JsonResponse({
+                'status': 'ERROR',
+                'message': str(e)
+            }, status=500)
+
+
+def serialize_document_job(job):
+    """Сериализует задание на генерацию документов для ответа API."""
+    return {
+        'id': str(job.id),
+        'status': job.status,
+        'status_display': job.get_status_display(),
+        'total': job.total,
+        'processed': job.processed,
+        'progress': round(job.get_progress() * 100),
+        'error': job.error,
+        'created_at': job.created_at.isoformat(),
+        'finished_at': job.finished_at.isoformat() if job.finished_at else None,
+        'expires_at': job.expires_at.isoformat(),
+        'status_url': reverse('guard:document-job', args=[job.id]),
+        'download_url': reverse('guard:document-job-file', args=[job.id]) if job.status == 'success' else None,
+    }
+
+
+class DocumentJobStatusView(LoginRequiredMixin, UsersOnlyMixin, View):
+    """Статус и прогресс фонового задания на генерацию документов."""
+
+    def get(self, request, job_id, *args, **kwargs):
+        job = DocumentJob.objects.filter(id=job_id, user=request.user, expires_at__gte=timezone.now()).first()
+        if job is None:
+            return JsonResponse({
+                'status': 'ERROR',
+                'description': 'Задание не найдено или срок хранения результата истёк'
+            }, status=404)
+        return JsonResponse({
+            'status': 'SUCCESS',
+            'job': serialize_document_job(job)
+        })
+
+
+class DocumentJobFileView(LoginRequiredMixin, UsersOnlyMixin, View):
+    """Скачивание результата фонового задания на генерацию документов."""
+
+    def get(self, request, job_id, *args, **kwargs):
+        job = DocumentJob.objects.filter(id=job_id, user=request.user, expires_at__gte=timezone.now()).first()
+        if job is None or not job.file:
+            return JsonResponse({
+                'status': 'ERROR',
+                'description': 'Задание не найдено, ещё не завершено или срок хранения результата истёк'
+            }, status=404)
+        try:
+            file_handle = job.file.open('rb')
+        except FileNotFoundError:
+            return JsonResponse({
+                'status': 'ERROR',
+                'description': 'Файл результата не найден в хранилище'
+            }, status=404)
+        content_type = 'application/zip' if job.filename.endswith('.zip') else DOCX_CONTENT_TYPE
+        return stream_for(
+            request, FileResponse(file_handle, as_attachment=True, filename=job.filename, content_type=content_type)
+        )
+
+
 # === Представления для работы с обучением ===
 class AllEducationsView(LoginRequiredMixin, UsersOnlyMixin, View):
-    """Представление для получения всех записей об обучении."""
+    """
+    Представление для постраничного получения записей об обучении.
+
+    С format=ndjson вместо страницы потоково отдаются все подходящие записи после курсора
+    (limit не учитывается), по одному JSON-объекту в строке.
+    """
     def get(self, request):
         try:
-            edu_data = Education.objects.all().select_related('owner').prefetch_related('attachments')
-            data = [{
-                'id': edu.id,
-                'owner': edu.owner.FIO,
-                'program': edu.get_program_display(),
-                'protocol_num': edu.protocol_num,
-                'udostoverenie_num': edu.udostoverenie_num,
-                'hours': edu.hours,
-                'date_from': edu.date_from.strftime('%d.%m.%Y'),
-                'date_to': edu.date_to.strftime('%d.%m.%Y'),
-                'attachments': [{
-                    'id': att.id,
-                    'name': att.file.name.split('/')[-1] if att.file else '',
-                    'url': att.file.url if att.file else '',
-                    'size': att.get_file_size() if att.file else 0,
-                    'uploaded_at': att.uploaded_at.strftime('%d.%m.%Y %H:%M') if att.uploaded_at else ''
-                } for att in edu.attachments.all()]
-            } for edu in edu_data]
-            return JsonResponse({
+            try:
+                list_format = get_list_format(request.GET)
+                ordering = get_ordering(request.GET.get('order'), RECORD_ORDERINGS, 'date_to')
+                edu_data = filter_educations(request.GET).values(*EDUCATION_FIELDS)
+                if list_format == 'ndjson':
+                    return ndjson_response(
+                        request, after_cursor(edu_data, ordering, request.GET.get('cursor')), serialize_educations
+                    )
+
+                limit = get_page_size(request.GET.get('limit'))
+                educations, next_cursor = paginate_keyset(edu_data, ordering, request.GET.get('cursor'), limit)
+            except ValidationError as e:
+                return JsonResponse({
+                    'status': 'ERROR',
+                    'description': e.message
+                }, status=400)
+
+            return FastJsonResponse({
                 'status': 'SUCCESS',
-                'data': data
-            }, safe=False)
+                'data': serialize_educations(educations),
+                'next_cursor': next_cursor
+            })
         except Exception as e:
             return JsonResponse({
                 'status': 'ERROR',
@@ -1407,35 +2020,22 @@ class AllEducationsView(LoginRequiredMixin, UsersOnlyMixin, View):
             }, status=500)
 
 
+class EduExportView(ExportView):
+    """Потоковая выгрузка записей об обучении с фильтрами и сортировкой AllEducationsView."""
+    export_queryset = staticmethod(education_export_queryset)
+    columns = EDUCATION_EXPORT_COLUMNS
+    filename = 'educations'
+
+
 class GetEducationView(LoginRequiredMixin, UsersOnlyMixin, View):
     """Представление для получения данных конкретного обучения."""
     def get(self, request, edu_id):
         try:
-            edu_data = get_object_or_404(Education, pk=edu_id)
-            attachments = FileAttachment.objects.filter(education=edu_data)
-            files_data = [{
-                'id': att.id,
-                'name': att.file.name.split('/')[-1],
-                'url': att.file.url,
-                'uploaded_at': att.uploaded_at.strftime('%d.%m.%Y %H:%M'),
-                'size': att.get_file_size()
-            } for att in attachments]
-            data = [{
-                'id': edu_data.id,
-                'owner': edu_data.owner.FIO,
-                'program': edu_data.get_program_display(),
-                'program_type': edu_data.program,
-                'protocol_num': edu_data.protocol_num,
-                'udostoverenie_num': edu_data.udostoverenie_num,
-                'hours': edu_data.hours,
-                'date_from': edu_data.date_from.strftime('%Y-%m-%d'),
-                'date_to': edu_data.date_to.strftime('%Y-%m-%d'),
-                'attachments': files_data
-            }]
-            return JsonResponse({
+            edu_data = get_object_or_404(Education.objects.values(*EDUCATION_FIELDS), pk=edu_id)
+            return FastJsonResponse({
                 'status': 'SUCCESS',
-                'data': data
-            }, safe=False)
+                'data': serialize_educations([edu_data], date_format=format_iso_date)
+            })
         except Exception as e:
             return JsonResponse({
                 'status': 'ERROR',
@@ -1446,37 +2046,8 @@ class GetEducationView(LoginRequiredMixin, UsersOnlyMixin, View):
 @login_required
 def get_worker_education(request, worker_id):
     """Получение записей об обучении сотрудника по ID."""
-    data = []
-    emp = get_object_or_404(Employee, pk=worker_id)
-    education_queryset = Education.objects.filter(owner=emp).prefetch_related('attachments')
-    education_list = list(education_queryset)
-    attachments = FileAttachment.objects.filter(education__in=education_list)
-    attachments_dict = {}
-    for att in attachments:
-        if att.education_id not in attachments_dict:
-            attachments_dict[att.education_id] = []
-        attachments_dict[att.education_id].append({
-            'id': att.id,
-            'name': att.file.name.split('/')[-1] if att.file.name else f'file_{att.id}',
-            'uploaded_at': att.uploaded_at.strftime('%d.%m.%Y %H:%M') if att.uploaded_at else '',
-            'url': f'/files/preview/{att.id}/' if att else '',
-            'size': att.get_file_size() if att.file else 0
-        })
-
-    for data_education in education_list:
-        files_data = attachments_dict.get(data_education.id, [])
-        data.append({
-            'id': data_education.id,
-            'program': data_education.get_program_display(),
-            'protocol_num': data_education.protocol_num,
-            'udostoverenie_num': data_education.udostoverenie_num,
-            'hours': data_education.hours,
-            'date_from': data_education.date_from.strftime("%d.%m.%Y") if data_education.date_from else None,
-            'date_to': data_education.date_to.strftime("%d.%m.%Y") if data_education.date_to else None,
-            'attachments': files_data
-        })
-
-    return JsonResponse({'data': data})
+    emp = get_object_or_404(Employee.objects.only('id'), pk=worker_id)
+    return FastJsonResponse({'data': serialize_educations(Education.objects.filter(owner=emp).values(*EDUCATION_FIELDS))})
 
 
 class EduAddView(LoginRequiredMixin, UsersOnlyMixin, View):
@@ -1491,7 +2062,7 @@ class EduAddView(LoginRequiredMixin, UsersOnlyMixin, View):
                     'description': 'Неверный формат JSON'
                 }, status=400)
 
-            required_fields = ['employee_id', 'program', 'protocol_num', 'udostoverenie_num', 'hours', 'date_from', 'date_to']
+            required_fields = ['employee_id', *EDUCATION_REQUIRED_FIELDS]
             for field in required_fields:
                 if field not in data:
                     return JsonResponse({
@@ -1508,64 +2079,115 @@ class EduAddView(LoginRequiredMixin, UsersOnlyMixin, View):
                 if not Employee.objects.filter(id=employee_id).exists():
                     raise ValidationError('Сотрудник с таким ID не существует')
 
-                valid_programs = ['ot_managers', 'ot_teachers', 'first_aid', 'fire_safety', 'electrical_safety', 'sanitary_minimum', 'civil_defense', 'anti_terror']
-                if data['program'] not in valid_programs:
-                    raise ValidationError(f"Программа должна быть одной из: {', '.join(valid_programs)}")
+                education_data = clean_education_data(data)
+
+            except ValidationError as e:
+                return JsonResponse({
+                    'status': 'ERROR',
+                    'description': str(e)
+                }, status=400)
+
+            try:
+                with transaction.atomic():
+                    education = Education(owner=Employee.objects.get(pk=employee_id), **education_data)
+                    education.full_clean()
+                    education.save()
+                return JsonResponse({
+                    'status': 'SUCCESS',
+                    'id': education.id
+                })
+            except Exception as e:
+                return JsonResponse({
+                    'status': 'ERROR',
+                    'description': f'Ошибка сохранения записи об обучении: {str(e)}'
+                }, status=500)
 
-                if not data['protocol_num'].strip():
-                    raise ValidationError('Номер протокола не может быть пустым')
+        except Exception as e:
+            return JsonResponse({
+                'status': 'ERROR',
+                'description': f'Непредвиденная ошибка: {str(e)}'
+            }, status=500)
 
-                if not data['udostoverenie_num'].strip():
-                    raise ValidationError('Номер удостоверения не может быть пустым')
 
-                try:
-                    hours = float(data['hours'])
-                    if hours <= 0 or hours > 1000:
-                        raise ValidationError('Часы должны быть от 1 до 1000')
-                except (ValueError, TypeError):
-                    raise ValidationError('Часы должны быть положительным числом')
+class EduImportView(ImportView):
+    """
+    Представление для массового импорта записей об обучении из CSV или XLSX.
 
-                try:
-                    date_from = datetime.strptime(data['date_from'], '%Y-%m-%d').date()
-                except (ValueError, TypeError):
-                    raise ValidationError('Дата начала должна быть в формате YYYY-MM-DD')
+    Сотрудник определяется по ФИО и дате рождения; в ответе — результат по каждой строке.
+    """
+    import_rows = staticmethod(import_educations)
+    error_description = 'Ошибка импорта записей об обучении'
 
-                try:
-                    date_to = datetime.strptime(data['date_to'], '%Y-%m-%d').date()
-                except (ValueError, TypeError):
-                    raise ValidationError('Дата окончания должна быть в формате YYYY-MM-DD')
 
-                if date_to < date_from:
-                    raise ValidationError('Дата окончания не может быть раньше даты начала')
+class EduGroupAddView(LoginRequiredMixin, UsersOnlyMixin, View):
+    """
+    Представление для группового добавления обучения по одному протоколу.
 
+    Принимает общие данные протокола (program, protocol_num, hours, date_from, date_to) и список
+    employees из элементов {employee_id, udostoverenie_num}; все записи создаются одной вставкой
+    в одной транзакции. JSON передаётся телом запроса или, если прикладывается скан протокола,
+    полем data формы multipart/form-data вместе с файлом file. Файл сохраняется один раз,
+    и вложения всех созданных записей ссылаются на него.
+    """
+    def post(self, request):
+        try:
+            scan = None
+            try:
+                if request.content_type == 'multipart/form-data':
+                    data = json.loads(request.POST.get('data', ''))
+                    scan = request.FILES.get('file')
+                else:
+                    data = json.loads(request.body)
+            except json.JSONDecodeError:
+                data = None
+            if not isinstance(data, dict):
+                return JsonResponse({
+                    'status': 'ERROR',
+                    'description': 'Неверный формат JSON'
+                }, status=400)
+
+            required_fields = [*EDUCATION_PROTOCOL_FIELDS, 'employees']
+            for field in required_fields:
+                if field not in data:
+                    return JsonResponse({
+                        'status': 'ERROR',
+                        'description': f'Отсутствует обязательное поле: {field}'
+                    }, status=400)
+
+            try:
+                protocol = clean_education_protocol(data)
+                employees = self.clean_employees(data['employees'])
             except ValidationError as e:
                 return JsonResponse({
                     'status': 'ERROR',
-                    'description': str(e)
+                    'description': e.message
                 }, status=400)
 
             try:
                 with transaction.atomic():
-                    education = Education(
-                        owner=Employee.objects.get(pk=employee_id),
-                        program=data['program'],
-                        protocol_num=data['protocol_num'],
-                        udostoverenie_num=data['udostoverenie_num'],
-                        hours=hours,
-                        date_from=date_from,
-                        date_to=date_to
-                    )
-                    education.full_clean()
-                    education.save()
-                    check_expirations()
+                    educations = Education.objects.bulk_create([
+                        Education(owner_id=employee_id, udostoverenie_num=udostoverenie_num, **protocol)
+                        for employee_id, udostoverenie_num in employees
+                    ])
+                    attachment_ids = self.attach_scan(scan, educations) if scan else []
+                    # bulk_create не отправляет сигналы, поэтому уведомления пересчитываются
+                    # и сводка по срокам сбрасывается один раз после вставки
+                    schedule_expiration_recompute()
+                    invalidate_dashboard()
                 return JsonResponse({
                     'status': 'SUCCESS',
-                    'id': education.id
+                    'ids': [education.id for education in educations],
+                    'attachment_ids': attachment_ids
                 })
+            except ValidationError as e:
+                return JsonResponse({
+                    'status': 'ERROR',
+                    'description': str(e)
+                }, status=400)
             except Exception as e:
                 return JsonResponse({
                     'status': 'ERROR',
-                    'description': f'Ошибка сохранения записи об обучении: {str(e)}'
+                    'description': f'Ошибка сохранения записей об обучении: {str(e)}'
                 }, status=500)
 
         except Exception as e:
@@ -1574,14 +2196,66 @@ class EduAddView(LoginRequiredMixin, UsersOnlyMixin, View):
                 'description': f'Непредвиденная ошибка: {str(e)}'
             }, status=500)
 
+    @staticmethod
+    def clean_employees(items):
+        """Проверяет список сотрудников группы и возвращает пары (ID сотрудника, номер удостоверения)."""
+        if not isinstance(items, list) or not items:
+            raise ValidationError('employees должен быть непустым списком')
+        if len(items) > settings.EDUCATION_GROUP_MAX_SIZE:
+            raise ValidationError(f'Не более {settings.EDUCATION_GROUP_MAX_SIZE} сотрудников за один запрос')
+
+        employees = []
+        for number, item in enumerate(items, start=1):
+            if not isinstance(item, dict) or 'employee_id' not in item or 'udostoverenie_num' not in item:
+                raise ValidationError(f'Сотрудник №{number}: нужны поля employee_id и udostoverenie_num')
+            try:
+                employee_id = int(item['employee_id'])
+            except (ValueError, TypeError):
+                raise ValidationError(f'Сотрудник №{number}: ID сотрудника должен быть целым числом')
+            try:
+                udostoverenie_num = clean_udostoverenie_num(item['udostoverenie_num'])
+            except ValidationError as e:
+                raise ValidationError(f'Сотрудник №{number}: {e.message}')
+            employees.append((employee_id, udostoverenie_num))
+
+        employee_ids = [employee_id for employee_id, _ in employees]
+        if len(set(employee_ids)) != len(employee_ids):
+            raise ValidationError('Сотрудник указан в списке несколько раз')
+        existing = set(Employee.objects.filter(id__in=employee_ids).values_list('id', flat=True))
+        missing = [str(employee_id) for employee_id in employee_ids if employee_id not in existing]
+        if missing:
+            raise ValidationError(f"Сотрудники с такими ID не существуют: {', '.join(missing)}")
+        return employees
+
+    @staticmethod
+    def attach_scan(scan, educations):
+        """
+        Прикладывает скан протокола ко всем записям об обучении без копирования файла.
+
+        Файл сохраняется в хранилище вместе с первым вложением, остальные вложения создаются
+        одной вставкой и ссылаются на тот же файл. Возвращает ID созданных вложений.
+        """
+        first = FileAttachment(file=scan, file_type='education', education=educations[0])
+        first.full_clean()
+        first.save()
+        others = FileAttachment.objects.bulk_create([
+            FileAttachment(
+                file=first.file.name,
+                file_type='education',
+                education=education,
+                size=first.size,
+                content_type=first.content_type,
+                sha256=first.sha256
+            ) for education in educations[1:]
+        ])
+        return [first.id, *(attachment.id for attachment in others)]
+
 
 class EduUpdateView(LoginRequiredMixin, UsersOnlyMixin, View):
     """Представление для обновления записи об обучении."""
     def patch(self, request, education_id):
         try:
             education = get_object_or_404(Education, pk=education_id)
-            old_date_from = education.date_from
-            old_date_to = education.date_to
 
             try:
                 data = json.loads(request.body)
@@ -1640,9 +2314,6 @@ class EduUpdateView(LoginRequiredMixin, UsersOnlyMixin, View):
 
                     education.full_clean()
                     education.save()
-                    dates_changed = (old_date_from != date_from) or (old_date_to != date_to)
-                    if dates_changed:
-                        check_expirations()
 
                 return JsonResponse({
                     'status': 'SUCCESS',
@@ -1694,7 +2365,6 @@ class EduDeleteView(LoginRequiredMixin, UsersOnlyMixin, View):
             try:
                 education = get_object_or_404(Education, pk=edu_id)
                 education.delete()
-                check_expirations()
                 return JsonResponse({
                     'status': 'SUCCESS',
                     'description': f'Обучение с ID {edu_id} удалено'
@@ -1759,7 +2429,7 @@ class FileUploadView(LoginRequiredMixin, UsersOnlyMixin, View):
                     'status': 'SUCCESS',
                     'id': attachment.id,
                     'file_name': attachment.file.name,
-                    'uploaded_at': attachment.uploaded_at.strftime('%d.%m.%Y %H:%M')
+                    'uploaded_at': format_datetime(attachment.uploaded_at)
                 })
             except ValidationError as e:
                 return JsonResponse({
@@ -1787,11 +2457,19 @@ class FileDeleteView(LoginRequiredMixin, UsersOnlyMixin, View):
                 }, status=400)
 
             attachment = get_object_or_404(FileAttachment, id=file_id)
-            if attachment.file:
-                attachment.file.close()
-            if attachment.file and os.path.exists(attachment.file.path):
-                os.remove(attachment.file.path)
-            attachment.file.delete(save=False)
+            # Один файл хранится у нескольких вложений только после группового добавления обучения
+            # (EduGroupAddView сохраняет скан протокола один раз); при обычной загрузке хранилище
+            # даёт файлу уникальное имя. Поэтому совпадение пути означает общий скан, и он
+            # удаляется вместе с последним ссылающимся на него вложением
+            shared = bool(attachment.file) and FileAttachment.objects.filter(
+                file=attachment.file.name
+            ).exclude(pk=attachment.pk).exists()
+            if not shared:
+                if attachment.file:
+                    attachment.file.close()
+                if attachment.file and os.path.exists(attachment.file.path):
+                    os.remove(attachment.file.path)
+                attachment.file.delete(save=False)
             attachment.delete()
             return JsonResponse({
                 'status': 'SUCCESS',
@@ -1811,7 +2489,15 @@ class FileDeleteView(LoginRequiredMixin, UsersOnlyMixin, View):
 
 
 class FilePreviewView(LoginRequiredMixin, UsersOnlyMixin, View):
-    """Представление для предпросмотра файлов."""
+    """
+    Представление для предпросмотра файлов.
+
+    Файл отдаётся потоково, с поддержкой Range-запросов и условных запросов по ETag/Last-Modified.
+    При FILE_DELIVERY_MODE = 'x-accel' или 'x-sendfile' отдача передаётся фронт-прокси.
+    """
+    CHUNK_SIZE = 64 * 1024
+    RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
     def get(self, request, file_id):
         try:
             attachment = get_object_or_404(FileAttachment, id=file_id)
@@ -1833,20 +2519,26 @@ class FilePreviewView(LoginRequiredMixin, UsersOnlyMixin, View):
             }
 
             try:
-                with attachment.file.open('rb') as file:
-                    file_content = file.read()
-                    if not file_content:
-                        return JsonResponse({
-                            'status': 'ERROR',
-                            'description': 'Файл пуст'
-                        }, status=500)
+                size = attachment.size if attachment.size is not None else attachment.file.size
             except Exception as e:
                 return JsonResponse({
                     'status': 'ERROR',
                     'description': f'Невозможно прочитать файл: {str(e)}'
                 }, status=500)
+            if not size:
+                return JsonResponse({
+                    'status': 'ERROR',
+                    'description': 'Файл пуст'
+                }, status=500)
+
+            etag = '"%s"' % (attachment.sha256 or f'{attachment.id}-{size}')
+            last_modified = int(attachment.uploaded_at.timestamp())
+            not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+            if not_modified is not None:
+                not_modified['ETag'] = etag
+                return not_modified
 
-            content_type = mime_types.get(file_ext, 'application/octet-stream')
+            content_type = mime_types.get(file_ext) or attachment.content_type or 'application/octet-stream'
             encoded_file_name = quote(file_name)
             disposition = (
                 f'inline; filename="{quote(file_name)}"'
@@ -1854,9 +2546,20 @@ class FilePreviewView(LoginRequiredMixin, UsersOnlyMixin, View):
                 else f'attachment; filename="{encoded_file_name}"'
             )
 
-            response = HttpResponse(file_content, content_type=content_type)
+            delivery_mode = settings.FILE_DELIVERY_MODE
+            if delivery_mode == 'x-accel':
+                response = HttpResponse(content_type=content_type)
+                response['X-Accel-Redirect'] = quote(f"{settings.FILE_ACCEL_REDIRECT_PREFIX.rstrip('/')}/{attachment.file.name}")
+            elif delivery_mode == 'x-sendfile':
+                response = HttpResponse(content_type=content_type)
+                response['X-Sendfile'] = attachment.file.path
+            else:
+                response = self.stream_file(request, attachment, size, content_type, etag, last_modified)
+
             response['Content-Disposition'] = disposition
-            response['Content-Length'] = len(file_content)
+            response['ETag'] = etag
+            response['Last-Modified'] = http_date(last_modified)
+            response['Cache-Control'] = 'private, no-cache'
             return response
 
         except FileAttachment.DoesNotExist:
@@ -1870,6 +2573,76 @@ class FilePreviewView(LoginRequiredMixin, UsersOnlyMixin, View):
                 'description': f'Ошибка: {str(e)}'
             }, status=500)
 
+    def stream_file(self, request, attachment, size, content_type, etag, last_modified):
+        """Отдаёт файл целиком или запрошенный диапазон байтов, не загружая его в память."""
+        range_header = request.headers.get('Range')
+        if_range = request.headers.get('If-Range')
+        if if_range and if_range not in (etag, http_date(last_modified)):
+            range_header = None
+
+        byte_range = None
+        if range_header:
+            try:
+                byte_range = self.parse_range(range_header, size)
+            except ValueError:
+                response = HttpResponse(status=416)
+                response['Content-Range'] = f'bytes */{size}'
+                return response
+
+        file = attachment.file.open('rb')
+        if byte_range is None:
+            response = FileResponse(file, content_type=content_type)
+            response['Content-Length'] = size
+        else:
+            start, end = byte_range
+            response = StreamingHttpResponse(
+                self.iter_range(file, start, end - start + 1),
+                status=206,
+                content_type=content_type
+            )
+            response['Content-Range'] = f'bytes {start}-{end}/{size}'
+            response['Content-Length'] = end - start + 1
+        response['Accept-Ranges'] = 'bytes'
+        return stream_for(request, response)
+
+    def parse_range(self, header, size):
+        """
+        Разбирает заголовок Range с одним диапазоном.
+
+        Возвращает (start, end) включительно или None, если заголовок следует проигнорировать.
+        Выбрасывает ValueError, если диапазон невыполним.
+        """
+        match = self.RANGE_RE.match(header.strip())
+        if not match or match.groups() == ('', ''):
+            return None
+        start, end = match.groups()
+        if not start:
+            suffix = int(end)
+            if suffix == 0:
+                raise ValueError('Пустой диапазон')
+            return max(size - suffix, 0), size - 1
+        start = int(start)
+        if end and int(end) < start:
+            return None
+        if start >= size:
+            raise ValueError('Диапазон за пределами файла')
+        end = min(int(end), size - 1) if end else size - 1
+        return start, end
+
+    def iter_range(self, file, start, length):
+        """Читает length байтов файла начиная с start порциями по CHUNK_SIZE."""
+        try:
+            file.seek(start)
+            remaining = length
+            while remaining > 0:
+                chunk = file.read(min(self.CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+        finally:
+            file.close()
+
 
 class FileListView(LoginRequiredMixin, UsersOnlyMixin, View):
     """Представление для получения списка файлов."""
@@ -1883,17 +2656,10 @@ class FileListView(LoginRequiredMixin, UsersOnlyMixin, View):
 
             attachments = FileAttachment.objects.filter(
                 **{f'{file_type}__id': object_id}
-            ).order_by('-uploaded_at')
-            files_data = [{
-                'id': att.id,
-                'name': att.file.name.split('/')[-1],
-                'url': att.file.url,
-                'uploaded_at': att.uploaded_at.strftime('%d.%m.%Y %H:%M'),
-                'size': att.get_file_size()
-            } for att in attachments]
-            return JsonResponse({
+            ).order_by('-uploaded_at').values(*ATTACHMENT_FIELDS)
+            return FastJsonResponse({
                 'status': 'SUCCESS',
-                'files': files_data
+                'files': serialize_attachments(attachments)
             })
 
         except Exception as e:
@@ -139,12 +139,79 @@ SITE_URL = os.environ.get('SITE_URL', 'https://your-app-name.onrender.com')
 # CELERY SETTINGS
 CELERY_BROKER_URL = os.environ.get('REDIS_URL', 'redis://localhost:6379/0')
 CELERY_RESULT_BACKEND = os.environ.get('REDIS_URL', 'redis://localhost:6379/0')
-# CELERY_BEAT_SCHEDULE = {
-#     'check_expirations_daily': {
-#         'task': 'guard.tasks.check_expirations',
-#         'schedule': crontab(hour=0, minute=0),  # Ежедневно в 00:00
-#     },
-# }
+CELERY_BEAT_SCHEDULE = {
+    'check_expirations_daily': {
+        'task': 'guard.tasks.check_expirations',
+        'schedule': crontab(hour=0, minute=0),  # Ежедневно в 00:00
+    },
+    'cleanup_document_jobs_hourly': {
+        'task': 'guard.tasks.cleanup_document_jobs',
+        'schedule': crontab(minute=0),  # Каждый час
+    },
+    'apply_notification_retention_daily': {
+        'task': 'guard.tasks.apply_notification_retention',
+        'schedule': crontab(hour=3, minute=0),  # Ежедневно в 03:00
+    },
+}
+
+# CACHE
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ.get('REDIS_URL', 'redis://localhost:6379/0'),
+    }
+}
+
+# NOTIFICATIONS
+# Окно (в секундах), в пределах которого изменения объединяются в один пересчёт уведомлений
+NOTIFICATION_RECOMPUTE_DELAY = int(os.environ.get('NOTIFICATION_RECOMPUTE_DELAY', 10))
+# Максимальное время удержания блокировки пересчёта (в секундах)
+NOTIFICATION_LOCK_TIMEOUT = int(os.environ.get('NOTIFICATION_LOCK_TIMEOUT', 600))
+# Redis и канал pub/sub, через которые процессы ASGI узнают об изменении уведомлений
+NOTIFICATION_PUBSUB_URL = os.environ.get('REDIS_URL', 'redis://localhost:6379/0')
+NOTIFICATION_PUBSUB_CHANNEL = 'guard:notifications:events'
+# Интервал пустых сообщений в потоке SSE, не дающих прокси закрыть соединение (в секундах)
+NOTIFICATION_STREAM_HEARTBEAT = int(os.environ.get('NOTIFICATION_STREAM_HEARTBEAT', 25))
+# Сколько дней хранить прочитанные уведомления (0 — хранить бессрочно)
+NOTIFICATION_RETENTION_DAYS = int(os.environ.get('NOTIFICATION_RETENTION_DAYS', 90))
+# Что делать с прочитанными уведомлениями после срока хранения: 'archive' или 'delete'
+NOTIFICATION_RETENTION_MODE = os.environ.get('NOTIFICATION_RETENTION_MODE', 'archive')
+
+# FILE DELIVERY
+# Способ отдачи вложений: django — потоково из Python, x-accel — через nginx (X-Accel-Redirect),
+# x-sendfile — через Apache/lighttpd (X-Sendfile)
+FILE_DELIVERY_MODE = os.environ.get('FILE_DELIVERY_MODE', 'django')
+# Внутренний location nginx, соответствующий каталогу загруженных файлов (для режима x-accel)
+FILE_ACCEL_REDIRECT_PREFIX = os.environ.get('FILE_ACCEL_REDIRECT_PREFIX', '/protected-media/')
+
+# DIRECTIONS
+# Количество процессов для пакетной генерации направлений (0 — рендеринг в текущем процессе).
+# Пул создаётся в каждом процессе веб-сервера и Celery отдельно: при `--workers 4` в Procfile
+# всего может быть запущено до 4 × DIRECTION_RENDER_WORKERS процессов рендеринга
+DIRECTION_RENDER_WORKERS = int(os.environ.get('DIRECTION_RENDER_WORKERS', 2))
+# Максимальное количество сотрудников в одном пакетном запросе направлений
+DIRECTION_BATCH_MAX_SIZE = int(os.environ.get('DIRECTION_BATCH_MAX_SIZE', 1000))
+# Время хранения результата фонового задания на генерацию документов (в секундах)
+DOCUMENT_JOB_TTL = int(os.environ.get('DOCUMENT_JOB_TTL', 24 * 60 * 60))
+
+# EDUCATION
+# Максимальное количество сотрудников в одном запросе группового добавления обучения
+EDUCATION_GROUP_MAX_SIZE = int(os.environ.get('EDUCATION_GROUP_MAX_SIZE', 1000))
+
+# DASHBOARD
+# Время хранения сводки по срокам медосмотров и обучений в кэше (в секундах); при изменении записей
+# сводка пересчитывается сразу, время хранения ограничивает только изменения в обход моделей
+DASHBOARD_CACHE_TIMEOUT = int(os.environ.get('DASHBOARD_CACHE_TIMEOUT', 60 * 60))
+
+# EXPIRATION EMAILS
+# Количество получателей в одной задаче рассылки
+EMAIL_CHUNK_SIZE = int(os.environ.get('EMAIL_CHUNK_SIZE', 100))
+# Максимум писем в секунду в одной задаче рассылки (0 — без ограничения)
+EMAIL_RATE_LIMIT = float(os.environ.get('EMAIL_RATE_LIMIT', 5))
+# Количество повторов при временных ошибках SMTP и базовая задержка (в секундах),
+# которая удваивается с каждой попыткой
+EMAIL_MAX_RETRIES = int(os.environ.get('EMAIL_MAX_RETRIES', 5))
+EMAIL_RETRY_BACKOFF = int(os.environ.get('EMAIL_RETRY_BACKOFF', 30))
 
 # E-MIAL 
 EMAIL_HOST = os.environ.get('EMAIL_HOST', 'sandbox.smtp.mailtrap.io')